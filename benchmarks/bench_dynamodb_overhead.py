@@ -0,0 +1,116 @@
+"""
+Micro-benchmark dell'overhead per chiamata del wrapper DynamoDB. La risposta HTTP viene fornita da un handler
+"before-send" di botocore, così viene misurato tutto il percorso della richiesta (serializzazione, firma, parsing,
+retry, metriche) tranne la rete. Confronta boto3 puro con DynamoDB riusato e con DynamoDB creato ad ogni chiamata.
+
+Esecuzione: PYTHONPATH=src python -m benchmarks.bench_dynamodb_overhead (o tramite benchmarks.run)
+"""
+from __future__ import annotations
+
+import time
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+from benchmarks.harness import benchmark
+from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.const import regions
+from simple_aws_wrapper.services.dynamodb import DynamoDB
+
+# endpoint fittizio: i client creati per questo benchmark non vengono condivisi con gli altri
+ENDPOINT_URL = "http://dynamodb-overhead.invalid"
+TABLE_NAME = "overhead"
+KEY = {"id": "1"}
+ITERATIONS = 5000
+RESPONSE_BODY = b'{"Item": {"id": {"S": "1"}, "value": {"N": "1"}}}'
+
+
+class _RawResponse:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+def _respond(request, **kwargs):
+    return AWSResponse(
+        request.url,
+        200,
+        {"Content-Type": "application/x-amz-json-1.0"},
+        _RawResponse(RESPONSE_BODY),
+    )
+
+
+def _stub(events):
+    events.register("before-send.dynamodb", _respond)
+
+
+def _config():
+    return AWSConfig().snapshot(regions.EU_WEST_1, ENDPOINT_URL)
+
+
+def boto3_table():
+    table = boto3.resource(
+        "dynamodb",
+        region_name=regions.EU_WEST_1,
+        endpoint_url=ENDPOINT_URL,
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    ).Table(TABLE_NAME)
+    _stub(table.meta.client.meta.events)
+    return lambda: table.get_item(Key=KEY)
+
+
+def wrapper_reused():
+    dynamodb = DynamoDB(config=_config())
+    _stub(dynamodb.client.meta.client.meta.events)
+    return lambda: dynamodb.get_item(TABLE_NAME, KEY)
+
+
+def wrapper_per_call():
+    config = _config()
+    _stub(DynamoDB(config=config).client.meta.client.meta.events)
+    return lambda: DynamoDB(config=config).get_item(TABLE_NAME, KEY)
+
+
+@benchmark("dynamodb_overhead.boto3_table.get_item", iterations=2000, warmup=50)
+def bench_boto3_table(context):
+    return boto3_table()
+
+
+@benchmark("dynamodb_overhead.wrapper_reused.get_item", iterations=2000, warmup=50)
+def bench_wrapper_reused(context):
+    return wrapper_reused()
+
+
+@benchmark("dynamodb_overhead.wrapper_per_call.get_item", iterations=2000, warmup=50)
+def bench_wrapper_per_call(context):
+    return wrapper_per_call()
+
+
+def run(operation) -> float:
+    for _ in range(100):
+        operation()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        operation()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    AWSConfig().set_region(regions.EU_WEST_1).set_endpoint_url(
+        ENDPOINT_URL
+    ).set_aws_access_key_id("test").set_aws_secret_access_key("test")
+    baseline = run(boto3_table())
+    for name, setup in (
+        ("boto3 Table.get_item", None),
+        ("DynamoDB (reused)", wrapper_reused),
+        ("DynamoDB (new instance per call)", wrapper_per_call),
+    ):
+        elapsed = baseline if setup is None else run(setup())
+        print(f"{name:<34} {elapsed:>8.1f} us/call  overhead {elapsed - baseline:>+7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark della conversione degli elementi DynamoDB: confronta TypeSerializer/TypeDeserializer di boto3 con
+simple_aws_wrapper.dynamodb_types su elementi "larghi" (molti attributi scalari) e annidati.
+
+Esecuzione: PYTHONPATH=src python -m benchmarks.bench_dynamodb_types (o tramite benchmarks.run)
+"""
+from __future__ import annotations
+
+import decimal
+import time
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from benchmarks.harness import BATCH, benchmark
+from simple_aws_wrapper.dynamodb_types import deserialize_item, serialize_item
+
+ITEMS = 100
+ITERATIONS = 200
+
+
+def wide_item(index: int) -> dict:
+    item: dict = {"id": f"item-{index}"}
+    for attribute in range(50):
+        item[f"s{attribute}"] = f"value-{attribute}"
+        item[f"n{attribute}"] = decimal.Decimal(attribute)
+    return item
+
+
+def nested_item(index: int) -> dict:
+    return {
+        "id": f"item-{index}",
+        "profile": {
+            "name": "name",
+            "tags": {"a", "b", "c"},
+            "addresses": [
+                {"city": "city", "zip": decimal.Decimal(10100 + i), "main": i == 0}
+                for i in range(5)
+            ],
+        },
+        "history": [
+            {"ts": decimal.Decimal(1700000000 + i), "values": [decimal.Decimal(i)] * 5}
+            for i in range(10)
+        ],
+    }
+
+
+WORKLOADS = {
+    "wide": [wide_item(i) for i in range(ITEMS)],
+    "nested": [nested_item(i) for i in range(ITEMS)],
+}
+
+
+def boto3_serialize(items: list) -> list:
+    serializer = TypeSerializer()
+    return [{k: serializer.serialize(v) for k, v in item.items()} for item in items]
+
+
+def boto3_deserialize(items: list) -> list:
+    deserializer = TypeDeserializer()
+    return [{k: deserializer.deserialize(v) for k, v in item.items()} for item in items]
+
+
+def fast_serialize(items: list) -> list:
+    return [serialize_item(item) for item in items]
+
+
+def fast_deserialize(items: list) -> list:
+    return [deserialize_item(item) for item in items]
+
+
+def fast_deserialize_native(items: list) -> list:
+    return [deserialize_item(item, use_native_numbers=True) for item in items]
+
+
+def _register(workload: str):
+    items = WORKLOADS[workload]
+    serialized = fast_serialize(items)
+    for name, function, data in (
+        ("boto3_serialize", boto3_serialize, items),
+        ("serialize_item", fast_serialize, items),
+        ("boto3_deserialize", boto3_deserialize, serialized),
+        ("deserialize_item", fast_deserialize, serialized),
+        ("deserialize_item_native", fast_deserialize_native, serialized),
+    ):
+
+        def setup(context, function=function, data=data):
+            return lambda: function(data)
+
+        benchmark(
+            f"dynamodb_types.{name}.{workload}",
+            workload=BATCH,
+            iterations=ITERATIONS,
+            ops_per_call=ITEMS,
+        )(setup)
+
+
+for _workload in WORKLOADS:
+    _register(_workload)
+
+
+def run(function, data) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        function(data)
+    return ITERATIONS * len(data) / (time.perf_counter() - start)
+
+
+def main():
+    for workload, items in WORKLOADS.items():
+        serialized = fast_serialize(items)
+        boto3_ser = run(boto3_serialize, items)
+        fast_ser = run(fast_serialize, items)
+        boto3_de = run(boto3_deserialize, serialized)
+        fast_de = run(fast_deserialize, serialized)
+        native_de = run(fast_deserialize_native, serialized)
+        print(f"[{workload}]")
+        print(f"  TypeSerializer:           {boto3_ser:>10,.0f} items/s")
+        print(f"  serialize_item:           {fast_ser:>10,.0f} items/s ({fast_ser / boto3_ser:.1f}x)")
+        print(f"  TypeDeserializer:         {boto3_de:>10,.0f} items/s")
+        print(f"  deserialize_item:         {fast_de:>10,.0f} items/s ({fast_de / boto3_de:.1f}x)")
+        print(f"  deserialize_item (native):{native_de:>10,.0f} items/s ({native_de / boto3_de:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
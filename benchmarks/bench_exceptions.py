@@ -0,0 +1,86 @@
+"""
+Benchmark del percorso di errore dei servizi: confronta il vecchio schema
+(GenericException(traceback.format_exc())) con wrap_exception, che conserva l'eccezione originale
+e ne formatta il traceback solo se richiesto.
+
+Esecuzione: PYTHONPATH=src python -m benchmarks.bench_exceptions (o tramite benchmarks.run)
+"""
+from __future__ import annotations
+
+import time
+import traceback
+
+from botocore.exceptions import ClientError
+
+from benchmarks.harness import benchmark
+from simple_aws_wrapper.exceptions.exceptions import GenericException, wrap_exception
+
+# profondità simile a quella di una chiamata botocore che fallisce
+STACK_DEPTH = 15
+ITERATIONS = 20000
+ERROR_RESPONSE = {
+    "Error": {"Code": "ConditionalCheckFailedException", "Message": "failed"},
+    "ResponseMetadata": {"HTTPStatusCode": 400},
+}
+
+
+def failing_call(depth: int = STACK_DEPTH):
+    if depth == 0:
+        raise ClientError(ERROR_RESPONSE, "PutItem")
+    failing_call(depth - 1)
+
+
+def eager_path():
+    try:
+        failing_call()
+    except Exception:
+        raise GenericException(traceback.format_exc())
+
+
+def lazy_path():
+    try:
+        failing_call()
+    except Exception as e:
+        raise wrap_exception(e)
+
+
+def _swallow(path):
+    def operation():
+        try:
+            path()
+        except GenericException:
+            pass
+
+    return operation
+
+
+@benchmark("exceptions.eager_format_exc", iterations=2000)
+def bench_eager_path(context):
+    return _swallow(eager_path)
+
+
+@benchmark("exceptions.wrap_exception", iterations=2000)
+def bench_lazy_path(context):
+    return _swallow(lazy_path)
+
+
+def run(path) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        try:
+            path()
+        except GenericException:
+            pass
+    return ITERATIONS / (time.perf_counter() - start)
+
+
+def main():
+    eager = run(eager_path)
+    lazy = run(lazy_path)
+    print(f"eager traceback.format_exc(): {eager:>12,.0f} errors/s")
+    print(f"wrap_exception (lazy):        {lazy:>12,.0f} errors/s")
+    print(f"speedup:                      {lazy / eager:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark della generazione di URL prefirmati S3 (URL/s): generate_presigned_url di boto3 (SigV4) per ogni chiave
+confrontato con S3.presign_urls, nello stesso processo e suddiviso tra più processi. Non vengono effettuate chiamate
+di rete.
+
+Esecuzione: PYTHONPATH=src python -m benchmarks.bench_s3_presign (o tramite benchmarks.run)
+"""
+from __future__ import annotations
+
+import os
+import time
+
+import boto3
+from botocore.config import Config
+
+from benchmarks.harness import BATCH, benchmark
+from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.const import regions
+from simple_aws_wrapper.services.s3 import S3
+
+BUCKET_NAME = "presign-benchmark"
+KEYS = [f"exports/2024/report-{i:06d}.csv" for i in range(1000)]
+LARGE_KEYS = [f"exports/2024/report-{i:06d}.csv" for i in range(200000)]
+PROCESSES = max(2, min(4, os.cpu_count() or 1))
+
+
+def boto3_presigner():
+    client = boto3.client(
+        "s3",
+        region_name=regions.EU_WEST_1,
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        config=Config(signature_version="s3v4"),
+    )
+    return lambda keys: [
+        client.generate_presigned_url(
+            "get_object", Params={"Bucket": BUCKET_NAME, "Key": key}, ExpiresIn=3600
+        )
+        for key in keys
+    ]
+
+
+@benchmark("s3_presign.boto3.1000", workload=BATCH, iterations=10, warmup=1, ops_per_call=len(KEYS))
+def bench_boto3(context):
+    presign = boto3_presigner()
+    return lambda: presign(KEYS)
+
+
+@benchmark("s3_presign.presign_urls.1000", workload=BATCH, iterations=50, warmup=2, ops_per_call=len(KEYS))
+def bench_presign_urls(context):
+    s3 = S3()
+    return lambda: s3.presign_urls(BUCKET_NAME, KEYS)
+
+
+@benchmark(
+    "s3_presign.presign_urls_processes.200000",
+    workload=BATCH,
+    iterations=3,
+    warmup=1,
+    ops_per_call=len(LARGE_KEYS),
+)
+def bench_presign_urls_processes(context):
+    s3 = S3()
+    return lambda: s3.presign_urls(
+        BUCKET_NAME, LARGE_KEYS, processes=PROCESSES, chunk_size=len(LARGE_KEYS) // PROCESSES
+    )
+
+
+def run(function, keys: list) -> float:
+    start = time.perf_counter()
+    function(keys)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def main():
+    AWSConfig().set_region(regions.EU_WEST_1).set_aws_access_key_id(
+        "test"
+    ).set_aws_secret_access_key("test")
+    s3 = S3()
+    boto3_rate = run(boto3_presigner(), KEYS)
+    bulk_rate = run(lambda keys: s3.presign_urls(BUCKET_NAME, keys), LARGE_KEYS)
+    processes_rate = run(
+        lambda keys: s3.presign_urls(
+            BUCKET_NAME, keys, processes=PROCESSES, chunk_size=len(keys) // PROCESSES
+        ),
+        LARGE_KEYS,
+    )
+    print(f"boto3 generate_presigned_url:   {boto3_rate:>12,.0f} URL/s")
+    print(f"S3.presign_urls:                {bulk_rate:>12,.0f} URL/s ({bulk_rate / boto3_rate:.0f}x)")
+    print(f"S3.presign_urls ({PROCESSES} processes): {processes_rate:>12,.0f} URL/s ({processes_rate / boto3_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark delle classi dei servizi contro il server locale
+"""
+from __future__ import annotations
+
+import itertools
+
+from benchmarks.harness import BATCH, CONCURRENT, STREAMING, benchmark
+from simple_aws_wrapper.services.aws_lambda import Lambda
+from simple_aws_wrapper.services.dynamodb import DynamoDB
+from simple_aws_wrapper.services.parameter_store import ParameterStore
+from simple_aws_wrapper.services.s3 import S3
+from simple_aws_wrapper.services.secrets_manager import SecretsManager
+from simple_aws_wrapper.services.sqs import SQS
+
+SMALL_OBJECT = b"x" * 1024
+LARGE_OBJECT = b"x" * (8 * 1024 * 1024)
+
+
+def _s3_bucket(context, name: str, objects: dict | None = None):
+    s3 = S3()
+    bucket_name = context.unique(name)
+    s3.create_bucket(bucket_name)
+    for key, body in (objects or {}).items():
+        s3.put_object(body, bucket_name, key)
+
+    def teardown():
+        for key in s3.list_object_keys(bucket_name) if objects is not None else []:
+            s3.delete_object(bucket_name, key)
+        s3.client.delete_bucket(Bucket=bucket_name)
+
+    return s3, bucket_name, teardown
+
+
+@benchmark("s3.put_object.1kb")
+def s3_put_object(context):
+    s3, bucket_name, _ = _s3_bucket(context, "put")
+    counter = itertools.count()
+    return lambda: s3.put_object(SMALL_OBJECT, bucket_name, f"key-{next(counter)}")
+
+
+@benchmark("s3.get_file_content.1kb")
+def s3_get_file_content(context):
+    s3, bucket_name, teardown = _s3_bucket(context, "get", {"key": SMALL_OBJECT})
+    return lambda: s3.get_file_content(bucket_name, "key"), teardown
+
+
+@benchmark("s3.get_file_content.8mb", workload=STREAMING, iterations=20, warmup=2)
+def s3_get_large_file_content(context):
+    s3, bucket_name, teardown = _s3_bucket(context, "stream", {"key": LARGE_OBJECT})
+    return lambda: s3.get_file_content(bucket_name, "key"), teardown
+
+
+@benchmark("s3.list_object_keys.100", workload=BATCH, ops_per_call=100, iterations=50)
+def s3_list_object_keys(context):
+    s3, bucket_name, teardown = _s3_bucket(
+        context, "list", {f"key-{i}": SMALL_OBJECT for i in range(100)}
+    )
+    return lambda: s3.list_object_keys(bucket_name), teardown
+
+
+@benchmark("s3.get_file_content.concurrent", workload=CONCURRENT, concurrency=8, iterations=400)
+def s3_get_file_content_concurrent(context):
+    s3, bucket_name, teardown = _s3_bucket(context, "concurrent", {"key": SMALL_OBJECT})
+    return lambda: s3.get_file_content(bucket_name, "key"), teardown
+
+
+def _dynamodb_table(context, name: str, items: int = 0):
+    dynamodb = DynamoDB()
+    table_name = context.unique(name)
+    dynamodb.create_table(
+        table_name,
+        [{"AttributeName": "id", "KeyType": "HASH"}],
+        [{"AttributeName": "id", "AttributeType": "S"}],
+        {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
+    )
+    for i in range(items):
+        dynamodb.put_item(table_name, {"id": str(i), "value": f"value-{i}", "flag": i % 2 == 0})
+    return dynamodb, table_name, lambda: dynamodb.delete_table(table_name)
+
+
+@benchmark("dynamodb.put_item")
+def dynamodb_put_item(context):
+    dynamodb, table_name, teardown = _dynamodb_table(context, "put")
+    counter = itertools.count()
+    return lambda: dynamodb.put_item(table_name, {"id": str(next(counter)), "value": "v"}), teardown
+
+
+@benchmark("dynamodb.get_item")
+def dynamodb_get_item(context):
+    dynamodb, table_name, teardown = _dynamodb_table(context, "get", items=1)
+    return lambda: dynamodb.get_item(table_name, {"id": "0"}), teardown
+
+
+@benchmark("dynamodb.scan_filter_elements.500", workload=BATCH, ops_per_call=500, iterations=20)
+def dynamodb_scan_filter_elements(context):
+    dynamodb, table_name, teardown = _dynamodb_table(context, "scan", items=500)
+    return lambda: dynamodb.scan_filter_elements(table_name, "flag", True, "BOOL"), teardown
+
+
+@benchmark("dynamodb.get_item.concurrent", workload=CONCURRENT, concurrency=8, iterations=400)
+def dynamodb_get_item_concurrent(context):
+    dynamodb, table_name, teardown = _dynamodb_table(context, "concurrent", items=1)
+    return lambda: dynamodb.get_item(table_name, {"id": "0"}), teardown
+
+
+@benchmark("sqs.send_message")
+def sqs_send_message(context):
+    sqs = SQS()
+    queue_name = context.unique("queue")
+    queue_url = sqs.client.create_queue(QueueName=queue_name)["QueueUrl"]
+    return (
+        lambda: sqs.send_message(queue_name, "hello"),
+        lambda: sqs.client.delete_queue(QueueUrl=queue_url),
+    )
+
+
+def _parameters(context, count: int):
+    parameter_store = ParameterStore()
+    prefix = f"/{context.unique('parameters')}"
+    parameters = {f"{prefix}/{i}": str(i) for i in range(count)}
+    parameter_store.put_parameters(parameters)
+    return (
+        parameter_store,
+        list(parameters),
+        lambda: parameter_store.delete_parameters(list(parameters)),
+    )
+
+
+@benchmark("parameter_store.get_parameters_values_from_list.100", workload=BATCH, ops_per_call=100, iterations=50)
+def parameter_store_get_parameters(context):
+    parameter_store, names, teardown = _parameters(context, 100)
+    return lambda: parameter_store.get_parameters_values_from_list(names), teardown
+
+
+@benchmark("parameter_store.get_cached_parameters_values.100", workload=BATCH, ops_per_call=100)
+def parameter_store_get_cached_parameters(context):
+    parameter_store, names, teardown = _parameters(context, 100)
+    return lambda: parameter_store.get_cached_parameters_values(names), teardown
+
+
+def _secret(context):
+    secrets_manager = SecretsManager()
+    name = context.unique("secret")
+    secrets_manager.create_secret(name, "secret-value")
+    return secrets_manager, name, lambda: secrets_manager.client.delete_secret(
+        SecretId=name, ForceDeleteWithoutRecovery=True
+    )
+
+
+@benchmark("secrets_manager.get_secret_value.uncached")
+def secrets_manager_get_secret_value(context):
+    secrets_manager, name, teardown = _secret(context)
+    return lambda: secrets_manager.get_secret_value(name, use_cache=False), teardown
+
+
+@benchmark("secrets_manager.get_secret_value.cached")
+def secrets_manager_get_secret_value_cached(context):
+    secrets_manager, name, teardown = _secret(context)
+    return lambda: secrets_manager.get_secret_value(name), teardown
+
+
+@benchmark("lambda.dispatch_event", iterations=1000)
+def lambda_dispatch_event(context):
+    # misura la latenza lato chiamante (accodamento); gli invii falliti finiscono nella dead-letter
+    aws_lambda = Lambda()
+    aws_lambda.start_event_dispatcher(
+        max_queue_size=100000, max_retries=0, dead_letter_callback=lambda event, e: None
+    )
+    function_name = context.unique("function")
+    return (
+        lambda: aws_lambda.dispatch_event(function_name, {"value": 1}),
+        aws_lambda.stop_event_dispatcher,
+    )
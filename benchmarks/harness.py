@@ -0,0 +1,214 @@
+"""
+Harness dei benchmark, in stile asv: i benchmark vengono registrati con il decoratore @benchmark e
+misurati da run_benchmark, che riporta ops/sec, latenze p50/p99, memoria allocata e picco di RSS.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+SINGLE = "single"
+BATCH = "batch"
+STREAMING = "streaming"
+CONCURRENT = "concurrent"
+
+BENCHMARKS: list["Benchmark"] = []
+
+
+class Benchmark:
+    """
+    Benchmark registrato: setup(context) prepara le risorse e restituisce l'operazione da misurare
+    """
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable,
+        workload: str = SINGLE,
+        iterations: int = 200,
+        warmup: int = 10,
+        concurrency: int = 1,
+        ops_per_call: int = 1,
+    ):
+        self.name = name
+        self.setup = setup
+        self.workload = workload
+        self.iterations = iterations
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.ops_per_call = ops_per_call
+
+
+def benchmark(
+    name: str,
+    workload: str = SINGLE,
+    iterations: int = 200,
+    warmup: int = 10,
+    concurrency: int = 1,
+    ops_per_call: int = 1,
+):
+    """
+    Decoratore per registrare un benchmark. La funzione decorata riceve il contesto e restituisce l'operazione
+    da misurare (oppure una coppia (operazione, teardown))
+    :param name: nome del benchmark (es. "s3.put_object")
+    :param workload: tipo di carico (SINGLE, BATCH, STREAMING, CONCURRENT)
+    :param iterations: numero di invocazioni misurate
+    :param warmup: numero di invocazioni di riscaldamento non misurate
+    :param concurrency: numero di thread che eseguono le invocazioni
+    :param ops_per_call: numero di operazioni logiche eseguite da ogni invocazione (es. elementi di un batch)
+    """
+
+    def decorator(setup: Callable) -> Callable:
+        BENCHMARKS.append(
+            Benchmark(name, setup, workload, iterations, warmup, concurrency, ops_per_call)
+        )
+        return setup
+
+    return decorator
+
+
+def _percentile(values: list, percentile: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(percentile) - 1]
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # su macOS ru_maxrss è espresso in byte, su Linux in kilobyte
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_benchmark(bench: Benchmark, context) -> dict:
+    """
+    Esegue un benchmark e ne restituisce le misure
+    :param bench: benchmark da eseguire
+    :param context: contesto passato alla funzione di setup
+    :return: dizionario con le misure
+    """
+    prepared = bench.setup(context)
+    operation, teardown = prepared if isinstance(prepared, tuple) else (prepared, None)
+    try:
+        for _ in range(bench.warmup):
+            operation()
+
+        def timed(_) -> float:
+            start = time.perf_counter()
+            operation()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        if bench.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=bench.concurrency) as executor:
+                latencies = list(executor.map(timed, range(bench.iterations)))
+        else:
+            latencies = [timed(i) for i in range(bench.iterations)]
+        elapsed = time.perf_counter() - start
+
+        # passaggio separato per le allocazioni: tracemalloc rallenta l'esecuzione
+        allocation_iterations = max(1, bench.iterations // 10)
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for _ in range(allocation_iterations):
+                operation()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        if teardown is not None:
+            teardown()
+
+    latencies.sort()
+    return {
+        "name": bench.name,
+        "workload": bench.workload,
+        "iterations": bench.iterations,
+        "concurrency": bench.concurrency,
+        "ops_per_sec": bench.iterations * bench.ops_per_call / elapsed,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "alloc_peak_kb": (peak - baseline) / 1024,
+        "alloc_retained_kb_per_call": (current - baseline) / 1024 / allocation_iterations,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def environment() -> dict:
+    """
+    Restituisce le informazioni sull'ambiente di esecuzione da salvare con i risultati
+    :return: dizionario con versioni e piattaforma
+    """
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        from importlib.metadata import version
+
+        for package in ("simple_aws_wrapper", "boto3", "botocore", "moto"):
+            try:
+                info[package] = version(package)
+            except Exception:
+                info[package] = None
+    except ImportError:
+        pass
+    return info
+
+
+def save_results(results: list, path: str):
+    """
+    Salva i risultati in formato JSON
+    :param results: lista dei risultati di run_benchmark
+    :param path: file di destinazione
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+def compare(baseline_path: str, results: list, threshold: float = 0.1) -> list:
+    """
+    Confronta i risultati con quelli di una versione precedente
+    :param baseline_path: file JSON dei risultati di riferimento
+    :param results: risultati correnti
+    :param threshold: variazione relativa di ops/sec oltre la quale un benchmark è considerato una regressione
+    :return: lista di righe di report; quelle che iniziano con "REGRESSION" indicano una regressione
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {result["name"]: result for result in json.load(f)["results"]}
+    lines: list = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if previous is None:
+            lines.append(f"NEW        {result['name']}")
+            continue
+        change = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+        status = "REGRESSION" if change < -threshold else "OK        "
+        lines.append(
+            f"{status} {result['name']:<45} {previous['ops_per_sec']:>12,.1f} -> "
+            f"{result['ops_per_sec']:>12,.1f} ops/s ({change:+.1%})"
+        )
+    return lines
+
+
+def format_result(result: dict) -> str:
+    """
+    Formatta un risultato su una riga
+    :param result: risultato di run_benchmark
+    :return: riga di report
+    """
+    return (
+        f"{result['name']:<45} {result['workload']:<10} {result['ops_per_sec']:>12,.1f} ops/s  "
+        f"p50 {result['p50_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms  "
+        f"alloc {result['alloc_peak_kb']:>9.1f} KB  rss {result['peak_rss_kb'] / 1024:>7.1f} MB"
+    )
@@ -0,0 +1,62 @@
+"""
+Esecuzione dei benchmark.
+
+    PYTHONPATH=src python -m benchmarks.run [--filter s3] [--output results.json] [--compare baseline.json]
+
+Senza --endpoint-url viene avviato moto in-process; con --endpoint-url si può usare un server già avviato
+(es. localstack su http://localhost:4566). Con moto in-process le allocazioni misurate includono anche quelle
+del server: per misurare solo il client usare un server esterno.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from benchmarks import (  # noqa: F401 (registrazione dei benchmark)
+    bench_dynamodb_overhead,
+    bench_dynamodb_types,
+    bench_exceptions,
+    bench_s3_presign,
+    bench_services,
+)
+from benchmarks.harness import BENCHMARKS, compare, format_result, run_benchmark, save_results
+from benchmarks.server import start_moto_server
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="simple_aws_wrapper benchmarks")
+    parser.add_argument("--filter", default="", help="run only benchmarks whose name contains this string")
+    parser.add_argument("--endpoint-url", default=None, help="use an already running AWS stand-in")
+    parser.add_argument("--output", default=None, help="save results as JSON")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative ops/sec drop reported as regression")
+    args = parser.parse_args(argv)
+    # il log delle richieste del server locale e degli errori attesi altererebbe le misure
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    logging.getLogger("simple_aws_wrapper").setLevel(logging.ERROR)
+
+    context, stop = start_moto_server(args.endpoint_url)
+    results: list = []
+    try:
+        for bench in BENCHMARKS:
+            if args.filter not in bench.name:
+                continue
+            result = run_benchmark(bench, context)
+            results.append(result)
+            print(format_result(result), flush=True)
+    finally:
+        stop()
+    if args.output:
+        save_results(results, args.output)
+    if args.compare:
+        report = compare(args.compare, results, args.threshold)
+        print("\n".join(report))
+        if any(line.startswith("REGRESSION") for line in report):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
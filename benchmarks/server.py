@@ -0,0 +1,63 @@
+"""
+Avvio di moto come server locale in-process al posto di AWS
+"""
+from __future__ import annotations
+
+import socket
+import uuid
+
+from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.const import regions
+
+
+class BenchmarkContext:
+    """
+    Contesto condiviso dai benchmark: server moto in esecuzione e generatore di nomi univoci
+    """
+
+    def __init__(self, endpoint_url: str, region_name: str = regions.EU_WEST_1):
+        self.endpoint_url = endpoint_url
+        self.region_name = region_name
+        self.run_id = uuid.uuid4().hex[:8]
+
+    def unique(self, name: str) -> str:
+        """
+        Restituisce un nome univoco per la risorsa del benchmark
+        :param name: nome base
+        :return: nome univoco
+        """
+        return f"bench-{name}-{self.run_id}"
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_moto_server(endpoint_url: str | None = None):
+    """
+    Avvia moto in un thread del processo corrente (se endpoint_url non è indicato) e configura AWSConfig
+    :param endpoint_url: endpoint di un server già avviato (es. localstack); se None viene avviato moto
+    :return: coppia (BenchmarkContext, funzione di arresto)
+    """
+    stop = lambda: None
+    if endpoint_url is None:
+        try:
+            from moto.server import ThreadedMotoServer
+        except ImportError:
+            raise ImportError("benchmarks require moto[server]: pip install 'moto[server]'")
+        port = _free_port()
+        server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+        server.start()
+        stop = server.stop
+        endpoint_url = f"http://127.0.0.1:{port}"
+    context = BenchmarkContext(endpoint_url)
+    AWSConfig().set_region(context.region_name).set_endpoint_url(
+        endpoint_url
+    ).set_aws_access_key_id("test").set_aws_secret_access_key(
+        "test"
+    ).set_aws_session_token(
+        "test"
+    )
+    return context, stop
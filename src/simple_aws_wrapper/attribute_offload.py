@@ -0,0 +1,383 @@
+"""
+Spostamento su S3 degli attributi grandi degli elementi DynamoDB.
+
+Gli attributi la cui dimensione supera una soglia vengono scritti come oggetti S3 e nell'elemento resta solo un
+puntatore ({"__offloaded__": {"bucket": ..., "key": ..., "format": ..., "size": ...}}). In lettura i puntatori
+diventano OffloadedAttribute, il cui contenuto viene scaricato solo al primo accesso a value (o in parallelo per
+più elementi con AttributeOffload.resolve): get_item e scan restano piccoli e non superano il limite di 400 KB.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import re
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable
+
+from boto3.dynamodb.types import Binary
+
+from simple_aws_wrapper.dynamodb_types import deserialize, serialize
+
+if TYPE_CHECKING:
+    from simple_aws_wrapper.services.s3 import S3
+
+logger = logging.getLogger(__name__)
+
+POINTER = "__offloaded__"
+# formati del contenuto degli oggetti S3
+BINARY_FORMAT = "B"
+STRING_FORMAT = "S"
+JSON_FORMAT = "J"
+# soglia di default in byte
+DEFAULT_THRESHOLD = 64 * 1024
+# clausole, segnaposto dei valori e attributi di primo livello delle espressioni di aggiornamento
+_CLAUSE = re.compile(r"\b(SET|REMOVE|ADD|DELETE)\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r":\w+")
+_TOP_LEVEL_PATH = re.compile(r"#?\w+")
+# dimensione massima di un attributo chiave: la soglia deve superarla, così le chiavi non vengono mai spostate
+MAX_KEY_ATTRIBUTE_SIZE = 2048
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Object of type {type(value)} is not JSON serializable")
+
+
+def _json_object_hook(value: dict):
+    if len(value) == 1 and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+def _assigned_placeholders(update_expression: str, condition_expression=None) -> set[str]:
+    """
+    Restituisce i segnaposto assegnati direttamente a un attributo di primo livello nella clausola SET e non usati
+    altrove nelle espressioni
+    """
+    parts = _CLAUSE.split(update_expression)
+    assigned = []
+    for keyword, body in zip(parts[1::2], parts[2::2]):
+        if keyword.upper() != "SET":
+            continue
+        # le virgole degli argomenti delle funzioni producono frammenti senza "=", che vengono ignorati
+        for action in body.split(","):
+            path, _, operand = action.partition("=")
+            operand = operand.strip()
+            if _TOP_LEVEL_PATH.fullmatch(path.strip()) and _PLACEHOLDER.fullmatch(operand):
+                assigned.append(operand)
+    expressions = update_expression
+    if isinstance(condition_expression, str):
+        expressions += " " + condition_expression
+    used = Counter(_PLACEHOLDER.findall(expressions))
+    return {placeholder for placeholder in assigned if used[placeholder] == 1}
+
+
+def _is_pointer(value) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and POINTER in value
+
+
+def _encode(value, threshold: int) -> tuple[str, bytes] | None:
+    """
+    Restituisce formato e contenuto dell'attributo se la sua dimensione raggiunge la soglia, altrimenti None
+    """
+    if isinstance(value, (bytes, bytearray)):
+        fmt, payload = BINARY_FORMAT, bytes(value)
+    elif isinstance(value, Binary):
+        fmt, payload = BINARY_FORMAT, bytes(value.value)
+    elif isinstance(value, str):
+        # un carattere occupa al massimo 4 byte in UTF-8: le stringhe corte non vengono codificate
+        if len(value) * 4 < threshold:
+            return None
+        fmt, payload = STRING_FORMAT, value.encode("utf-8")
+    elif isinstance(value, (dict, list, tuple, set, frozenset)) and not _is_pointer(
+        value
+    ):
+        fmt = JSON_FORMAT
+        payload = json.dumps(serialize(value), default=_json_default).encode("utf-8")
+    else:
+        return None
+    return (fmt, payload) if len(payload) >= threshold else None
+
+
+def _decode(fmt: str, payload: bytes):
+    if fmt == BINARY_FORMAT:
+        return payload
+    if fmt == STRING_FORMAT:
+        return payload.decode("utf-8")
+    if fmt == JSON_FORMAT:
+        return deserialize(json.loads(payload, object_hook=_json_object_hook))
+    raise ValueError(f"Unknown offloaded attribute format {fmt!r}")
+
+
+class OffloadedAttribute:
+    """
+    Attributo spostato su S3. Il contenuto viene scaricato al primo accesso a value e poi memorizzato
+    """
+
+    def __init__(self, s3: S3, pointer: dict):
+        """
+        :param s3: istanza S3 da usare per il download
+        :param pointer: puntatore salvato nell'elemento ({"bucket", "key", "format", "size"})
+        """
+        self.bucket_name = pointer["bucket"]
+        self.object_key = pointer["key"]
+        self.format = pointer["format"]
+        self.size = int(pointer["size"])
+        self.__s3 = s3
+        self.__lock = threading.Lock()
+        self.__loaded = False
+        self.__value = None
+
+    @property
+    def loaded(self) -> bool:
+        """
+        True se il contenuto è già stato scaricato
+        """
+        return self.__loaded
+
+    @property
+    def value(self) -> Any:
+        """
+        Contenuto dell'attributo, scaricato da S3 al primo accesso
+        """
+        if not self.__loaded:
+            with self.__lock:
+                if not self.__loaded:
+                    self.__value = _decode(
+                        self.format,
+                        self.__s3.get_file_content(self.bucket_name, self.object_key),
+                    )
+                    self.__loaded = True
+        return self.__value
+
+    def to_pointer(self) -> dict:
+        """
+        Restituisce il puntatore da salvare nell'elemento
+        :return: dizionario {"__offloaded__": {...}}
+        """
+        return {
+            POINTER: {
+                "bucket": self.bucket_name,
+                "key": self.object_key,
+                "format": self.format,
+                "size": self.size,
+            }
+        }
+
+    def __repr__(self):
+        return (
+            f"OffloadedAttribute(s3://{self.bucket_name}/{self.object_key}, "
+            f"size={self.size}, loaded={self.__loaded})"
+        )
+
+
+class AttributeOffload:
+    """
+    Configurazione dello spostamento su S3 degli attributi grandi, da passare a DynamoDB(offload=...)
+    """
+
+    def __init__(
+        self,
+        s3: S3,
+        bucket_name: str,
+        threshold: int = DEFAULT_THRESHOLD,
+        prefix: str = "dynamodb-attributes/",
+        max_workers: int = 8,
+        delete_replaced: bool = False,
+    ):
+        """
+        :param s3: istanza S3 usata per scrivere e leggere gli attributi
+        :param bucket_name: bucket in cui salvare gli attributi
+        :param threshold: dimensione in byte oltre la quale un attributo viene spostato su S3
+        :param prefix: prefisso degli objectkey (seguito da <nome tabella>/<id>)
+        :param max_workers: numero massimo di upload/download paralleli
+        :param delete_replaced: se True put_item e delete_item cancellano gli oggetti S3 degli attributi sostituiti o
+        eliminati. Disattivato di default perché copy_table ed export_parquet copiano i puntatori e non gli oggetti
+        """
+        if threshold <= MAX_KEY_ATTRIBUTE_SIZE:
+            raise ValueError(
+                f"threshold must be greater than {MAX_KEY_ATTRIBUTE_SIZE} bytes (maximum key attribute size)"
+            )
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.threshold = threshold
+        self.prefix = prefix
+        self.max_workers = max_workers
+        self.delete_replaced = delete_replaced
+
+    def offload_items(
+        self, table_name: str, items: list[dict]
+    ) -> tuple[list[dict], list[str]]:
+        """
+        Sposta su S3 (in parallelo) gli attributi che superano la soglia e li sostituisce con un puntatore
+        :param table_name: nome della tabella, usato nell'objectkey
+        :param items: elementi da scrivere
+        :return: tupla (elementi con i puntatori, objectkey caricati)
+        """
+        uploads: list = []
+        output = [
+            {
+                name: self.__offload_value(table_name, value, uploads)
+                for name, value in item.items()
+            }
+            for item in items
+        ]
+        return output, self.__upload(uploads)
+
+    def offload_update(
+        self,
+        table_name: str,
+        update_expression: str,
+        values: dict,
+        condition_expression=None,
+    ) -> tuple[dict, list[str]]:
+        """
+        Sposta su S3 (in parallelo) i valori di un'espressione di aggiornamento che superano la soglia e vengono
+        assegnati direttamente a un attributo (SET a = :v o SET #a = :v), come farebbe put_item. I valori usati in
+        funzioni (es. list_append), in ADD/DELETE, negli attributi annidati o nella condizione restano invariati
+        :param table_name: nome della tabella, usato nell'objectkey
+        :param update_expression: espressione di aggiornamento
+        :param values: valori dei segnaposto (ExpressionAttributeValues)
+        :param condition_expression: eventuale condizione della richiesta
+        :return: tupla (valori con i puntatori, objectkey caricati)
+        """
+        placeholders = _assigned_placeholders(update_expression, condition_expression)
+        uploads: list = []
+        output = {
+            name: self.__offload_value(table_name, value, uploads)
+            if name in placeholders
+            else value
+            for name, value in values.items()
+        }
+        return output, self.__upload(uploads)
+
+    def __offload_value(self, table_name: str, value, uploads: list):
+        """
+        Restituisce il puntatore che sostituisce il valore se supera la soglia (aggiungendo l'upload a uploads),
+        altrimenti il valore stesso
+        """
+        if isinstance(value, OffloadedAttribute):
+            # attributo letto e riscritto: l'oggetto esistente viene riusato
+            return value.to_pointer()
+        encoded = _encode(value, self.threshold)
+        if encoded is None:
+            return value
+        fmt, payload = encoded
+        object_key = f"{self.prefix}{table_name}/{uuid.uuid4().hex}"
+        uploads.append((object_key, payload))
+        return {
+            POINTER: {
+                "bucket": self.bucket_name,
+                "key": object_key,
+                "format": fmt,
+                "size": len(payload),
+            }
+        }
+
+    def __upload(self, uploads: list) -> list[str]:
+        """
+        Carica gli oggetti in parallelo; se un upload fallisce quelli già caricati vengono cancellati
+        :return: objectkey caricati
+        """
+        object_keys = [object_key for object_key, _ in uploads]
+        try:
+            self.__run(
+                lambda upload: self.s3.put_object(
+                    upload[1], self.bucket_name, upload[0]
+                ),
+                uploads,
+            )
+        except Exception:
+            self.delete_objects(object_keys)
+            raise
+        return object_keys
+
+    def load_item(self, item: dict) -> dict:
+        """
+        Sostituisce i puntatori di un elemento letto con OffloadedAttribute (senza scaricarne il contenuto)
+        :param item: elemento letto da DynamoDB
+        :return: elemento
+        """
+        for name, value in item.items():
+            if _is_pointer(value):
+                item[name] = OffloadedAttribute(self.s3, value[POINTER])
+        return item
+
+    @staticmethod
+    def dump_item(item: dict) -> dict:
+        """
+        Sostituisce gli OffloadedAttribute di un elemento con i rispettivi puntatori
+        :param item: elemento
+        :return: nuovo elemento con i puntatori
+        """
+        return {
+            name: value.to_pointer() if isinstance(value, OffloadedAttribute) else value
+            for name, value in item.items()
+        }
+
+    def resolve(self, items: list[dict]) -> list[dict]:
+        """
+        Scarica in parallelo gli attributi spostati su S3 di più elementi e li sostituisce con il loro contenuto
+        :param items: elementi letti da DynamoDB
+        :return: gli stessi elementi, con i valori al posto degli OffloadedAttribute
+        """
+        attributes = [
+            (item, name, value)
+            for item in items
+            for name, value in item.items()
+            if isinstance(value, OffloadedAttribute)
+        ]
+        self.__run(lambda attribute: attribute[2].value, attributes)
+        for item, name, value in attributes:
+            item[name] = value.value
+        return items
+
+    @staticmethod
+    def object_keys(item: dict | None) -> set[tuple[str, str]]:
+        """
+        Restituisce gli oggetti S3 referenziati da un elemento
+        :param item: elemento (con puntatori o OffloadedAttribute)
+        :return: insieme di tuple (bucket, objectkey)
+        """
+        keys = set()
+        for value in (item or {}).values():
+            if isinstance(value, OffloadedAttribute):
+                keys.add((value.bucket_name, value.object_key))
+            elif _is_pointer(value):
+                keys.add((value[POINTER]["bucket"], value[POINTER]["key"]))
+        return keys
+
+    def delete_objects(self, object_keys) -> None:
+        """
+        Cancella gli oggetti S3 indicati. Gli errori vengono solo registrati: un oggetto non cancellato non rende
+        inconsistente la tabella
+        :param object_keys: objectkey del bucket configurato o tuple (bucket, objectkey)
+        """
+        object_keys = [
+            key if isinstance(key, tuple) else (self.bucket_name, key)
+            for key in object_keys
+        ]
+        try:
+            self.__run(lambda key: self.s3.delete_object(*key), object_keys)
+        except Exception:
+            logger.warning(
+                "Error deleting offloaded attributes",
+                extra={"object_keys": object_keys},
+                exc_info=True,
+            )
+
+    def __run(self, function: Callable, arguments: list) -> None:
+        if len(arguments) <= 1 or self.max_workers <= 1:
+            for argument in arguments:
+                function(argument)
+            return
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(arguments))
+        ) as executor:
+            # list() propaga la prima eccezione
+            list(executor.map(function, arguments))
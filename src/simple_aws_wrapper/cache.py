@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class CacheEntry:
+    """
+    Elemento della cache con le relative scadenze
+    """
+
+    __slots__ = ("value", "expires_at", "stale_until")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+    def is_fresh(self, now: float) -> bool:
+        """
+        Restituisce se l'elemento è ancora valido
+        :param now: istante attuale (time.monotonic())
+        :return: True se l'elemento non è scaduto
+        """
+        return now < self.expires_at
+
+    def is_usable(self, now: float) -> bool:
+        """
+        Restituisce se l'elemento può ancora essere restituito (valido o scaduto ma entro la finestra di stale)
+        :param now: istante attuale (time.monotonic())
+        :return: True se l'elemento è utilizzabile
+        """
+        return now < self.stale_until
+
+
+class TTLCache:
+    """
+    Cache in memoria thread-safe con TTL per chiave, finestra stale-while-revalidate ed eventuale dimensione massima
+    (gli elementi usati meno di recente vengono rimossi per primi)
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 60.0,
+        default_stale_ttl: float = 0.0,
+        max_size: int | None = None,
+    ):
+        """
+        :param default_ttl: durata (in secondi) di validità degli elementi
+        :param default_stale_ttl: durata (in secondi) oltre il TTL per cui un elemento scaduto può essere restituito
+        mentre viene aggiornato
+        :param max_size: numero massimo di elementi (None per nessun limite)
+        """
+        self.default_ttl = default_ttl
+        self.default_stale_ttl = default_stale_ttl
+        self.max_size = max_size
+        self._data: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._lock = threading.RLock()
+        self._loading: dict[Hashable, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry.is_fresh(time.monotonic())
+
+    def keys(self) -> list:
+        """
+        Restituisce le chiavi presenti in cache (comprese quelle scadute)
+        :return: lista delle chiavi
+        """
+        with self._lock:
+            return list(self._data)
+
+    def get_entry(self, key: Hashable) -> CacheEntry | None:
+        """
+        Restituisce l'elemento della cache, senza verificarne la scadenza
+        :param key: chiave
+        :return: CacheEntry o None se assente
+        """
+        if self.max_size is None:
+            return self._data.get(key)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Restituisce il valore associato alla chiave se non scaduto
+        :param key: chiave
+        :param default: valore restituito se la chiave è assente o scaduta
+        :return: valore in cache
+        """
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh(time.monotonic()):
+            return default
+        return entry.value
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[CacheEntry | None], Any],
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+    ) -> Any:
+        """
+        Restituisce il valore associato alla chiave; se assente o scaduto lo carica tramite loader. Le richieste
+        concorrenti per la stessa chiave attendono un unico caricamento (single-flight)
+        :param key: chiave
+        :param loader: funzione che riceve l'elemento scaduto (o None) e restituisce il nuovo valore
+        :param ttl: durata di validità in secondi (default della cache se None)
+        :param stale_ttl: finestra di stale in secondi (default della cache se None)
+        :return: valore in cache
+        """
+        entry = self.get_entry(key)
+        if entry is not None and entry.is_fresh(time.monotonic()):
+            return entry.value
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self.get_entry(key)
+            if entry is not None and entry.is_fresh(time.monotonic()):
+                return entry.value
+            try:
+                value = loader(entry)
+                self.set(key, value, ttl, stale_ttl)
+                return value
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+    ):
+        """
+        Inserisce o aggiorna un valore in cache
+        :param key: chiave
+        :param value: valore
+        :param ttl: durata di validità in secondi (default della cache se None)
+        :param stale_ttl: finestra di stale in secondi (default della cache se None)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.default_stale_ttl if stale_ttl is None else stale_ttl
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = CacheEntry(value, expires_at, expires_at + stale_ttl)
+            if self.max_size is not None:
+                self._data.move_to_end(key)
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """
+        Rimuove una chiave dalla cache
+        :param key: chiave
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Svuota la cache
+        """
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,214 @@
+"""
+Checksum dei trasferimenti S3 (flexible checksums): CRC32, CRC32C, SHA1 e SHA256.
+
+I checksum vengono calcolati in modo incrementale sui blocchi trasferiti, senza una seconda lettura dei dati. Per gli
+upload multipart S3 usa un checksum composito: il checksum della concatenazione dei checksum delle parti, seguito
+da "-<numero di parti>". Il CRC32C usa awscrt se installato (pip install simple_aws_wrapper[crt]), altrimenti
+un'implementazione Python sensibilmente più lenta.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    from awscrt import checksums as _crt_checksums
+except ImportError:
+    _crt_checksums = None
+
+CRC32 = "CRC32"
+CRC32C = "CRC32C"
+SHA1 = "SHA1"
+SHA256 = "SHA256"
+ALGORITHMS = (CRC32C, CRC32, SHA256, SHA1)
+
+
+def _make_crc32c_table() -> list:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC32C_TABLE = _make_crc32c_table()
+
+
+def _crc32c(data: bytes, crc: int) -> int:
+    if _crt_checksums is not None:
+        return _crt_checksums.crc32c(data, crc)
+    table = _CRC32C_TABLE
+    crc ^= 0xFFFFFFFF
+    for byte in data:
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+class _Crc:
+    def __init__(self, function):
+        self.__function = function
+        self.__crc = 0
+
+    def update(self, data: bytes):
+        self.__crc = self.__function(data, self.__crc) & 0xFFFFFFFF
+
+    def digest(self) -> bytes:
+        return self.__crc.to_bytes(4, byteorder="big")
+
+
+def _new_hash(algorithm: str):
+    if algorithm == CRC32:
+        return _Crc(zlib.crc32)
+    if algorithm == CRC32C:
+        return _Crc(_crc32c)
+    if algorithm == SHA256:
+        return hashlib.sha256()
+    if algorithm == SHA1:
+        return hashlib.sha1()
+    raise ValueError(
+        f"Unsupported checksum algorithm {algorithm!r}: use one of {', '.join(ALGORITHMS)}"
+    )
+
+
+class Checksum:
+    """
+    Checksum incrementale
+    """
+
+    def __init__(self, algorithm: str):
+        """
+        :param algorithm: algoritmo (CRC32, CRC32C, SHA1, SHA256)
+        """
+        self.algorithm = algorithm.upper()
+        self.__hash = _new_hash(self.algorithm)
+
+    def update(self, data: bytes) -> Checksum:
+        """
+        Aggiunge dei dati al checksum
+        :param data: blocco di dati
+        :return: il checksum stesso
+        """
+        self.__hash.update(data)
+        return self
+
+    def digest(self) -> bytes:
+        """
+        :return: checksum in byte
+        """
+        return self.__hash.digest()
+
+    def b64digest(self) -> str:
+        """
+        :return: checksum in base64, nel formato degli header x-amz-checksum-*
+        """
+        return base64.b64encode(self.digest()).decode("ascii")
+
+
+def compute(algorithm: str, data: bytes) -> str:
+    """
+    Calcola il checksum in base64 di un blocco di dati
+    :param algorithm: algoritmo
+    :param data: dati
+    :return: checksum in base64
+    """
+    return Checksum(algorithm).update(data).b64digest()
+
+
+def composite_checksum(algorithm: str, part_digests: list[bytes]) -> str:
+    """
+    Calcola il checksum composito di un oggetto multipart a partire dai checksum delle parti
+    :param algorithm: algoritmo
+    :param part_digests: checksum (in byte) delle parti, in ordine
+    :return: checksum nel formato di S3 ("<base64>-<numero di parti>")
+    """
+    return f"{compute(algorithm, b''.join(part_digests))}-{len(part_digests)}"
+
+
+def parameter_name(algorithm: str) -> str:
+    """
+    :param algorithm: algoritmo
+    :return: nome del parametro boto3 del checksum (es. "ChecksumSHA256")
+    """
+    return f"Checksum{algorithm.upper()}"
+
+
+def find_checksum(response: dict) -> tuple[str, str] | tuple[None, None]:
+    """
+    Restituisce il checksum presente in una risposta di S3 (get_object, head_object, ...)
+    :param response: risposta di boto3
+    :return: tupla (algoritmo, checksum) o (None, None) se la risposta non contiene checksum
+    """
+    for algorithm in ALGORITHMS:
+        value = response.get(parameter_name(algorithm))
+        if value:
+            return algorithm, value
+    return None, None
+
+
+class StreamChecksum:
+    """
+    Checksum calcolato su un thread separato mentre i dati vengono letti o inviati: il calcolo sul blocco corrente
+    si sovrappone all'I/O del blocco successivo (hashlib, zlib e awscrt rilasciano il GIL). Con part_size vengono
+    calcolati anche i checksum delle singole parti, per il checksum composito degli oggetti multipart
+    """
+
+    def __init__(self, algorithm: str, part_sizes: list[int] | None = None):
+        """
+        :param algorithm: algoritmo
+        :param part_sizes: eventuali dimensioni delle parti dell'oggetto, in ordine
+        """
+        self.algorithm = algorithm
+        self.part_digests: list[bytes] = []
+        self.__part_sizes = list(part_sizes or [])
+        self.__remaining = self.__part_sizes.pop(0) if self.__part_sizes else None
+        self.__checksum = Checksum(algorithm)
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+        self.__pending: Future | None = None
+
+    def update(self, data: bytes):
+        """
+        Accoda un blocco di dati. Resta in coda al massimo un blocco, così la memoria usata è limitata
+        :param data: blocco di dati
+        """
+        if self.__pending is not None:
+            self.__pending.result()
+        self.__pending = self.__executor.submit(self.__update, data)
+
+    def finish(self) -> str:
+        """
+        Attende il calcolo dei blocchi in coda e restituisce il checksum
+        :return: checksum in base64 (composito "<base64>-<numero di parti>" se sono state indicate le parti)
+        """
+        try:
+            if self.__pending is not None:
+                self.__pending.result()
+        finally:
+            self.__executor.shutdown(wait=False)
+        if self.__remaining is None:
+            return self.__checksum.b64digest()
+        self.part_digests.append(self.__checksum.digest())
+        return composite_checksum(self.algorithm, self.part_digests)
+
+    def abort(self):
+        """
+        Interrompe il calcolo senza attendere il blocco in corso (es. se la lettura dei dati è fallita)
+        """
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    def __update(self, data: bytes):
+        if self.__remaining is None:
+            self.__checksum.update(data)
+            return
+        view = memoryview(data)
+        while len(view) > self.__remaining and self.__part_sizes:
+            self.__checksum.update(view[: self.__remaining])
+            view = view[self.__remaining :]
+            self.part_digests.append(self.__checksum.digest())
+            self.__checksum = Checksum(self.algorithm)
+            self.__remaining = self.__part_sizes.pop(0)
+        self.__checksum.update(view)
+        self.__remaining -= len(view)
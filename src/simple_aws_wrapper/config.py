@@ -1,6 +1,65 @@
 from __future__ import annotations
 
-from simple_aws_wrapper.const.regions import Region
+import dataclasses
+import threading
+from contextlib import contextmanager
+
+from simple_aws_wrapper.const.regions import ALLOWED_REGIONS, Region
+from simple_aws_wrapper.credentials import CredentialsProvider
+from simple_aws_wrapper.exceptions.exceptions import MissingConfigurationException
+
+
+@dataclasses.dataclass(frozen=True)
+class AWSConfigSnapshot:
+    """
+    Fotografia immutabile (e hashable) della configurazione AWS. Viene acquisita una sola volta dai servizi e usata
+    come chiave per la cache dei client
+    """
+
+    region_name: str
+    endpoint_url: str | None = None
+    aws_access_key_id: str | None = None
+    # esclusi da repr: lo snapshot è usato come chiave di pool e cache e può finire nei log
+    aws_secret_access_key: str | None = dataclasses.field(default=None, repr=False)
+    aws_session_token: str | None = dataclasses.field(default=None, repr=False)
+    credentials_provider: CredentialsProvider | None = None
+
+    def __post_init__(self):
+        if self.region_name not in ALLOWED_REGIONS:
+            raise ValueError(f"Region {self.region_name} is not allowed")
+
+    def replace(
+        self, region: Region | str | None = None, endpoint_url: str | None = None
+    ) -> "AWSConfigSnapshot":
+        """
+        Restituisce una copia della configurazione con regione e/o endpoint diversi
+        :param region: eventuale regione da usare al posto di quella della configurazione
+        :param endpoint_url: eventuale endpoint da usare al posto di quello della configurazione
+        :return: AWSConfigSnapshot
+        """
+        changes = {}
+        if region is not None:
+            region_name = (
+                region.get_region_name() if isinstance(region, Region) else region
+            )
+            if region_name != self.region_name:
+                changes["region_name"] = region_name
+        if endpoint_url and endpoint_url != self.endpoint_url:
+            changes["endpoint_url"] = endpoint_url
+        return dataclasses.replace(self, **changes) if changes else self
+
+    def to_dict(self) -> dict:
+        """
+        Restituisce la configurazione come dizionario
+        :return: configurazione come dizionario
+        """
+        return {
+            "region_name": self.region_name,
+            "endpoint_url": self.endpoint_url,
+            "aws_access_key_id": self.aws_access_key_id,
+            "aws_secret_access_key": self.aws_secret_access_key,
+            "aws_session_token": self.aws_session_token,
+        }
 
 
 class AWSConfig:
@@ -14,6 +73,12 @@ class AWSConfig:
     __aws_secret_access_key = None
     __aws_access_key_id = None
     __aws_session_token = None
+    __credentials_provider: CredentialsProvider | None = None
+    # snapshot della configurazione corrente, ricreato alla prima lettura dopo una modifica
+    __snapshot: AWSConfigSnapshot | None = None
+    __snapshot_lock = threading.Lock()
+    # eventuale configurazione impostata per il thread corrente
+    __local = threading.local()
 
     def __new__(cls):
         if not hasattr(cls, "instance"):
@@ -25,7 +90,7 @@ class AWSConfig:
         Restituisce se esiste la configurazione minima per AWS
         :return: True se esiste, False altrimenti
         """
-        return self.__configured
+        return self.__configured or getattr(self.__local, "snapshot", None) is not None
 
     def set_region(self, region: Region):
         """
@@ -36,8 +101,10 @@ class AWSConfig:
             region = Region(region)
         if region == "":
             raise ValueError("region cannot be empty")
-        self.__region = region
-        self.__configured = True
+        with self.__snapshot_lock:
+            self.__region = region
+            self.__snapshot = None
+            self.__configured = True
         return self
 
     def set_endpoint_url(self, endpoint_url: str | None):
@@ -51,7 +118,9 @@ class AWSConfig:
             raise TypeError("endpoint_url must be a string")
         if endpoint_url == "":
             raise ValueError("endpoint_url cannot be empty")
-        self.__endpoint_url = endpoint_url
+        with self.__snapshot_lock:
+            self.__endpoint_url = endpoint_url
+            self.__snapshot = None
         return self
 
     def set_aws_access_key_id(self, aws_access_key_id: str | None):
@@ -63,7 +132,9 @@ class AWSConfig:
             raise ValueError("aws_access_key_id is required")
         if not isinstance(aws_access_key_id, str):
             raise TypeError("aws_access_key_id must be a string")
-        self.__aws_access_key_id = aws_access_key_id
+        with self.__snapshot_lock:
+            self.__aws_access_key_id = aws_access_key_id
+            self.__snapshot = None
         return self
 
     def set_aws_secret_access_key(self, aws_secret_access_key: str | None):
@@ -75,7 +146,9 @@ class AWSConfig:
             raise ValueError("aws_secret_access_key is required")
         if not isinstance(aws_secret_access_key, str):
             raise TypeError("aws_secret_access_key must be a string")
-        self.__aws_secret_access_key = aws_secret_access_key
+        with self.__snapshot_lock:
+            self.__aws_secret_access_key = aws_secret_access_key
+            self.__snapshot = None
         return self
 
     def set_aws_session_token(self, aws_session_token: str | None):
@@ -87,9 +160,33 @@ class AWSConfig:
             raise ValueError("aws_session_token is required")
         if not isinstance(aws_session_token, str):
             raise TypeError("aws_session_token must be a string")
-        self.__aws_session_token = aws_session_token
+        with self.__snapshot_lock:
+            self.__aws_session_token = aws_session_token
+            self.__snapshot = None
         return self
 
+    def set_credentials_provider(self, credentials_provider: CredentialsProvider | None):
+        """
+        Imposta il fornitore delle credenziali utilizzato per il ResourceManager, al posto delle credenziali statiche
+        :param credentials_provider: fornitore delle credenziali (es. AssumeRoleCredentialsProvider), None per
+        tornare alle credenziali statiche
+        """
+        if credentials_provider is not None and not isinstance(
+            credentials_provider, CredentialsProvider
+        ):
+            raise TypeError("credentials_provider must be a CredentialsProvider")
+        with self.__snapshot_lock:
+            self.__credentials_provider = credentials_provider
+            self.__snapshot = None
+        return self
+
+    def get_credentials_provider(self) -> CredentialsProvider | None:
+        """
+        Restituisce il fornitore delle credenziali utilizzato per il ResourceManager
+        :return: fornitore delle credenziali o None se vengono usate le credenziali statiche
+        """
+        return self.__credentials_provider
+
     def get_aws_access_key_id(self) -> str | None:
         """
         Restituisce l'access key id utilizzato per il ResourceManager
@@ -132,15 +229,56 @@ class AWSConfig:
         """
         return self.__region.get_region_name()
 
-    def to_dict(self) -> dict:
+    def snapshot(
+        self, region: Region | str | None = None, endpoint_url: str | None = None
+    ) -> AWSConfigSnapshot:
+        """
+        Restituisce la configurazione corrente come AWSConfigSnapshot immutabile. Se per il thread corrente è stata
+        impostata una configurazione tramite use(), viene restituita quella
+        :param region: eventuale regione da usare al posto di quella configurata
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato
+        :return: AWSConfigSnapshot
+        """
+        snapshot = getattr(self.__local, "snapshot", None)
+        if snapshot is None:
+            snapshot = self.__snapshot
+        if snapshot is None:
+            if not self.__configured:
+                raise MissingConfigurationException
+            with self.__snapshot_lock:
+                snapshot = self.__snapshot = AWSConfigSnapshot(
+                    region_name=self.__region.get_region_name(),
+                    endpoint_url=self.__endpoint_url,
+                    aws_access_key_id=self.__aws_access_key_id,
+                    aws_secret_access_key=self.__aws_secret_access_key,
+                    aws_session_token=self.__aws_session_token,
+                    credentials_provider=self.__credentials_provider,
+                )
+        if region is None and endpoint_url is None:
+            return snapshot
+        return snapshot.replace(region, endpoint_url)
+
+    @contextmanager
+    def use(self, snapshot: AWSConfigSnapshot):
+        """
+        Imposta la configurazione da usare nel thread corrente per la durata del blocco with, senza modificare
+        quella globale (ad esempio per usare un profilo diverso in ogni thread di un pool)
+        :param snapshot: configurazione da usare
+        """
+        previous = getattr(self.__local, "snapshot", None)
+        self.__local.snapshot = snapshot
+        try:
+            yield snapshot
+        finally:
+            self.__local.snapshot = previous
+
+    def to_dict(
+        self, region: Region | str | None = None, endpoint_url: str | None = None
+    ) -> dict:
         """
         Restituisce la configurazione AWS come dizionario
+        :param region: eventuale regione da usare al posto di quella configurata
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato
         :return: configurazione AWS come dizionario
         """
-        return {
-            "region_name": self.__region.get_region_name(),
-            "endpoint_url": self.__endpoint_url,
-            "aws_access_key_id": self.__aws_access_key_id,
-            "aws_secret_access_key": self.__aws_secret_access_key,
-            "aws_session_token": self.__aws_session_token,
-        }
\ No newline at end of file
+        return self.snapshot(region, endpoint_url).to_dict()
@@ -2,4 +2,6 @@ S3 = "s3"
 DYNAMO_DB = "dynamodb"
 SQS = "sqs"
 SSM = "ssm"
-SECRETS_MANAGER = "secretsmanager"
\ No newline at end of file
+SECRETS_MANAGER = "secretsmanager"
+LAMBDA = "lambda"
+STS = "sts"
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+import uuid
+from abc import ABC, abstractmethod
+
+import boto3
+import botocore.session
+from botocore.credentials import (
+    CredentialProvider,
+    CredentialResolver,
+    Credentials,
+    ReadOnlyCredentials,
+)
+
+from simple_aws_wrapper.const import services
+
+logger = logging.getLogger(__name__)
+
+
+class _ProviderCredentials(Credentials):
+    """
+    Credenziali botocore che, ad ogni firma, leggono quelle correnti del provider. L'oggetto è condiviso da tutti i
+    client creati con il provider: quando le credenziali vengono rinnovate, i client esistenti usano le nuove senza
+    essere ricreati (mantenendo il proprio pool di connessioni)
+    """
+
+    def __init__(self, provider: CredentialsProvider):
+        # il costruttore di Credentials non viene chiamato: access_key, secret_key e token sono letti dal provider
+        self.__provider = provider
+        self.method = type(provider).__name__
+        self.account_id = None
+
+    @property
+    def access_key(self) -> str:
+        return self.get_frozen_credentials().access_key
+
+    @property
+    def secret_key(self) -> str:
+        return self.get_frozen_credentials().secret_key
+
+    @property
+    def token(self) -> str | None:
+        return self.get_frozen_credentials().token
+
+    def get_frozen_credentials(self) -> ReadOnlyCredentials:
+        return self.__provider.get_frozen_credentials()
+
+
+class _CredentialsHook(CredentialProvider):
+    """
+    Fornitore di credenziali registrato nella sessione botocore al posto della catena di default
+    """
+
+    METHOD = "simple-aws-wrapper"
+    CANONICAL_NAME = "simple-aws-wrapper"
+
+    def __init__(self, provider: CredentialsProvider):
+        super().__init__()
+        self.__provider = provider
+
+    def load(self) -> Credentials:
+        return self.__provider.get_credentials()
+
+
+class CredentialsProvider(ABC):
+    """
+    Fornitore di credenziali AWS. Le credenziali vengono esposte come un unico oggetto botocore Credentials condiviso
+    da tutti i client creati con il provider, che legge ad ogni firma le credenziali correnti
+    """
+
+    # secondi prima della scadenza entro cui le credenziali vengono rinnovate sul thread della richiesta, se non sono
+    # già state rinnovate (es. in background)
+    MANDATORY_REFRESH_SECONDS = 60.0
+
+    def __init__(self):
+        self.__credentials = _ProviderCredentials(self)
+        self.__frozen: ReadOnlyCredentials | None = None
+        self.__expiry_time: datetime.datetime | None = None
+        self.__lock = threading.Lock()
+
+    @abstractmethod
+    def fetch_credentials(self) -> dict:
+        """
+        Recupera nuove credenziali
+        :return: dizionario {"access_key", "secret_key", "token", "expiry_time"} (expiry_time in formato ISO 8601)
+        """
+
+    def get_credentials(self) -> Credentials:
+        """
+        Restituisce le credenziali condivise, recuperandole alla prima richiesta
+        :return: botocore Credentials
+        """
+        self.get_frozen_credentials()
+        return self.__credentials
+
+    def get_frozen_credentials(self) -> ReadOnlyCredentials:
+        """
+        Restituisce le credenziali correnti. Vengono recuperate sul thread chiamante solo alla prima richiesta o se
+        mancano meno di MANDATORY_REFRESH_SECONDS secondi alla scadenza
+        :return: ReadOnlyCredentials
+        """
+        frozen = self.__frozen
+        if frozen is not None and not self.__expiring():
+            return frozen
+        with self.__lock:
+            if self.__frozen is None or self.__expiring():
+                self.__update(self._refresh())
+            return self.__frozen
+
+    def refresh(self):
+        """
+        Rinnova subito le credenziali
+        """
+        metadata = self._refresh()
+        with self.__lock:
+            self.__update(metadata)
+
+    def get_session(self, region_name: str | None = None) -> boto3.Session:
+        """
+        Restituisce una sessione boto3 che usa le credenziali del provider
+        :param region_name: regione aws della sessione
+        :return: boto3.Session
+        """
+        session = botocore.session.Session()
+        session.register_component(
+            "credential_provider", CredentialResolver([_CredentialsHook(self)])
+        )
+        return boto3.Session(botocore_session=session, region_name=region_name)
+
+    def _refresh(self) -> dict:
+        return self.fetch_credentials()
+
+    def __expiring(self) -> bool:
+        remaining = (
+            self.__expiry_time - datetime.datetime.now(datetime.timezone.utc)
+        ).total_seconds()
+        return remaining < self.MANDATORY_REFRESH_SECONDS
+
+    def __update(self, metadata: dict):
+        self.__frozen = ReadOnlyCredentials(
+            metadata["access_key"], metadata["secret_key"], metadata["token"]
+        )
+        self.__expiry_time = datetime.datetime.fromisoformat(metadata["expiry_time"])
+
+
+class StaticCredentialsProvider(CredentialsProvider):
+    """
+    Fornitore di credenziali statiche (access key, secret key ed eventuale session token)
+    """
+
+    def __init__(
+        self,
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        aws_session_token: str | None = None,
+    ):
+        """
+        :param aws_access_key_id: access key id
+        :param aws_secret_access_key: secret access key
+        :param aws_session_token: eventuale session token
+        """
+        super().__init__()
+        self.aws_access_key_id = aws_access_key_id
+        self.aws_secret_access_key = aws_secret_access_key
+        self.aws_session_token = aws_session_token
+
+    def fetch_credentials(self) -> dict:
+        # credenziali senza scadenza: non vengono mai rinnovate
+        expiry_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            days=365 * 100
+        )
+        return {
+            "access_key": self.aws_access_key_id,
+            "secret_key": self.aws_secret_access_key,
+            "token": self.aws_session_token,
+            "expiry_time": expiry_time.isoformat(),
+        }
+
+
+class AssumeRoleCredentialsProvider(CredentialsProvider):
+    """
+    Fornitore di credenziali temporanee ottenute tramite STS AssumeRole. La sessione del ruolo viene memorizzata e
+    rinnovata in background prima della scadenza, così che le richieste non attendano mai la chiamata a STS
+    """
+
+    def __init__(
+        self,
+        role_arn: str,
+        role_session_name: str | None = None,
+        duration_seconds: int = 3600,
+        external_id: str | None = None,
+        region_name: str | None = None,
+        sts_endpoint_url: str | None = None,
+        aws_access_key_id: str | None = None,
+        aws_secret_access_key: str | None = None,
+        aws_session_token: str | None = None,
+        refresh_margin: float = 600.0,
+        background_refresh: bool = True,
+    ):
+        """
+        :param role_arn: arn del ruolo da assumere
+        :param role_session_name: nome della sessione del ruolo (generato se None)
+        :param duration_seconds: durata in secondi delle credenziali temporanee
+        :param external_id: eventuale external id richiesto dal ruolo
+        :param region_name: regione del client STS (us-east-1 se None)
+        :param sts_endpoint_url: eventuale endpoint di STS (ad esempio un'istanza locale per i test)
+        :param aws_access_key_id: eventuale access key id delle credenziali di partenza
+        :param aws_secret_access_key: eventuale secret access key delle credenziali di partenza
+        :param aws_session_token: eventuale session token delle credenziali di partenza
+        :param refresh_margin: secondi prima della scadenza in cui le credenziali vengono rinnovate in background
+        (deve superare MANDATORY_REFRESH_SECONDS)
+        :param background_refresh: se False le credenziali vengono rinnovate solo al primo utilizzo vicino alla
+        scadenza, sul thread della richiesta
+        """
+        if background_refresh and refresh_margin <= self.MANDATORY_REFRESH_SECONDS:
+            raise ValueError(
+                f"refresh_margin must be greater than {self.MANDATORY_REFRESH_SECONDS} seconds"
+            )
+        super().__init__()
+        self.role_arn = role_arn
+        self.role_session_name = (
+            role_session_name or f"simple-aws-wrapper-{uuid.uuid4().hex[:16]}"
+        )
+        self.duration_seconds = duration_seconds
+        self.external_id = external_id
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.refresh_count = 0
+        self.__sts = boto3.Session().client(
+            services.STS,
+            region_name=region_name or "us-east-1",
+            endpoint_url=sts_endpoint_url,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            aws_session_token=aws_session_token,
+        )
+        self.__timer: threading.Timer | None = None
+        self.__timer_lock = threading.Lock()
+        self.__closed = False
+
+    def fetch_credentials(self) -> dict:
+        kwargs = {
+            "RoleArn": self.role_arn,
+            "RoleSessionName": self.role_session_name,
+            "DurationSeconds": self.duration_seconds,
+        }
+        if self.external_id is not None:
+            kwargs["ExternalId"] = self.external_id
+        credentials = self.__sts.assume_role(**kwargs)["Credentials"]
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat(),
+        }
+
+    def close(self):
+        """
+        Interrompe il rinnovo in background delle credenziali
+        """
+        with self.__timer_lock:
+            self.__closed = True
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+    def _refresh(self) -> dict:
+        metadata = self.fetch_credentials()
+        self.refresh_count += 1
+        logger.debug(
+            "Assumed role credentials refreshed",
+            extra={"role_arn": self.role_arn, "expiry_time": metadata["expiry_time"]},
+        )
+        if self.background_refresh:
+            self.__schedule_refresh(metadata["expiry_time"])
+        return metadata
+
+    def __schedule_refresh(self, expiry_time: str):
+        """
+        Pianifica il rinnovo delle credenziali refresh_margin secondi prima della scadenza
+        """
+        expires_in = (
+            datetime.datetime.fromisoformat(expiry_time)
+            - datetime.datetime.now(datetime.timezone.utc)
+        ).total_seconds()
+        delay = max(1.0, expires_in - self.refresh_margin)
+        with self.__timer_lock:
+            if self.__closed:
+                return
+            if self.__timer is not None:
+                self.__timer.cancel()
+            self.__timer = threading.Timer(delay, self.__background_refresh)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def __background_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            # le credenziali correnti restano valide fino alla scadenza; il rinnovo verrà ritentato al primo utilizzo
+            # vicino alla scadenza
+            logger.warning(
+                "Error refreshing assumed role credentials",
+                extra={"role_arn": self.role_arn},
+                exc_info=True,
+            )
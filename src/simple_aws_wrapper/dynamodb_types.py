@@ -0,0 +1,182 @@
+"""
+Conversione tra valori Python e AttributeValue di DynamoDB ({"S": "..."}, {"N": "..."}, {"M": {...}}, ...).
+
+Equivalente a TypeSerializer/TypeDeserializer di boto3 ma più veloce: il tipo viene risolto con una tabella di
+dispatch invece di una catena di isinstance, e in lettura i numeri possono essere convertiti direttamente in
+int/float invece che in Decimal. I binari vengono restituiti come bytes (boto3 usa il wrapper Binary).
+"""
+from __future__ import annotations
+
+import decimal
+import math
+from collections.abc import Mapping, Set
+from typing import Any, Callable
+
+from boto3.dynamodb.types import DYNAMODB_CONTEXT
+
+NULL = "NULL"
+BOOLEAN = "BOOL"
+NUMBER = "N"
+STRING = "S"
+BINARY = "B"
+NUMBER_SET = "NS"
+STRING_SET = "SS"
+BINARY_SET = "BS"
+MAP = "M"
+LIST = "L"
+
+
+def _number_to_string(value: int | float | decimal.Decimal) -> str:
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            raise TypeError("Infinity and NaN not supported")
+        return repr(value)
+    if isinstance(value, decimal.Decimal):
+        if value.is_nan() or value.is_infinite():
+            raise TypeError("Infinity and NaN not supported")
+        return str(value)
+    return str(value)
+
+
+def _serialize_set(value: Set) -> dict:
+    if not value:
+        raise TypeError("Empty sets are not supported by DynamoDB")
+    element = next(iter(value))
+    if isinstance(element, str):
+        return {STRING_SET: list(value)}
+    if isinstance(element, (bytes, bytearray)):
+        return {BINARY_SET: [bytes(v) for v in value]}
+    if isinstance(element, (int, float, decimal.Decimal)) and not isinstance(
+        element, bool
+    ):
+        return {NUMBER_SET: [_number_to_string(v) for v in value]}
+    raise TypeError(f"Unsupported type {type(element)} for set element")
+
+
+_SERIALIZERS: dict[type, Callable[[Any], dict]] = {
+    str: lambda value: {STRING: value},
+    bool: lambda value: {BOOLEAN: value},
+    int: lambda value: {NUMBER: str(value)},
+    float: lambda value: {NUMBER: _number_to_string(value)},
+    decimal.Decimal: lambda value: {NUMBER: _number_to_string(value)},
+    type(None): lambda value: {NULL: True},
+    bytes: lambda value: {BINARY: value},
+    bytearray: lambda value: {BINARY: bytes(value)},
+    dict: lambda value: {MAP: {k: serialize(v) for k, v in value.items()}},
+    list: lambda value: {LIST: [serialize(v) for v in value]},
+    tuple: lambda value: {LIST: [serialize(v) for v in value]},
+    set: _serialize_set,
+    frozenset: _serialize_set,
+}
+
+
+def serialize(value: Any) -> dict:
+    """
+    Converte un valore Python in AttributeValue di DynamoDB. A differenza di TypeSerializer vengono accettati
+    anche i float
+    :param value: valore da convertire (str, bool, int, float, Decimal, None, bytes, dict, list, tuple, set)
+    :return: AttributeValue (es. {"N": "1"})
+    """
+    serializer = _SERIALIZERS.get(type(value))
+    if serializer is not None:
+        return serializer(value)
+    # sottoclassi dei tipi supportati
+    if isinstance(value, bool):
+        return {BOOLEAN: bool(value)}
+    if isinstance(value, str):
+        return {STRING: str(value)}
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return {NUMBER: _number_to_string(value)}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {BINARY: bytes(value)}
+    if isinstance(value, Mapping):
+        return {MAP: {k: serialize(v) for k, v in value.items()}}
+    if isinstance(value, Set):
+        return _serialize_set(value)
+    if isinstance(value, (list, tuple)):
+        return {LIST: [serialize(v) for v in value]}
+    # Binary di boto3
+    if hasattr(value, "value") and isinstance(value.value, (bytes, bytearray)):
+        return {BINARY: bytes(value.value)}
+    raise TypeError(f"Unsupported type {type(value)} for value {value!r}")
+
+
+def serialize_item(item: dict) -> dict:
+    """
+    Converte un elemento Python in un elemento DynamoDB
+    :param item: dizionario {"<attributo>": <valore>}
+    :return: dizionario {"<attributo>": <AttributeValue>}
+    """
+    return {key: serialize(value) for key, value in item.items()}
+
+
+def _native_number(value: str) -> int | float:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _make_deserializers(number: Callable[[str], Any]) -> dict:
+    deserializers: dict[str, Callable[[Any], Any]] = {}
+
+    def deserialize_value(value: dict):
+        ((tag, inner),) = value.items()
+        return deserializers[tag](inner)
+
+    deserializers.update(
+        {
+            STRING: str,
+            NUMBER: number,
+            BOOLEAN: bool,
+            NULL: lambda value: None,
+            BINARY: bytes,
+            STRING_SET: set,
+            NUMBER_SET: lambda value: {number(v) for v in value},
+            BINARY_SET: lambda value: {bytes(v) for v in value},
+            MAP: lambda value: {k: deserialize_value(v) for k, v in value.items()},
+            LIST: lambda value: [deserialize_value(v) for v in value],
+        }
+    )
+    return deserializers
+
+
+_DECIMAL_DESERIALIZERS = _make_deserializers(DYNAMODB_CONTEXT.create_decimal)
+_NATIVE_DESERIALIZERS = _make_deserializers(_native_number)
+
+
+def deserialize(value: dict, use_native_numbers: bool = False) -> Any:
+    """
+    Converte un AttributeValue di DynamoDB in un valore Python
+    :param value: AttributeValue (es. {"N": "1"})
+    :param use_native_numbers: se True i numeri vengono restituiti come int/float invece che come Decimal
+    :return: valore Python
+    """
+    deserializers = (
+        _NATIVE_DESERIALIZERS if use_native_numbers else _DECIMAL_DESERIALIZERS
+    )
+    try:
+        ((tag, inner),) = value.items()
+        return deserializers[tag](inner)
+    except (KeyError, ValueError, AttributeError):
+        raise TypeError(f"Invalid DynamoDB AttributeValue: {value!r}")
+
+
+def deserialize_item(item: dict, use_native_numbers: bool = False) -> dict:
+    """
+    Converte un elemento DynamoDB in un elemento Python
+    :param item: dizionario {"<attributo>": <AttributeValue>}
+    :param use_native_numbers: se True i numeri vengono restituiti come int/float invece che come Decimal
+    :return: dizionario {"<attributo>": <valore>}
+    """
+    deserializers = (
+        _NATIVE_DESERIALIZERS if use_native_numbers else _DECIMAL_DESERIALIZERS
+    )
+    output: dict = {}
+    try:
+        for key, value in item.items():
+            ((tag, inner),) = value.items()
+            output[key] = deserializers[tag](inner)
+    except (KeyError, ValueError, AttributeError):
+        raise TypeError(f"Invalid DynamoDB item: {item!r}")
+    return output
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import traceback
+
 
 class GenericException(Exception):
     """
-    Eccezione generica
+    Eccezione generica. Se viene indicata l'eccezione originale (cause), il relativo traceback viene formattato
+    solo quando l'eccezione viene convertita in stringa
     """
-    def __init__(self, message: str) -> None:
+    def __init__(self, message: str = "", cause: BaseException | None = None) -> None:
         super().__init__(message)
+        self.message = message
+        self.cause = cause
+        self.__formatted: str | None = None
+
+    def __str__(self) -> str:
+        if self.cause is None:
+            return self.message
+        if self.__formatted is None:
+            self.__formatted = self.message + "".join(
+                traceback.format_exception(
+                    type(self.cause), self.cause, self.cause.__traceback__
+                )
+            )
+        return self.__formatted
 
 
 class MissingConfigurationException(Exception):
@@ -15,3 +32,222 @@ class MissingConfigurationException(Exception):
     """
 
     ...
+
+
+class EventQueueFullException(GenericException):
+    """
+    Eccezione sollevata quando la coda degli eventi in memoria è piena
+    """
+
+    ...
+
+
+class InvalidParametersException(GenericException):
+    """
+    Eccezione per i parametri non trovati nel Parameter Store
+    """
+
+    def __init__(self, invalid_parameters: list, parameters: dict) -> None:
+        super().__init__(f"Invalid parameters: {invalid_parameters}")
+        self.invalid_parameters = invalid_parameters
+        self.parameters = parameters
+
+
+class SecretRetrievalException(GenericException):
+    """
+    Eccezione per i secrets di Secrets Manager che non è stato possibile recuperare (es. accesso negato)
+    """
+
+    def __init__(self, errors: dict, secrets: dict) -> None:
+        super().__init__(f"Error retrieving secrets: {list(errors)}")
+        self.errors = errors
+        self.secrets = secrets
+
+
+class MultiRegionException(GenericException):
+    """
+    Eccezione per un'operazione eseguita su più regioni non riuscita in almeno una di esse
+    """
+
+    def __init__(self, results: dict, errors: dict) -> None:
+        super().__init__(f"Operation failed in regions: {list(errors)}")
+        self.results = results
+        self.errors = errors
+
+
+class AWSClientException(GenericException):
+    """
+    Eccezione per un errore restituito da un servizio AWS
+    """
+
+    def __init__(
+        self,
+        message: str = "",
+        cause: BaseException | None = None,
+        error_code: str | None = None,
+        operation_name: str | None = None,
+    ) -> None:
+        super().__init__(message, cause)
+        self.error_code = error_code
+        self.operation_name = operation_name
+
+
+class ThrottlingException(AWSClientException):
+    """
+    Eccezione per una richiesta rifiutata per throttling anche dopo i tentativi previsti
+    """
+
+    ...
+
+
+class TransientException(AWSClientException):
+    """
+    Eccezione per un errore temporaneo del servizio (timeout, errori 5xx) persistente dopo i tentativi previsti
+    """
+
+    ...
+
+
+class ResourceNotFoundException(AWSClientException):
+    """
+    Eccezione per una risorsa inesistente
+    """
+
+    ...
+
+
+class AccessDeniedException(AWSClientException):
+    """
+    Eccezione per permessi insufficienti o credenziali non valide
+    """
+
+    ...
+
+
+class ConditionalCheckFailedException(AWSClientException):
+    """
+    Eccezione per una condizione di scrittura non soddisfatta
+    """
+
+    ...
+
+
+class TransactionCanceledException(AWSClientException):
+    """
+    Eccezione per una transazione DynamoDB annullata per motivi diversi da una condizione non soddisfatta (es.
+    conflitto con un'altra transazione o errore di validazione). I motivi sono in cancellation_reasons
+    """
+
+    @property
+    def cancellation_reasons(self) -> list[dict]:
+        """
+        Motivi dell'annullamento, uno per operazione (Code "None" per le operazioni senza errori)
+        """
+        response = getattr(self.cause, "response", None) or {}
+        return response.get("CancellationReasons", [])
+
+
+class ValidationException(AWSClientException):
+    """
+    Eccezione per una richiesta non valida
+    """
+
+    ...
+
+
+class ChecksumMismatchException(AWSClientException):
+    """
+    Eccezione per dati trasferiti il cui checksum non corrisponde a quello atteso
+    """
+
+    ...
+
+
+ERROR_CODE_EXCEPTIONS: dict[str, type[AWSClientException]] = {
+    "ResourceNotFoundException": ResourceNotFoundException,
+    "ParameterNotFound": ResourceNotFoundException,
+    "NoSuchBucket": ResourceNotFoundException,
+    "NoSuchKey": ResourceNotFoundException,
+    "NotFound": ResourceNotFoundException,
+    "404": ResourceNotFoundException,
+    "QueueDoesNotExist": ResourceNotFoundException,
+    "AWS.SimpleQueueService.NonExistentQueue": ResourceNotFoundException,
+    "AccessDenied": AccessDeniedException,
+    "AccessDeniedException": AccessDeniedException,
+    "UnrecognizedClientException": AccessDeniedException,
+    "InvalidAccessKeyId": AccessDeniedException,
+    "SignatureDoesNotMatch": AccessDeniedException,
+    "ExpiredToken": AccessDeniedException,
+    "ExpiredTokenException": AccessDeniedException,
+    "403": AccessDeniedException,
+    "ConditionalCheckFailedException": ConditionalCheckFailedException,
+    "TransactionCanceledException": TransactionCanceledException,
+    "PreconditionFailed": ConditionalCheckFailedException,
+    "ValidationException": ValidationException,
+    "ValidationError": ValidationException,
+    "InvalidParameterException": ValidationException,
+    "InvalidParameterValueException": ValidationException,
+    "InvalidRequestException": ValidationException,
+    "BadDigest": ChecksumMismatchException,
+    "InvalidDigest": ChecksumMismatchException,
+}
+
+# motivi di annullamento di una transazione DynamoDB dovuti al throttling
+THROTTLING_CANCELLATION_CODES = frozenset(
+    {"ThrottlingError", "ProvisionedThroughputExceeded", "RequestLimitExceeded"}
+)
+
+
+def _transaction_canceled_class(response: dict) -> type[AWSClientException]:
+    """
+    Classe dell'eccezione per una transazione annullata, in base ai motivi di annullamento: condizione non
+    soddisfatta, throttling o TransactionCanceledException per gli altri motivi (es. TransactionConflict)
+    """
+    codes = {
+        reason.get("Code")
+        for reason in response.get("CancellationReasons", [])
+        if reason.get("Code") not in (None, "None")
+    }
+    if "ConditionalCheckFailed" in codes:
+        return ConditionalCheckFailedException
+    if codes and codes <= THROTTLING_CANCELLATION_CODES:
+        return ThrottlingException
+    return TransactionCanceledException
+
+
+def wrap_exception(
+    exception: BaseException,
+    message: str = "",
+    exception_class: type[AWSClientException] | None = None,
+) -> GenericException:
+    """
+    Converte un'eccezione nell'eccezione tipizzata corrispondente. Gli errori dei servizi AWS (botocore ClientError)
+    vengono convertiti in base al codice di errore; le eccezioni del pacchetto vengono restituite invariate.
+    L'eccezione originale viene concatenata come causa (equivalente a "raise ... from e") e il suo traceback viene
+    formattato solo se necessario
+    :param exception: eccezione da convertire
+    :param message: eventuale messaggio da anteporre al traceback
+    :param exception_class: classe da usare al posto di quella ricavata dal codice di errore
+    :return: eccezione tipizzata
+    """
+    if isinstance(exception, GenericException):
+        return exception
+    response = getattr(exception, "response", None)
+    if not isinstance(response, dict):
+        wrapped = GenericException(message, exception)
+    else:
+        error_code = response.get("Error", {}).get("Code")
+        if exception_class is None and error_code == "TransactionCanceledException":
+            exception_class = _transaction_canceled_class(response)
+        elif exception_class is None:
+            exception_class = ERROR_CODE_EXCEPTIONS.get(
+                error_code, AWSClientException
+            )
+        wrapped = exception_class(
+            message,
+            exception,
+            error_code=error_code,
+            operation_name=getattr(exception, "operation_name", None),
+        )
+    wrapped.__cause__ = exception
+    return wrapped
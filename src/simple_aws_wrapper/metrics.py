@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import bisect
+import socket
+import threading
+import time
+from typing import Callable
+
+from botocore import xform_name
+
+# limiti superiori (in secondi) dei bucket degli istogrammi di latenza
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LATENCY = "latency"
+BYTES_SENT = "bytes_sent"
+BYTES_RECEIVED = "bytes_received"
+CALLS = "calls"
+RETRIES = "retries"
+ERRORS = "errors"
+
+
+class Histogram:
+    """
+    Istogramma a bucket fissi (cumulativi in esportazione, come in Prometheus)
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Registra un valore
+        :param value: valore osservato
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> list:
+        """
+        Restituisce i conteggi cumulativi per bucket (l'ultimo elemento corrisponde a +Inf)
+        :return: lista dei conteggi cumulativi
+        """
+        output_list: list = []
+        total = 0
+        for count in self.counts:
+            total += count
+            output_list.append(total)
+        return output_list
+
+
+class MetricsRegistry:
+    """
+    Registro thread-safe delle metriche delle chiamate ai servizi AWS: latenza, byte trasferiti, chiamate,
+    retry ed errori per coppia (servizio, operazione). Gli exporter possono registrarsi come listener per ricevere
+    ogni osservazione
+    """
+
+    def __init__(self, latency_buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        """
+        :param latency_buckets: limiti superiori (in secondi) dei bucket degli istogrammi di latenza
+        """
+        self.latency_buckets = latency_buckets
+        self._histograms: dict[tuple, Histogram] = {}
+        self._counters: dict[tuple, float] = {}
+        self._listeners: list[Callable[[str, str, str, float, dict], None]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[str, str, str, float, dict], None]):
+        """
+        Registra una funzione invocata ad ogni osservazione con (metrica, servizio, operazione, valore, tag)
+        :param listener: funzione da invocare
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable):
+        """
+        Rimuove un listener registrato
+        :param listener: funzione da rimuovere
+        """
+        self._listeners.remove(listener)
+
+    def observe_latency(self, service: str, operation: str, seconds: float):
+        """
+        Registra la durata di una chiamata
+        :param service: nome del servizio
+        :param operation: nome dell'operazione (es. "put_item")
+        :param seconds: durata in secondi
+        """
+        key = (service, operation)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.latency_buckets)
+            histogram.observe(seconds)
+        self._notify(LATENCY, service, operation, seconds, {})
+
+    def increment(
+        self,
+        metric: str,
+        service: str,
+        operation: str,
+        value: float = 1,
+        tags: dict | None = None,
+    ):
+        """
+        Incrementa un contatore
+        :param metric: nome della metrica (es. CALLS, ERRORS, BYTES_SENT)
+        :param service: nome del servizio
+        :param operation: nome dell'operazione
+        :param value: incremento
+        :param tags: eventuali tag aggiuntivi (es. {"error_code": "ThrottlingException"})
+        """
+        tags = tags or {}
+        key = (metric, service, operation, tuple(sorted(tags.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._notify(metric, service, operation, value, tags)
+
+    def histograms(self) -> dict:
+        """
+        Restituisce una copia degli istogrammi di latenza
+        :return: dizionario {(servizio, operazione): Histogram}
+        """
+        with self._lock:
+            return dict(self._histograms)
+
+    def counters(self) -> dict:
+        """
+        Restituisce una copia dei contatori
+        :return: dizionario {(metrica, servizio, operazione, tag): valore}
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        """
+        Azzera tutte le metriche
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def _notify(self, metric: str, service: str, operation: str, value: float, tags: dict):
+        for listener in self._listeners:
+            listener(metric, service, operation, value, tags)
+
+
+_registry: MetricsRegistry | None = None
+
+
+def enable(registry: MetricsRegistry | None = None) -> MetricsRegistry:
+    """
+    Attiva la raccolta delle metriche per tutti i client strumentati
+    :param registry: registro da utilizzare (ne viene creato uno nuovo se None)
+    :return: registro attivo
+    """
+    global _registry
+    _registry = registry or MetricsRegistry()
+    return _registry
+
+
+def disable():
+    """
+    Disattiva la raccolta delle metriche
+    """
+    global _registry
+    _registry = None
+
+
+def get_registry() -> MetricsRegistry | None:
+    """
+    Restituisce il registro attivo
+    :return: MetricsRegistry o None se la raccolta non è attiva
+    """
+    return _registry
+
+
+def record_retry(service: str, operation: str, error_class: str):
+    """
+    Registra un nuovo tentativo di una chiamata
+    :param service: nome del servizio
+    :param operation: nome dell'operazione
+    :param error_class: classificazione dell'errore che ha causato il retry
+    """
+    registry = _registry
+    if registry is not None:
+        registry.increment(RETRIES, service, operation, tags={"reason": error_class})
+
+
+def _before_call(service_name: str):
+    def handler(model, params, context, **kwargs):
+        if _registry is None:
+            return None
+        context["metrics_start"] = time.perf_counter()
+        context["metrics_operation"] = xform_name(model.name)
+        size = _body_length(params.get("body"))
+        if size:
+            _registry.increment(
+                BYTES_SENT, service_name, context["metrics_operation"], size
+            )
+        return None
+
+    return handler
+
+
+def _body_length(body) -> int:
+    """
+    Restituisce la dimensione del corpo di una richiesta (bytes, stringa o file-like posizionabile)
+    """
+    if not body:
+        return 0
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    try:
+        position = body.tell()
+        end = body.seek(0, 2)
+        body.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def _after_call(service_name: str):
+    def handler(http_response, parsed, context, **kwargs):
+        registry = _registry
+        start = context.get("metrics_start")
+        if registry is None or start is None:
+            return
+        operation = context["metrics_operation"]
+        registry.observe_latency(service_name, operation, time.perf_counter() - start)
+        registry.increment(CALLS, service_name, operation)
+        content_length = http_response.headers.get("content-length")
+        if content_length:
+            registry.increment(
+                BYTES_RECEIVED, service_name, operation, int(content_length)
+            )
+        if http_response.status_code >= 300:
+            error_code = parsed.get("Error", {}).get("Code", str(http_response.status_code))
+            registry.increment(
+                ERRORS, service_name, operation, tags={"error_code": error_code}
+            )
+
+    return handler
+
+
+def _after_call_error(service_name: str):
+    def handler(exception, context, **kwargs):
+        registry = _registry
+        start = context.get("metrics_start")
+        if registry is None or start is None:
+            return
+        operation = context["metrics_operation"]
+        registry.observe_latency(service_name, operation, time.perf_counter() - start)
+        registry.increment(CALLS, service_name, operation)
+        registry.increment(
+            ERRORS,
+            service_name,
+            operation,
+            tags={"error_code": type(exception).__name__},
+        )
+
+    return handler
+
+
+def instrument(target, service_name: str):
+    """
+    Registra sugli eventi botocore di un client (o del client di una risorsa) gli handler che alimentano il registro
+    delle metriche. Gli handler non fanno nulla finché la raccolta non viene attivata con enable()
+    :param target: client o risorsa boto3 (anche decorati con with_retry)
+    :param service_name: nome del servizio usato nelle metriche
+    :return: target
+    """
+    meta = getattr(target, "meta", None)
+    if meta is not None and hasattr(meta, "resource_model"):
+        meta = meta.client.meta
+    events = meta.events
+    events.register("before-call", _before_call(service_name))
+    events.register("after-call", _after_call(service_name))
+    events.register("after-call-error", _after_call_error(service_name))
+    return target
+
+
+def render_prometheus(registry: MetricsRegistry, prefix: str = "aws_client") -> str:
+    """
+    Restituisce le metriche del registro nel formato testuale di Prometheus
+    :param registry: registro delle metriche
+    :param prefix: prefisso dei nomi delle metriche
+    :return: testo da esporre all'endpoint /metrics
+    """
+    lines: list = []
+    histograms = registry.histograms()
+    if histograms:
+        name = f"{prefix}_latency_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        for (service, operation), histogram in sorted(histograms.items()):
+            labels = f'service="{service}",operation="{operation}"'
+            bounds = [str(bucket) for bucket in histogram.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, histogram.cumulative_counts()):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    by_metric: dict = {}
+    for (metric, service, operation, tags), value in registry.counters().items():
+        by_metric.setdefault(metric, []).append((service, operation, tags, value))
+    for metric, samples in sorted(by_metric.items()):
+        name = f"{prefix}_{metric}_total"
+        lines.append(f"# TYPE {name} counter")
+        for service, operation, tags, value in sorted(samples):
+            labels = [f'service="{service}"', f'operation="{operation}"'] + [
+                f'{key}="{tag_value}"' for key, tag_value in tags
+            ]
+            lines.append(f"{name}{{{','.join(labels)}}} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class StatsDExporter:
+    """
+    Exporter che invia ogni osservazione a un server StatsD via UDP (timer in millisecondi e contatori)
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = "localhost",
+        port: int = 8125,
+        prefix: str = "aws_client",
+    ):
+        """
+        :param registry: registro delle metriche a cui collegarsi
+        :param host: host del server StatsD
+        :param port: porta del server StatsD
+        :param prefix: prefisso dei nomi delle metriche
+        """
+        self.address = (host, port)
+        self.prefix = prefix
+        self.registry = registry
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        registry.add_listener(self.send)
+
+    def send(self, metric: str, service: str, operation: str, value: float, tags: dict):
+        """
+        Invia un'osservazione al server StatsD
+        """
+        name = f"{self.prefix}.{service}.{operation}.{metric}"
+        for tag_value in tags.values():
+            name += f".{tag_value}"
+        if metric == LATENCY:
+            payload = f"{name}:{value * 1000:.3f}|ms"
+        else:
+            payload = f"{name}:{value}|c"
+        try:
+            self.__socket.sendto(payload.encode("utf-8"), self.address)
+        except OSError:
+            # le metriche non devono mai interrompere le chiamate ai servizi
+            pass
+
+    def close(self):
+        """
+        Scollega l'exporter dal registro e chiude il socket
+        """
+        self.registry.remove_listener(self.send)
+        self.__socket.close()
+
+
+class OpenTelemetryExporter:
+    """
+    Exporter che inoltra le osservazioni agli strumenti di OpenTelemetry (richiede il pacchetto opentelemetry-api)
+    """
+
+    def __init__(self, registry: MetricsRegistry, meter=None, prefix: str = "aws.client"):
+        """
+        :param registry: registro delle metriche a cui collegarsi
+        :param meter: meter OpenTelemetry da utilizzare (quello globale se None)
+        :param prefix: prefisso dei nomi delle metriche
+        """
+        try:
+            from opentelemetry import metrics as otel_metrics
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetryExporter requires the opentelemetry-api package"
+            )
+        meter = meter or otel_metrics.get_meter("simple_aws_wrapper")
+        self.registry = registry
+        self.__latency = meter.create_histogram(f"{prefix}.duration", unit="s")
+        self.__counters = {
+            metric: meter.create_counter(f"{prefix}.{metric}")
+            for metric in (BYTES_SENT, BYTES_RECEIVED, CALLS, RETRIES, ERRORS)
+        }
+        registry.add_listener(self.send)
+
+    def send(self, metric: str, service: str, operation: str, value: float, tags: dict):
+        """
+        Inoltra un'osservazione a OpenTelemetry
+        """
+        attributes = dict(tags, service=service, operation=operation)
+        if metric == LATENCY:
+            self.__latency.record(value, attributes)
+        elif metric in self.__counters:
+            self.__counters[metric].add(value, attributes)
+
+    def close(self):
+        """
+        Scollega l'exporter dal registro
+        """
+        self.registry.remove_listener(self.send)
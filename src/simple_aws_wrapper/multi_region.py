@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable
+
+from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.exceptions.exceptions import MultiRegionException
+
+
+def _region_name(region: Region | str) -> str:
+    return region.get_region_name() if isinstance(region, Region) else region
+
+
+def run_in_regions(
+    service_class: type,
+    regions: Iterable[Region | str],
+    operation: Callable[[Any], Any],
+    max_workers: int | None = None,
+    endpoint_url: str | None = None,
+    return_exceptions: bool = False,
+) -> dict:
+    """
+    Esegue la stessa operazione in parallelo su più regioni. Ogni regione usa un'istanza del servizio con il proprio
+    client (condiviso tramite ResourceManager)
+    :param service_class: classe del servizio (es. DynamoDB)
+    :param regions: regioni su cui eseguire l'operazione
+    :param operation: funzione che riceve l'istanza del servizio e restituisce il risultato
+    :param max_workers: numero massimo di thread (default pari al numero di regioni)
+    :param endpoint_url: eventuale endpoint da usare al posto di quello configurato
+    :param return_exceptions: se True gli errori vengono restituiti come risultato invece di sollevare eccezione
+    :return: dizionario {"<regione>": <risultato>}
+    """
+    region_names = list(dict.fromkeys(_region_name(region) for region in regions))
+    if not region_names:
+        return {}
+
+    # la configurazione viene acquisita nel thread chiamante (compresa quella impostata con AWSConfig().use())
+    config = AWSConfig().snapshot(endpoint_url=endpoint_url)
+
+    def run(region_name: str):
+        return operation(service_class(config=config.replace(region_name)))
+
+    results: dict = {}
+    errors: dict = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(region_names)) as executor:
+        futures = {
+            region_name: executor.submit(run, region_name)
+            for region_name in region_names
+        }
+        for region_name, future in futures.items():
+            try:
+                results[region_name] = future.result()
+            except Exception as e:
+                errors[region_name] = e
+    if errors and not return_exceptions:
+        raise MultiRegionException(results, errors)
+    results.update(errors)
+    return {region_name: results[region_name] for region_name in region_names}
+
+
+def first_success(
+    service_class: type,
+    regions: Iterable[Region | str],
+    operation: Callable[[Any], Any],
+    timeout: float | None = None,
+    endpoint_url: str | None = None,
+) -> tuple:
+    """
+    Esegue la stessa operazione in parallelo su più regioni e restituisce il primo risultato andato a buon fine
+    (ad esempio per leggere da più repliche riducendo la latenza). Le operazioni ancora in coda vengono annullate
+    :param service_class: classe del servizio (es. SecretsManager)
+    :param regions: regioni su cui eseguire l'operazione
+    :param operation: funzione che riceve l'istanza del servizio e restituisce il risultato
+    :param timeout: attesa massima in secondi (None per nessun limite)
+    :param endpoint_url: eventuale endpoint da usare al posto di quello configurato
+    :return: tupla (regione, risultato)
+    """
+    region_names = list(dict.fromkeys(_region_name(region) for region in regions))
+    if not region_names:
+        raise ValueError("regions must not be empty")
+
+    # la configurazione viene acquisita nel thread chiamante (compresa quella impostata con AWSConfig().use())
+    config = AWSConfig().snapshot(endpoint_url=endpoint_url)
+
+    def run(region_name: str):
+        return operation(service_class(config=config.replace(region_name)))
+
+    errors: dict = {}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    executor = ThreadPoolExecutor(max_workers=len(region_names))
+    try:
+        pending = {
+            executor.submit(run, region_name): region_name
+            for region_name in region_names
+        }
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                for region_name in pending.values():
+                    errors[region_name] = TimeoutError(
+                        f"Operation timed out in region {region_name}"
+                    )
+                break
+            for future in done:
+                region_name = pending.pop(future)
+                try:
+                    return region_name, future.result()
+                except Exception as e:
+                    errors[region_name] = e
+    finally:
+        # non si attende il completamento delle richieste ancora in corso
+        executor.shutdown(wait=False, cancel_futures=True)
+    raise MultiRegionException({}, errors)
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+import pickle
+import tempfile
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
+
+# numero di righe per record batch / row group
+DEFAULT_BATCH_SIZE = 10000
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Parquet export requires the pyarrow package (pip install simple_aws_wrapper[parquet])"
+        )
+    return pyarrow, pyarrow.parquet
+
+
+# metadato dei campi (colonne) scritti come DynamoDB JSON perché i loro valori non hanno un tipo Arrow comune
+JSON_ENCODING_KEY = b"encoding"
+JSON_ENCODING = b"dynamodb-json"
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _to_arrow_value(value):
+    """
+    Converte i valori non supportati da Arrow (set) in tipi equivalenti
+    """
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, dict):
+        return {k: _to_arrow_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_arrow_value(v) for v in value]
+    return value
+
+
+def _to_serializable(value):
+    """
+    Converte i float (numeri nativi) in Decimal, come richiesto da TypeSerializer
+    """
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, (set, frozenset)):
+        return type(value)(_to_serializable(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _to_serializable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_serializable(v) for v in value]
+    return value
+
+
+def _encode_binary(value):
+    if isinstance(value, (bytes, bytearray, Binary)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_binary(typed: dict) -> dict:
+    (type_, value), = typed.items()
+    if type_ == "B":
+        return {"B": base64.b64decode(value)}
+    if type_ == "BS":
+        return {"BS": [base64.b64decode(v) for v in value]}
+    if type_ == "L":
+        return {"L": [_decode_binary(v) for v in value]}
+    if type_ == "M":
+        return {"M": {k: _decode_binary(v) for k, v in value.items()}}
+    return typed
+
+
+def to_json(value) -> str:
+    """
+    Codifica un valore in DynamoDB JSON (binari in base64), senza perdere tipi, set e attributi annidati
+    :param value: valore da codificare
+    :return: stringa JSON
+    """
+    return json.dumps(_serializer.serialize(_to_serializable(value)), default=_encode_binary)
+
+
+def from_json(value: str):
+    """
+    Decodifica un valore codificato con to_json
+    :param value: stringa JSON
+    :return: valore originale
+    """
+    return _deserializer.deserialize(_decode_binary(json.loads(value)))
+
+
+def _has_empty_struct(data_type) -> bool:
+    """
+    Restituisce se il tipo contiene una struct senza campi (mappa vuota), non rappresentabile in Parquet
+    """
+    pa, _ = _import_pyarrow()
+    if pa.types.is_struct(data_type):
+        return data_type.num_fields == 0 or any(
+            _has_empty_struct(data_type.field(i).type) for i in range(data_type.num_fields)
+        )
+    if pa.types.is_list(data_type) or pa.types.is_large_list(data_type):
+        return _has_empty_struct(data_type.value_type)
+    return False
+
+
+def _unknown_fields(value, data_type, path: str) -> Iterator[str]:
+    """
+    Restituisce i percorsi degli attributi annidati non presenti nello schema
+    """
+    pa, _ = _import_pyarrow()
+    if isinstance(value, dict) and pa.types.is_struct(data_type):
+        names = {data_type.field(i).name for i in range(data_type.num_fields)}
+        for k, v in value.items():
+            if k not in names:
+                yield f"{path}.{k}"
+            else:
+                yield from _unknown_fields(v, data_type.field(k).type, f"{path}.{k}")
+    elif isinstance(value, list) and (
+        pa.types.is_list(data_type) or pa.types.is_large_list(data_type)
+    ):
+        for v in value:
+            yield from _unknown_fields(v, data_type.value_type, f"{path}[]")
+
+
+def _without_nulls(value):
+    """
+    Rimuove dalle mappe gli attributi nulli, aggiunti da Arrow per i campi delle struct assenti nell'elemento
+    """
+    if isinstance(value, dict):
+        return {k: _without_nulls(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_without_nulls(v) for v in value]
+    return value
+
+
+def _is_json_field(field) -> bool:
+    return (field.metadata or {}).get(JSON_ENCODING_KEY) == JSON_ENCODING
+
+
+def _batched(rows: Iterable[dict], batch_size: int) -> Iterator[list]:
+    batch: list = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _spool_and_infer(rows: Iterable[dict], batch_size: int, spool) -> tuple:
+    """
+    Primo passaggio: salva i batch nel file temporaneo spool e ricava lo schema dall'unione dei tipi di tutti i
+    batch (compresi gli attributi annidati che compaiono solo in batch successivi). Le colonne senza un tipo Arrow
+    comune (es. liste miste o attributi di tipo diverso tra gli elementi) vengono codificate in DynamoDB JSON
+    :return: tupla (schema, numero di batch)
+    """
+    pa, _ = _import_pyarrow()
+    types: dict = {}
+    json_columns: set = set()
+    batches = 0
+    for batch in _batched(rows, batch_size):
+        pickle.dump(batch, spool, protocol=pickle.HIGHEST_PROTOCOL)
+        batches += 1
+        columns = dict.fromkeys(key for row in batch for key in row)
+        for column in columns:
+            types.setdefault(column, pa.null())
+            if column in json_columns:
+                continue
+            try:
+                data_type = pa.array(
+                    [_to_arrow_value(row.get(column)) for row in batch]
+                ).type
+                types[column] = pa.unify_schemas(
+                    [pa.schema([(column, types[column])]), pa.schema([(column, data_type)])],
+                    promote_options="permissive",
+                ).field(column).type
+            except (pa.ArrowException, OverflowError):
+                json_columns.add(column)
+    fields = []
+    for column, data_type in types.items():
+        if column in json_columns or _has_empty_struct(data_type):
+            fields.append(
+                pa.field(column, pa.string(), metadata={JSON_ENCODING_KEY: JSON_ENCODING})
+            )
+        else:
+            fields.append(pa.field(column, data_type))
+    return pa.schema(fields), batches
+
+
+def _to_record_batch(batch: list, schema):
+    """
+    Converte le righe in un record batch con lo schema indicato, codificando in DynamoDB JSON le colonne con il
+    metadato di codifica. Gli attributi (anche annidati) assenti dallo schema sollevano ValueError
+    """
+    pa, _ = _import_pyarrow()
+    json_columns = {field.name for field in schema if _is_json_field(field)}
+    converted = []
+    for row in batch:
+        unknown = [key for key in row if schema.get_field_index(key) < 0]
+        for key, value in row.items():
+            if key not in json_columns and key not in unknown:
+                unknown.extend(
+                    _unknown_fields(_to_arrow_value(value), schema.field(key).type, key)
+                )
+        if unknown:
+            raise ValueError(
+                f"Attributes {sorted(set(unknown))} are not in the schema: pass a schema that includes them"
+            )
+        converted.append(
+            {
+                k: (to_json(v) if k in json_columns and v is not None else _to_arrow_value(v))
+                for k, v in row.items()
+            }
+        )
+    return pa.RecordBatch.from_pylist(converted, schema=schema)
+
+
+def write_parquet(
+    rows: Iterable[dict],
+    file_path: str,
+    schema=None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    compression: str = "snappy",
+) -> int:
+    """
+    Scrive le righe in un file Parquet, un record batch alla volta: in memoria resta al massimo un batch.
+    Se lo schema non viene indicato, le righe vengono prima salvate in un file temporaneo e lo schema viene ricavato
+    da tutti i batch; le colonne senza un tipo comune sono scritte in DynamoDB JSON e decodificate da read_parquet.
+    Se la scrittura non riesce il file non viene lasciato a metà
+    :param rows: righe da scrivere (dizionari)
+    :param file_path: percorso del file Parquet
+    :param schema: eventuale schema pyarrow (le colonne con il metadato di codifica vengono scritte in DynamoDB JSON)
+    :param batch_size: numero di righe per record batch
+    :param compression: compressione delle colonne
+    :return: numero di righe scritte
+    """
+    pa, pq = _import_pyarrow()
+    writer = None
+    count = 0
+    try:
+        with tempfile.TemporaryFile() as spool:
+            if schema is None:
+                schema, batches = _spool_and_infer(rows, batch_size, spool)
+                spool.seek(0)
+                batches = (pickle.load(spool) for _ in range(batches))
+            else:
+                batches = _batched(rows, batch_size)
+            for batch in batches:
+                record_batch = _to_record_batch(batch, schema)
+                if writer is None:
+                    writer = pq.ParquetWriter(file_path, schema, compression=compression)
+                writer.write_batch(record_batch)
+                count += len(batch)
+        if writer is None:
+            # nessuna riga: viene comunque creato un file valido
+            pq.write_table(schema.empty_table(), file_path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            writer = None
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def read_parquet(file_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[list]:
+    """
+    Legge un file Parquet un record batch alla volta
+    :param file_path: percorso del file Parquet
+    :param batch_size: numero di righe per batch
+    :return: generatore di liste di righe (dizionari, senza gli attributi nulli, anche annidati). Le colonne scritte
+    in DynamoDB JSON vengono decodificate
+    """
+    _, pq = _import_pyarrow()
+    parquet_file = pq.ParquetFile(file_path)
+    schema = parquet_file.schema_arrow
+    json_columns = {field.name for field in schema if _is_json_field(field)}
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield [
+            {
+                k: from_json(v) if k in json_columns else _without_nulls(v)
+                for k, v in row.items()
+                if v is not None
+            }
+            for row in record_batch.to_pylist()
+        ]
+
+
+class TemporaryParquetFile:
+    """
+    File temporaneo usato per trasferire un file Parquet da/verso S3, rimosso all'uscita dal blocco with
+    """
+
+    def __enter__(self) -> str:
+        descriptor, self.path = tempfile.mkstemp(suffix=".parquet")
+        os.close(descriptor)
+        return self.path
+
+    def __exit__(self, *args):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,189 @@
+"""
+Generazione di URL prefirmati S3 con Signature Version 4 (query string).
+
+Rispetto a generate_presigned_url di boto3, che ricostruisce richiesta, chiave di firma e parti canoniche per ogni
+URL, qui la chiave di firma giornaliera viene derivata una sola volta (ed è memorizzata) e credential scope, query
+string canonica e header canonici sono calcolati una volta per tutti gli oggetti di un bucket: per ogni URL restano
+solo la codifica della chiave, un hash SHA-256 e un HMAC.
+"""
+from __future__ import annotations
+
+import datetime
+import functools
+import hashlib
+import hmac
+import re
+from urllib.parse import quote, urlsplit
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+# durata massima di un URL prefirmato con SigV4 (7 giorni)
+MAX_EXPIRES_IN = 7 * 24 * 3600
+
+_VIRTUAL_HOST_BUCKET = re.compile(r"^[a-z0-9][a-z0-9\-]{1,61}[a-z0-9]$")
+
+
+@functools.lru_cache(maxsize=64)
+def signing_key(secret_key: str, date: str, region_name: str, service: str = "s3") -> bytes:
+    """
+    Deriva (una sola volta per giorno, regione e servizio) la chiave di firma SigV4
+    :param secret_key: secret access key
+    :param date: data in formato YYYYMMDD
+    :param region_name: regione aws
+    :param service: nome del servizio usato per la firma
+    :return: chiave di firma
+    """
+    key = f"AWS4{secret_key}".encode("utf-8")
+    for part in (date, region_name, service, "aws4_request"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    return key
+
+
+class S3Presigner:
+    """
+    Generatore di URL prefirmati SigV4 per gli oggetti S3. Le istanze contengono solo stringhe e possono essere
+    inviate ai processi di un ProcessPoolExecutor
+    """
+
+    def __init__(
+        self,
+        access_key: str,
+        secret_key: str,
+        session_token: str | None,
+        region_name: str,
+        endpoint_url: str,
+        path_style: bool = False,
+    ):
+        """
+        :param access_key: access key id
+        :param secret_key: secret access key
+        :param session_token: eventuale session token
+        :param region_name: regione del bucket
+        :param endpoint_url: endpoint di S3 (es. https://s3.eu-west-1.amazonaws.com)
+        :param path_style: se True il bucket fa parte del percorso (endpoint/bucket/chiave) anche quando potrebbe
+        essere usato come sottodominio
+        """
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.session_token = session_token
+        self.region_name = region_name
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.path_style = path_style
+
+    def presign(
+        self,
+        method: str,
+        bucket_name: str,
+        object_key: str,
+        expires_in: int = 3600,
+        content_type: str | None = None,
+        now: datetime.datetime | None = None,
+    ) -> str:
+        """
+        Genera l'URL prefirmato di un oggetto
+        :param method: metodo HTTP ("GET", "PUT", ...)
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey
+        :param expires_in: secondi di validità dell'URL
+        :param content_type: eventuale Content-Type che il client dovrà inviare (firmato)
+        :param now: istante della firma (ora corrente se None)
+        :return: URL prefirmato
+        """
+        return self.presign_many(
+            method, bucket_name, [object_key], expires_in, content_type, now
+        )[0]
+
+    def presign_many(
+        self,
+        method: str,
+        bucket_name: str,
+        object_keys: list[str],
+        expires_in: int = 3600,
+        content_type: str | None = None,
+        now: datetime.datetime | None = None,
+    ) -> list[str]:
+        """
+        Genera gli URL prefirmati di più oggetti dello stesso bucket, con le stesse parti canoniche
+        :param method: metodo HTTP ("GET", "PUT", ...)
+        :param bucket_name: nome del bucket
+        :param object_keys: objectkey degli oggetti
+        :param expires_in: secondi di validità degli URL
+        :param content_type: eventuale Content-Type che il client dovrà inviare (firmato)
+        :param now: istante della firma (ora corrente se None)
+        :return: lista degli URL nello stesso ordine delle chiavi
+        """
+        if not 0 < expires_in <= MAX_EXPIRES_IN:
+            raise ValueError(f"expires_in must be between 1 and {MAX_EXPIRES_IN} seconds")
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        scope = f"{date}/{self.region_name}/s3/aws4_request"
+        key = signing_key(self.secret_key, date, self.region_name)
+
+        endpoint = urlsplit(self.endpoint_url)
+        if self.path_style or not _VIRTUAL_HOST_BUCKET.match(bucket_name):
+            host = endpoint.netloc
+            path_prefix = f"{endpoint.path}/{quote(bucket_name, safe='')}/"
+        else:
+            host = f"{bucket_name}.{endpoint.netloc}"
+            path_prefix = f"{endpoint.path}/"
+        base_url = f"{endpoint.scheme}://{host}"
+
+        if content_type is None:
+            signed_headers = "host"
+            canonical_headers = f"host:{host}\n"
+        else:
+            signed_headers = "content-type;host"
+            canonical_headers = f"content-type:{content_type.strip()}\nhost:{host}\n"
+        params = {
+            "X-Amz-Algorithm": ALGORITHM,
+            "X-Amz-Credential": f"{self.access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": signed_headers,
+        }
+        if self.session_token:
+            params["X-Amz-Security-Token"] = self.session_token
+        encoded = {
+            quote(name, safe="-_.~"): quote(value, safe="-_.~")
+            for name, value in params.items()
+        }
+        # nella firma i parametri sono ordinati, nell'URL restano nell'ordine usato da botocore
+        canonical_query = "&".join(f"{name}={value}" for name, value in sorted(encoded.items()))
+        query = "&".join(f"{name}={value}" for name, value in encoded.items())
+        request_prefix = f"{method}\n"
+        request_suffix = (
+            f"\n{canonical_query}\n{canonical_headers}\n{signed_headers}\n{UNSIGNED_PAYLOAD}"
+        )
+        string_prefix = f"{ALGORITHM}\n{amz_date}\n{scope}\n"
+
+        urls = []
+        for object_key in object_keys:
+            path = path_prefix + quote(object_key, safe="/~")
+            canonical_request = request_prefix + path + request_suffix
+            string_to_sign = (
+                string_prefix
+                + hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+            )
+            signature = hmac.new(
+                key, string_to_sign.encode("utf-8"), hashlib.sha256
+            ).hexdigest()
+            urls.append(f"{base_url}{path}?{query}&X-Amz-Signature={signature}")
+        return urls
+
+
+def presign_chunk(
+    presigner: S3Presigner,
+    method: str,
+    bucket_name: str,
+    object_keys: list[str],
+    expires_in: int,
+    content_type: str | None,
+    now: datetime.datetime,
+) -> list[str]:
+    """
+    Funzione di modulo (serializzabile con pickle) eseguita nei processi del pool
+    """
+    return presigner.presign_many(
+        method, bucket_name, object_keys, expires_in, content_type, now
+    )
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket thread-safe per limitare il numero di richieste al secondo verso un servizio
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """
+        :param rate: numero di richieste al secondo consentite
+        :param capacity: numero massimo di richieste consentite in un singolo burst (default pari a rate)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Preleva i token richiesti senza attendere
+        :param tokens: numero di token da prelevare
+        :return: True se i token sono stati prelevati, False altrimenti
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0):
+        """
+        Preleva i token richiesti, attendendo se non sono disponibili. Una richiesta superiore alla capacità
+        viene concessa a bucket pieno e lascia il bucket in debito
+        :param tokens: numero di token da prelevare
+        """
+        needed = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket che si adatta ai segnali di throttling del servizio: il limite non viene applicato finché il servizio
+    non rifiuta una richiesta, poi la velocità viene ridotta in modo moltiplicativo ad ogni throttling e aumentata
+    in modo additivo ad ogni richiesta andata a buon fine, fino a tornare senza limite
+    """
+
+    __limiters: dict[str, "AdaptiveRateLimiter"] = {}
+    __limiters_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_rate: float = 100.0,
+        min_rate: float = 0.5,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.5,
+    ):
+        """
+        :param max_rate: velocità (richieste al secondo) oltre la quale il limite viene disattivato
+        :param min_rate: velocità minima
+        :param decrease_factor: fattore di riduzione della velocità ad ogni throttling
+        :param increase_step: incremento della velocità ad ogni richiesta andata a buon fine
+        """
+        super().__init__(max_rate)
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.enabled = False
+
+    @staticmethod
+    def for_service(service_name: str) -> "AdaptiveRateLimiter":
+        """
+        Restituisce il limiter condiviso associato a un servizio
+        :param service_name: nome del servizio (es. "dynamodb")
+        :return: AdaptiveRateLimiter
+        """
+        limiter = AdaptiveRateLimiter.__limiters.get(service_name)
+        if limiter is None:
+            with AdaptiveRateLimiter.__limiters_lock:
+                limiter = AdaptiveRateLimiter.__limiters.setdefault(
+                    service_name, AdaptiveRateLimiter()
+                )
+        return limiter
+
+    def acquire(self, tokens: float = 1.0):
+        if self.enabled:
+            super().acquire(tokens)
+
+    def on_throttle(self):
+        """
+        Segnala una richiesta rifiutata per throttling, riducendo la velocità consentita
+        """
+        with self._lock:
+            if not self.enabled:
+                self.enabled = True
+                self._tokens = 0.0
+                self._last = time.monotonic()
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.capacity = max(self.rate, 1.0)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def on_success(self):
+        """
+        Segnala una richiesta andata a buon fine, aumentando la velocità consentita
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self.capacity = max(self.rate, 1.0)
+            if self.rate >= self.max_rate:
+                self.enabled = False
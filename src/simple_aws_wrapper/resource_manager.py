@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import threading
+
 import boto3
+from botocore.config import Config
+
+from simple_aws_wrapper.config import AWSConfigSnapshot
+from simple_aws_wrapper.metrics import instrument
+from simple_aws_wrapper.retry import CLIENT_CONFIG, with_retry
 
 
 class ResourceManager:
@@ -8,6 +15,59 @@ class ResourceManager:
     Classe per la gestione di risorse e client su AWS
     """
 
+    # client e risorse dei servizi, condivisi per (servizio, tipo, configurazione)
+    __service_clients: dict = {}
+    __service_clients_lock = threading.Lock()
+
+    @staticmethod
+    def get_service_client(
+        service_name: str, config: AWSConfigSnapshot, resource: bool = False
+    ):
+        """
+        Restituisce il client (o la risorsa) di un servizio con retry e metriche già applicati. I client vengono
+        creati una sola volta per configurazione e condivisi tra le istanze, così da riutilizzarne il pool di
+        connessioni
+        :param service_name: nome servizio (ad esempio "dynamodb")
+        :param config: configurazione AWS (AWSConfigSnapshot)
+        :param resource: se True restituisce la risorsa boto3 invece del client
+        :return: client o risorsa aws
+        """
+        key = (service_name, resource, config)
+        target = ResourceManager.__service_clients.get(key)
+        if target is not None:
+            return target
+        with ResourceManager.__service_clients_lock:
+            target = ResourceManager.__service_clients.get(key)
+            if target is None:
+                factory = (
+                    ResourceManager.get_resource if resource else ResourceManager.get_client
+                )
+                kwargs = config.to_dict()
+                if config.credentials_provider is not None:
+                    # i client condividono le credenziali del provider, rinnovate senza ricreare i client
+                    kwargs.update(
+                        aws_access_key_id=None,
+                        aws_secret_access_key=None,
+                        aws_session_token=None,
+                        session=config.credentials_provider.get_session(),
+                    )
+                target = instrument(
+                    with_retry(
+                        factory(service_name, config=CLIENT_CONFIG, **kwargs), service_name
+                    ),
+                    service_name,
+                )
+                ResourceManager.__service_clients[key] = target
+        return target
+
+    @staticmethod
+    def clear_service_clients():
+        """
+        Svuota il pool dei client condivisi
+        """
+        with ResourceManager.__service_clients_lock:
+            ResourceManager.__service_clients.clear()
+
     @staticmethod
     def get_client(
         service_name: str,
@@ -16,15 +76,19 @@ class ResourceManager:
         aws_access_key_id: str | None = None,
         aws_secret_access_key: str | None = None,
         aws_session_token: str | None = None,
+        config: Config | None = None,
+        session: boto3.Session | None = None,
     ):
         """
         Funzione per instaurare una sessione Boto3. Restituisce il session client relativo al servizio
         :param service_name: servizio con cui instaurare una connessione (es. "s3" o "dynamodb")
         :param region_name: regione aws
         :param endpoint_url: eventuale url dell'endpoint dei servizi
+        :param config: eventuale configurazione botocore del client
+        :param session: eventuale sessione boto3 da usare (es. con le credenziali di un CredentialsProvider)
         :return: botocore.client
         """
-        session = boto3.Session()
+        session = session or boto3.Session()
         return session.client(
             service_name,
             region_name=region_name,
@@ -32,6 +96,7 @@ class ResourceManager:
             aws_session_token=aws_session_token,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            config=config,
         )
 
     @staticmethod
@@ -42,21 +107,26 @@ class ResourceManager:
         aws_access_key_id: str | None = None,
         aws_secret_access_key: str | None = None,
         aws_session_token: str | None = None,
+        config: Config | None = None,
+        session: boto3.Session | None = None,
     ):
         """
         Funzione per prendere una risorsa aws
         :param service_name: nome servizio (ad esempio "dynamodb")
         :param region_name: regione aws
         :param endpoint_url: eventuale endpoint a cui collegarsi
+        :param config: eventuale configurazione botocore del client della risorsa
+        :param session: eventuale sessione boto3 da usare (es. con le credenziali di un CredentialsProvider)
         :return: risorsa aws
         """
-        return boto3.resource(
+        return (session or boto3).resource(
             service_name,
             region_name,
             endpoint_url=endpoint_url,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
             aws_session_token=aws_session_token,
+            config=config,
         )
 
     @staticmethod
@@ -66,12 +136,14 @@ class ResourceManager:
         aws_access_key_id: str | None = None,
         aws_secret_access_key: str | None = None,
         aws_session_token: str | None = None,
-        region_name = None
+        region_name = None,
+        config: Config | None = None,
     ):
         """
         Funzione per prendere un client global
         :param service_name: nome servizio (ad esempio "dynamodb")
         :param endpoint_url: eventuale endpoint a cui collegarsi
+        :param config: eventuale configurazione botocore del client
         :return: client global
         """
         return boto3.client(
@@ -80,4 +152,5 @@ class ResourceManager:
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
             aws_session_token=aws_session_token,
+            config=config,
         )
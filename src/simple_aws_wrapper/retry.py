@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import functools
+import random
+import time
+
+from botocore.config import Config
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from simple_aws_wrapper.exceptions.exceptions import (
+    ThrottlingException,
+    TransientException,
+    wrap_exception,
+)
+from simple_aws_wrapper import metrics
+from simple_aws_wrapper.rate_limiter import AdaptiveRateLimiter
+
+THROTTLING = "throttling"
+TRANSIENT = "transient"
+FATAL = "fatal"
+
+THROTTLING_ERROR_CODES = frozenset(
+    {
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottledException",
+        "RequestThrottled",
+        "TooManyRequestsException",
+        "TooManyUpdates",
+        "ProvisionedThroughputExceededException",
+        "RequestLimitExceeded",
+        "LimitExceededException",
+        "BandwidthLimitExceeded",
+        "TransactionInProgressException",
+        "SlowDown",
+        "EC2ThrottledException",
+    }
+)
+
+TRANSIENT_ERROR_CODES = frozenset(
+    {
+        "RequestTimeout",
+        "RequestTimeoutException",
+        "PriorRequestNotComplete",
+        "InternalError",
+        "InternalFailure",
+        "InternalServerError",
+        "ServiceUnavailable",
+        "ServiceUnavailableException",
+    }
+)
+
+TRANSIENT_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+TRANSIENT_EXCEPTIONS = (
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+# i tentativi vengono gestiti da RetryingClient: i tentativi interni di botocore vengono disattivati
+# per non moltiplicare le richieste
+CLIENT_CONFIG = Config(retries={"total_max_attempts": 1})
+
+# metodi del client che non effettuano chiamate al servizio
+LOCAL_METHODS = frozenset(
+    {
+        "can_paginate",
+        "close",
+        "generate_presigned_post",
+        "generate_presigned_url",
+        "get_waiter",
+    }
+)
+
+
+def classify_error(exception: BaseException) -> str:
+    """
+    Classifica un errore restituito da botocore
+    :param exception: eccezione da classificare
+    :return: THROTTLING, TRANSIENT o FATAL
+    """
+    if isinstance(exception, ClientError):
+        error = exception.response.get("Error", {})
+        code = error.get("Code")
+        if code in THROTTLING_ERROR_CODES:
+            return THROTTLING
+        status_code = exception.response.get("ResponseMetadata", {}).get(
+            "HTTPStatusCode"
+        )
+        if code in TRANSIENT_ERROR_CODES or status_code in TRANSIENT_STATUS_CODES:
+            return TRANSIENT
+        return FATAL
+    if isinstance(exception, TRANSIENT_EXCEPTIONS):
+        return TRANSIENT
+    return FATAL
+
+
+class RetryPolicy:
+    """
+    Politica di retry con backoff esponenziale e jitter ("full jitter")
+    """
+
+    def __init__(
+        self, max_attempts: int = 5, base_delay: float = 0.05, max_delay: float = 5.0
+    ):
+        """
+        :param max_attempts: numero massimo di tentativi (compreso il primo)
+        :param base_delay: attesa massima (in secondi) prima del secondo tentativo
+        :param max_delay: attesa massima (in secondi) tra due tentativi
+        """
+        if max_attempts <= 0:
+            raise ValueError("max_attempts must be greater than 0")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Restituisce l'attesa prima del tentativo successivo
+        :param attempt: numero del tentativo fallito (a partire da 1)
+        :return: attesa in secondi
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        )
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class RetryingClient:
+    """
+    Proxy di un client boto3 che esegue ogni chiamata al servizio attraverso il rate limiter adattivo del servizio,
+    ripetendola con backoff in caso di throttling o errori temporanei
+    """
+
+    def __init__(
+        self, client, service_name: str, retry_policy: RetryPolicy | None = None
+    ):
+        """
+        :param client: client boto3
+        :param service_name: nome del servizio, usato per condividere il rate limiter
+        :param retry_policy: politica di retry (DEFAULT_RETRY_POLICY se None)
+        """
+        self._client = client
+        self._service_name = service_name
+        self._retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self._rate_limiter = AdaptiveRateLimiter.for_service(service_name)
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._client, name)
+        if name.startswith("_") or name in LOCAL_METHODS or not callable(attribute):
+            return attribute
+        if name == "get_paginator":
+            wrapped = self._wrap_get_paginator(attribute)
+        else:
+            wrapped = self._wrap(attribute)
+        # il metodo decorato viene salvato sull'istanza: le chiamate successive non passano da __getattr__
+        self.__dict__[name] = wrapped
+        return wrapped
+
+    def _wrap(self, method):
+        @functools.wraps(method)
+        def call(*args, **kwargs):
+            return self._call(method, *args, **kwargs)
+
+        return call
+
+    def _wrap_get_paginator(self, get_paginator):
+        @functools.wraps(get_paginator)
+        def wrapped_get_paginator(operation_name: str):
+            paginator = get_paginator(operation_name)
+            # il paginator invoca direttamente il metodo del client: viene sostituito con quello decorato
+            paginator._method = self._wrap(paginator._method)
+            return paginator
+
+        return wrapped_get_paginator
+
+    def _call(self, method, *args, **kwargs):
+        attempt = 0
+        while True:
+            attempt += 1
+            self._rate_limiter.acquire()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                error_class = classify_error(e)
+                if error_class == THROTTLING:
+                    self._rate_limiter.on_throttle()
+                if error_class == FATAL:
+                    raise
+                if attempt >= self._retry_policy.max_attempts:
+                    raise wrap_exception(
+                        e,
+                        exception_class=ThrottlingException
+                        if error_class == THROTTLING
+                        else TransientException,
+                    )
+                metrics.record_retry(self._service_name, method.__name__, error_class)
+                time.sleep(self._retry_policy.get_delay(attempt))
+                continue
+            self._rate_limiter.on_success()
+            return result
+
+
+def with_retry(target, service_name: str, retry_policy: RetryPolicy | None = None):
+    """
+    Applica il layer di retry a un client o a una risorsa boto3. Per le risorse viene decorato il client interno,
+    condiviso da tutte le sotto-risorse (es. le Table di DynamoDB)
+    :param target: client o risorsa boto3
+    :param service_name: nome del servizio
+    :param retry_policy: politica di retry
+    :return: client decorato o la risorsa stessa
+    """
+    meta = getattr(target, "meta", None)
+    if meta is not None and hasattr(meta, "resource_model"):
+        if not isinstance(meta.client, RetryingClient):
+            meta.client = RetryingClient(meta.client, service_name, retry_policy)
+        return target
+    if isinstance(target, RetryingClient):
+        return target
+    return RetryingClient(target, service_name, retry_policy)
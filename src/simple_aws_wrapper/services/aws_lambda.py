@@ -1,25 +1,273 @@
 import json
-import traceback
+import logging
+import queue
+import threading
+import time
+from typing import Callable
 
-from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.config import AWSConfig, AWSConfigSnapshot
+from simple_aws_wrapper.const import services
+from simple_aws_wrapper.const.regions import Region
 from simple_aws_wrapper.exceptions.exceptions import (
     MissingConfigurationException,
     GenericException,
+    wrap_exception,
+    EventQueueFullException,
 )
 from simple_aws_wrapper.resource_manager import ResourceManager
 
+logger = logging.getLogger(__name__)
+
+
+class LambdaEventDispatcher:
+    """
+    Dispatcher fire-and-forget per le invocazioni asincrone ("Event") di un Lambda.
+    Gli eventi vengono accodati in una coda in memoria di dimensione limitata e inviati da worker in background.
+    Gli eventi che falliscono anche dopo i tentativi previsti vengono scritti nella dead-letter (file e/o callback)
+    """
+
+    __STOP = object()
+
+    def __init__(
+        self,
+        client,
+        max_queue_size: int = 1000,
+        workers: int = 2,
+        batch_size: int = 1,
+        max_retries: int = 3,
+        retry_backoff: float = 0.2,
+        dead_letter_file: str | None = None,
+        dead_letter_callback: Callable[[dict, Exception], None] | None = None,
+    ):
+        """
+        :param client: client Lambda da utilizzare per le invocazioni
+        :param max_queue_size: numero massimo di eventi in coda
+        :param workers: numero di worker in background
+        :param batch_size: numero massimo di eventi verso la stessa funzione da inviare in un'unica invocazione.
+        Se maggiore di 1 il payload inviato è la lista dei payload accodati
+        :param max_retries: numero di tentativi aggiuntivi in caso di errore
+        :param retry_backoff: attesa (in secondi) prima del primo nuovo tentativo, raddoppiata ad ogni tentativo
+        :param dead_letter_file: file (JSON lines) su cui scrivere gli eventi non consegnati
+        :param dead_letter_callback: funzione invocata con (evento, eccezione) per gli eventi non consegnati
+        """
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be greater than 0")
+        if workers <= 0:
+            raise ValueError("workers must be greater than 0")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be greater than 0")
+        self.client = client
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter_file = dead_letter_file
+        self.dead_letter_callback = dead_letter_callback
+        self.sent_count = 0
+        self.failed_count = 0
+        self.__queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.__lock = threading.Lock()
+        # close attende gli accodamenti in corso: nessun evento può essere accodato dopo i segnali di stop
+        self.__submit_condition = threading.Condition()
+        self.__submitting = 0
+        self.__closed = False
+        self.__workers = [
+            threading.Thread(
+                target=self.__run, name=f"lambda-dispatcher-{i}", daemon=True
+            )
+            for i in range(workers)
+        ]
+        for worker in self.__workers:
+            worker.start()
+
+    def submit(
+        self,
+        function_name: str,
+        payload: dict,
+        block: bool = True,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        Accoda un evento da inviare al Lambda. Se la coda è piena il chiamante viene bloccato (backpressure)
+        fino a timeout secondi, oppure l'eccezione viene sollevata subito se block è False
+        :param function_name: nome del lambda da invocare
+        :param payload: payload da inviare alla lambda
+        :param block: se True attende che si liberi spazio nella coda
+        :param timeout: attesa massima in secondi (None per attendere indefinitamente)
+        :return: True se l'evento è stato accodato
+        """
+        with self.__submit_condition:
+            if self.__closed:
+                raise GenericException("Dispatcher is closed")
+            self.__submitting += 1
+        try:
+            self.__queue.put(
+                {"function_name": function_name, "payload": payload},
+                block=block,
+                timeout=timeout,
+            )
+            return True
+        except queue.Full:
+            raise EventQueueFullException(
+                f"Event queue is full ({self.__queue.maxsize} events)"
+            )
+        finally:
+            with self.__submit_condition:
+                self.__submitting -= 1
+                if self.__submitting == 0:
+                    self.__submit_condition.notify_all()
+
+    def pending(self) -> int:
+        """
+        Restituisce il numero di eventi in attesa di invio
+        :return: numero di eventi in coda
+        """
+        return self.__queue.qsize()
+
+    def flush(self):
+        """
+        Attende che tutti gli eventi accodati siano stati inviati (o scritti nella dead-letter)
+        """
+        self.__queue.join()
+
+    def close(self, wait: bool = True):
+        """
+        Chiude il dispatcher. I nuovi eventi vengono rifiutati, quelli già accodati vengono inviati
+        :param wait: se True attende la terminazione dei worker
+        """
+        with self.__submit_condition:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__submit_condition.wait_for(lambda: self.__submitting == 0)
+        for _ in self.__workers:
+            self.__queue.put(self.__STOP)
+        if wait:
+            for worker in self.__workers:
+                worker.join()
+
+    def __next_batch(self, first: dict) -> list[dict]:
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                event = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is self.__STOP:
+                # il segnale di stop va lasciato agli altri worker
+                self.__queue.task_done()
+                self.__queue.put(self.__STOP)
+                break
+            batch.append(event)
+        return batch
+
+    def __run(self):
+        while True:
+            event = self.__queue.get()
+            if event is self.__STOP:
+                self.__queue.task_done()
+                return
+            batch = [event]
+            try:
+                if self.batch_size > 1:
+                    batch = self.__next_batch(event)
+                groups: dict[str, list[dict]] = {}
+                for item in batch:
+                    groups.setdefault(item["function_name"], []).append(item)
+                for function_name, events in groups.items():
+                    self.__deliver(function_name, events)
+            finally:
+                # anche in caso di errori imprevisti, altrimenti flush() resterebbe bloccato
+                for _ in batch:
+                    self.__queue.task_done()
+
+    def __deliver(self, function_name: str, events: list[dict]):
+        """
+        Invia gli eventi e, se non riesce, li scrive nella dead-letter. Non solleva eccezioni, così il worker resta attivo
+        """
+        try:
+            self.__invoke(function_name, events)
+            with self.__lock:
+                self.sent_count += len(events)
+        except Exception as e:
+            logger.warning(
+                "Lambda event delivery failed",
+                extra={"function_name": function_name, "events": len(events)},
+                exc_info=True,
+            )
+            for event in events:
+                try:
+                    self.__dead_letter(event, e)
+                except Exception:
+                    logger.exception(
+                        "Dead-letter write failed",
+                        extra={"function_name": function_name},
+                    )
+
+    def __invoke(self, function_name: str, events: list[dict]):
+        if self.batch_size > 1:
+            payload = [event["payload"] for event in events]
+        else:
+            payload = events[0]["payload"]
+        body = bytes(json.dumps(payload), encoding="utf8")
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.client.invoke(
+                    FunctionName=function_name, InvocationType="Event", Payload=body
+                )
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+
+    def __dead_letter(self, event: dict, exception: Exception):
+        with self.__lock:
+            self.failed_count += 1
+            if self.dead_letter_file is not None:
+                with open(self.dead_letter_file, "a", encoding="utf-8") as f:
+                    f.write(
+                        json.dumps(dict(event, error=str(exception)), default=str)
+                        + "\n"
+                    )
+        if self.dead_letter_callback is not None:
+            try:
+                self.dead_letter_callback(event, exception)
+            except Exception:
+                logger.exception(
+                    "Dead-letter callback failed",
+                    extra={"function_name": event["function_name"]},
+                )
+
 
 class Lambda:
     """
     Classe per la gestione di Lambda su AWS
     """
 
-    def __init__(self):
-        if not AWSConfig().is_configured():
-            raise MissingConfigurationException
-        self.client = ResourceManager.get_client(
-            service_name="lambda", **AWSConfig().to_dict()
-        )
+    def __init__(
+        self,
+        region: Region | str | None = None,
+        endpoint_url: str | None = None,
+        config: AWSConfigSnapshot | None = None,
+    ):
+        """
+        :param region: eventuale regione da usare al posto di quella configurata in AWSConfig
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato in AWSConfig
+        :param config: eventuale configurazione da usare al posto di AWSConfig().snapshot()
+        """
+        if config is None:
+            if not AWSConfig().is_configured():
+                raise MissingConfigurationException
+            config = AWSConfig().snapshot(region, endpoint_url)
+        else:
+            config = config.replace(region, endpoint_url)
+        self.config = config
+        self.region_name = config.region_name
+        self.client = ResourceManager.get_service_client(services.LAMBDA, config)
+        self.__dispatcher: LambdaEventDispatcher | None = None
+        self.__dispatcher_lock = threading.Lock()
 
     def invoke(
         self,
@@ -42,8 +290,8 @@ class Lambda:
                 Payload=payload,
                 **kwargs
             )
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def invoke_with_dict_payload(
         self,
@@ -70,5 +318,49 @@ class Lambda:
                 .read()
                 .decode("utf-8")
             )
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def start_event_dispatcher(self, **kwargs) -> LambdaEventDispatcher:
+        """
+        Avvia (se non già avviato) il dispatcher in background per le invocazioni di tipo "Event"
+        :param kwargs: parametri del dispatcher (vedi LambdaEventDispatcher)
+        :return: dispatcher associato a questa istanza
+        """
+        dispatcher = self.__dispatcher
+        if dispatcher is not None:
+            return dispatcher
+        with self.__dispatcher_lock:
+            if self.__dispatcher is None:
+                self.__dispatcher = LambdaEventDispatcher(self.client, **kwargs)
+            return self.__dispatcher
+
+    def dispatch_event(
+        self,
+        function_name: str,
+        payload: dict,
+        block: bool = True,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        Funzione per l'invocazione fire-and-forget di un Lambda. L'evento viene accodato in memoria e inviato
+        in background con InvocationType "Event"; se il dispatcher non è attivo viene avviato con i parametri di default
+        :param function_name: nome del lambda da invocare
+        :param payload: payload da inviare alla lambda
+        :param block: se True, con coda piena, attende che si liberi spazio
+        :param timeout: attesa massima in secondi per l'accodamento
+        :return: True se l'evento è stato accodato
+        """
+        return self.start_event_dispatcher().submit(
+            function_name, payload, block=block, timeout=timeout
+        )
+
+    def stop_event_dispatcher(self, wait: bool = True):
+        """
+        Ferma il dispatcher dopo aver inviato gli eventi già accodati
+        :param wait: se True attende il completamento degli invii
+        """
+        with self.__dispatcher_lock:
+            dispatcher, self.__dispatcher = self.__dispatcher, None
+        if dispatcher is not None:
+            dispatcher.close(wait=wait)
@@ -1,16 +1,40 @@
 from __future__ import annotations
 
+import base64
 import decimal
-import traceback
-from typing import List
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List
 
-from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper import parquet
+from simple_aws_wrapper.attribute_offload import AttributeOffload
+from simple_aws_wrapper.cache import TTLCache
+from simple_aws_wrapper.config import AWSConfig, AWSConfigSnapshot
 from simple_aws_wrapper.const import services
+from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.dynamodb_types import (
+    deserialize_item,
+    serialize,
+    serialize_item,
+)
 from simple_aws_wrapper.exceptions.exceptions import (
     MissingConfigurationException,
-    GenericException,
+    ThrottlingException,
+    wrap_exception,
 )
+from simple_aws_wrapper.rate_limiter import RateLimiter
 from simple_aws_wrapper.resource_manager import ResourceManager
+from simple_aws_wrapper.retry import DEFAULT_RETRY_POLICY
+
+if TYPE_CHECKING:
+    from simple_aws_wrapper.services.s3 import S3
+
+logger = logging.getLogger(__name__)
 
 
 class DynamoDB:
@@ -18,54 +42,201 @@ class DynamoDB:
     Classe per la gestione di DynamoDB su AWS
     """
 
-    def __init__(self):
-        if not AWSConfig().is_configured():
-            raise MissingConfigurationException
-        self.client = ResourceManager.get_resource(
-            services.DYNAMO_DB, **AWSConfig().to_dict()
-        )
-        self.__dynamodb = ResourceManager.get_client(
-            services.DYNAMO_DB, **AWSConfig().to_dict()
-        )
+    # numero massimo di operazioni in una transazione
+    MAX_TRANSACTION_ITEMS = 100
+    # numero massimo di chiavi in una richiesta BatchGetItem
+    MAX_BATCH_GET_KEYS = 100
+    # numero massimo di elementi in una richiesta BatchWriteItem
+    MAX_BATCH_WRITE_ITEMS = 25
+    # numero massimo di istruzioni PartiQL in una richiesta BatchExecuteStatement
+    MAX_BATCH_STATEMENTS = 25
+    # errori delle singole istruzioni di BatchExecuteStatement che vengono ripetute con backoff
+    RETRYABLE_STATEMENT_ERRORS = frozenset(
+        {
+            "ProvisionedThroughputExceeded",
+            "RequestLimitExceeded",
+            "ThrottlingError",
+            "InternalServerError",
+            "TransactionConflict",
+        }
+    )
+    # Limit iniziale e massimo delle pagine delle scan a capacità limitata
+    INITIAL_THROTTLED_SCAN_LIMIT = 25
+    MAX_THROTTLED_SCAN_LIMIT = 1000
+    # numero massimo di oggetti Table condivisi tra le istanze
+    MAX_CACHED_TABLES = 1024
+    # oggetti Table condivisi tra le istanze, per (configurazione, nome tabella); senza scadenza ma con dimensione
+    # massima (vengono rimossi per primi quelli usati meno di recente)
+    __tables: TTLCache = TTLCache(default_ttl=math.inf, max_size=MAX_CACHED_TABLES)
+
+    def __init__(
+        self,
+        region: Region | str | None = None,
+        endpoint_url: str | None = None,
+        config: AWSConfigSnapshot | None = None,
+        offload: AttributeOffload | None = None,
+    ):
+        """
+        :param region: eventuale regione da usare al posto di quella configurata in AWSConfig
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato in AWSConfig
+        :param config: eventuale configurazione da usare al posto di AWSConfig().snapshot()
+        :param offload: eventuale configurazione per spostare su S3 gli attributi grandi. In scrittura (put_item,
+        batch_put_items, update_item e transact_write) gli attributi oltre la soglia vengono sostituiti da un
+        puntatore; in lettura restituiti come
+        OffloadedAttribute, scaricati al primo accesso a value o in parallelo con resolve_offloaded
+        """
+        if config is None:
+            if not AWSConfig().is_configured():
+                raise MissingConfigurationException
+            config = AWSConfig().snapshot(region, endpoint_url)
+        else:
+            config = config.replace(region, endpoint_url)
+        self.config = config
+        self.region_name = config.region_name
+        self.offload = offload
+        # risorsa e client vengono creati al primo utilizzo
+        self.__resource = None
+        self.__client = None
+
+    @property
+    def client(self):
+        """
+        Risorsa boto3 di DynamoDB, creata al primo utilizzo
+        :return: dynamodb.ServiceResource
+        """
+        if self.__resource is None:
+            self.__resource = ResourceManager.get_service_client(
+                services.DYNAMO_DB, self.config, resource=True
+            )
+        return self.__resource
+
+    @property
+    def __dynamodb(self):
+        """
+        Client di basso livello di DynamoDB, creato al primo utilizzo
+        """
+        if self.__client is None:
+            self.__client = ResourceManager.get_service_client(
+                services.DYNAMO_DB, self.config
+            )
+        return self.__client
 
     def __get_table_resource(self, table_name: str):
         """
-        Funzione per effettuare la get di una risorsa di tipo tabella di DynamoDB
+        Funzione per effettuare la get di una risorsa di tipo tabella di DynamoDB. L'oggetto Table viene creato una
+        sola volta per tabella e configurazione, e ricreato se il pool dei client è stato svuotato
+        (ResourceManager.clear_service_clients), così da non usare più i client precedenti
         :param table_name: nome tabella
         :return: dynamodb.Table
         """
-        try:
-            return self.client.Table(table_name)
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        key = (self.config, table_name)
+        table = DynamoDB.__tables.get(key)
+        if table is None or table.meta.client is not self.client.meta.client:
+            try:
+                table = self.client.Table(table_name)
+            except Exception as e:
+                raise wrap_exception(e)
+            DynamoDB.__tables.set(key, table)
+        return table
 
-    def get_record(self, table_name: str, key: dict):
+    def get_record(
+        self,
+        table_name: str,
+        key: dict,
+        consistent_read: bool = False,
+        projection_expression: str | None = None,
+        expression_attribute_names: dict | None = None,
+    ):
         """
         Funzione per prelevare un record all'interno di una tabella
         :param table_name: nome tabella
         :param key: chiave del record da prelevare
+        :param consistent_read: se True esegue una lettura fortemente consistente
+        :param projection_expression: eventuali attributi da restituire (es. "#a, #b")
+        :param expression_attribute_names: eventuali segnaposto dei nomi degli attributi (es. {"#a": "name"})
         :return: Dizionario con i valori del record
         """
         try:
-            output = self.__get_table_resource(table_name).get_item(Key=key)
+            kwargs: dict = {"Key": key}
+            if consistent_read:
+                kwargs["ConsistentRead"] = True
+            if projection_expression is not None:
+                kwargs["ProjectionExpression"] = projection_expression
+            if expression_attribute_names:
+                kwargs["ExpressionAttributeNames"] = expression_attribute_names
+            output = self.__get_table_resource(table_name).get_item(**kwargs)
             if "Item" not in output:
                 return None
+            if self.offload is not None:
+                self.offload.load_item(output["Item"])
             return output
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
-    def put_item(self, table_name: str, item: dict) -> bool:
+    @staticmethod
+    def __expression_kwargs(
+        condition_expression: str | None = None,
+        expression_attribute_names: dict | None = None,
+        expression_attribute_values: dict | None = None,
+    ) -> dict:
+        """
+        Restituisce i parametri opzionali di condizione ed espressione di una richiesta
+        """
+        kwargs: dict = {}
+        if condition_expression is not None:
+            kwargs["ConditionExpression"] = condition_expression
+        if expression_attribute_names:
+            kwargs["ExpressionAttributeNames"] = expression_attribute_names
+        if expression_attribute_values:
+            kwargs["ExpressionAttributeValues"] = expression_attribute_values
+        return kwargs
+
+    def put_item(
+        self,
+        table_name: str,
+        item: dict,
+        condition_expression: str | None = None,
+        expression_attribute_names: dict | None = None,
+        expression_attribute_values: dict | None = None,
+    ) -> bool:
         """
         Funzione per inserire una enry all'interno di una tabella
         :param table_name: nome della tabella in cui effettuare l'inserimento
         :param item: entry da inserire sotto forma di dizionario chiave-valore
+        :param condition_expression: eventuale condizione per la scrittura (es. "attribute_not_exists(id)"). Se non
+        soddisfatta viene sollevata ConditionalCheckFailedException
+        :param expression_attribute_names: eventuali segnaposto dei nomi degli attributi (es. {"#v": "version"})
+        :param expression_attribute_values: eventuali valori usati nella condizione (es. {":v": 1})
         :return: None
         """
         try:
-            self.__get_table_resource(table_name).put_item(Item=item)
+            kwargs = self.__expression_kwargs(
+                condition_expression,
+                expression_attribute_names,
+                expression_attribute_values,
+            )
+            if self.offload is None:
+                self.__get_table_resource(table_name).put_item(Item=item, **kwargs)
+                return True
+            (item,), object_keys = self.offload.offload_items(table_name, [item])
+            if self.offload.delete_replaced:
+                kwargs["ReturnValues"] = "ALL_OLD"
+            try:
+                response = self.__get_table_resource(table_name).put_item(
+                    Item=item, **kwargs
+                )
+            except Exception:
+                # gli oggetti appena caricati non sono referenziati da nessun elemento
+                self.offload.delete_objects(object_keys)
+                raise
+            if self.offload.delete_replaced:
+                self.offload.delete_objects(
+                    self.offload.object_keys(response.get("Attributes"))
+                    - self.offload.object_keys(item)
+                )
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def scan_table(self, table_name: str) -> dict:
         """
@@ -75,101 +246,436 @@ class DynamoDB:
         rispettivi valori
         """
         try:
-            return self.__get_table_resource(table_name).scan()
-        except Exception:
-            raise GenericException(traceback.format_exc())
+            output = self.__get_table_resource(table_name).scan()
+            if self.offload is not None:
+                for item in output.get("Items", []):
+                    self.offload.load_item(item)
+            return output
+        except Exception as e:
+            raise wrap_exception(e)
 
     def update_item(
         self,
         table_name: str,
         key: dict,
         update_expression: str,
-        expression_attribute_values: dict,
-    ) -> bool:
+        expression_attribute_values: dict | None = None,
+        condition_expression: str | None = None,
+        expression_attribute_names: dict | None = None,
+        return_values: str | None = None,
+    ) -> bool | dict:
         """
-        Funzione per aggiornare un elemento all'interno di una tabella
+        Funzione per aggiornare un elemento all'interno di una tabella. Con lo spostamento su S3 attivo i valori oltre
+        la soglia assegnati direttamente a un attributo (SET a = :v) vengono spostati come in put_item
         :param table_name: nome tabella
         :param key: chiave del record da aggiornare
         :param update_expression: espressione di aggiornamento
         :param expression_attribute_values: dizionario con i valori dei parametri
-        :return: Booleano che indica se l'operazione è andata a buon fine o meno
+        :param condition_expression: eventuale condizione per l'aggiornamento. Se non soddisfatta viene sollevata
+        ConditionalCheckFailedException
+        :param expression_attribute_names: eventuali segnaposto dei nomi degli attributi (es. {"#v": "version"})
+        :param return_values: eventuali valori da restituire ("ALL_NEW", "UPDATED_NEW", "ALL_OLD", "UPDATED_OLD")
+        :return: True se return_values è None, altrimenti il dizionario degli attributi restituiti
         """
         try:
-            self.__get_table_resource(table_name).update_item(
-                Key=key,
-                UpdateExpression=update_expression,
-                ExpressionAttributeValues=expression_attribute_values,
+            kwargs = self.__expression_kwargs(
+                condition_expression,
+                expression_attribute_names,
+                expression_attribute_values,
             )
+            if return_values is not None:
+                kwargs["ReturnValues"] = return_values
+            object_keys: list = []
+            if self.offload is not None and expression_attribute_values:
+                kwargs["ExpressionAttributeValues"], object_keys = self.offload.offload_update(
+                    table_name,
+                    update_expression,
+                    expression_attribute_values,
+                    condition_expression,
+                )
+            try:
+                response = self.__get_table_resource(table_name).update_item(
+                    Key=key, UpdateExpression=update_expression, **kwargs
+                )
+            except Exception:
+                if object_keys:
+                    self.offload.delete_objects(object_keys)
+                raise
+            if return_values is not None:
+                return self.__load_item(response.get("Attributes", {}))
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
-    def get_item(self, table_name: str, key: dict) -> dict | None:
+    def get_item(
+        self, table_name: str, key: dict, consistent_read: bool = False
+    ) -> dict | None:
         """
         Funzione per prelevare un elemento all'interno di una tabella
         :param table_name: nome tabella
         :param key: chiave del record da prelevare
+        :param consistent_read: se True esegue una lettura fortemente consistente
         :return: Dizionario con i valori del record
         """
         try:
-            return self.get_record(table_name, key)["Item"]
-        except TypeError as te:
-            print("Record not found")
-            return None
-        except KeyError as ke:
-            print("Record not found")
+            return self.get_record(table_name, key, consistent_read)["Item"]
+        except (TypeError, KeyError):
+            logger.debug(
+                "Record not found", extra={"table_name": table_name, "key": key}
+            )
             return None
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def get_item_value(
-        self, table_name: str, key: dict, attribute_name: str
+        self,
+        table_name: str,
+        key: dict,
+        attribute_name: str,
+        consistent_read: bool = False,
     ) -> decimal.Decimal | str | bool | None:
         """
-        Funzione per prelevare un elemento all'interno di una tabella
+        Funzione per prelevare un elemento all'interno di una tabella. Viene richiesto solo l'attributo indicato
+        (ProjectionExpression), senza scaricare l'intero record
         :param table_name: nome tabella
         :param key: chiave del record da prelevare
         :param attribute_name: nome dell'attributo da prelevare dal record estratto
+        :param consistent_read: se True esegue una lettura fortemente consistente
         :return: Dizionario con i valori del record
         """
         try:
-            return self.get_record(table_name, key)["Item"][attribute_name]
-        except TypeError as te:
-            print(str(te))
-            print("Record not found")
+            return self.get_record(
+                table_name,
+                key,
+                consistent_read,
+                projection_expression="#attribute",
+                expression_attribute_names={"#attribute": attribute_name},
+            )["Item"][attribute_name]
+        except TypeError:
+            logger.debug(
+                "Record not found", extra={"table_name": table_name, "key": key}
+            )
             return None
-        except KeyError as ke:
-            print(f'Record has no attribute "{attribute_name}"')
+        except KeyError:
+            logger.debug(
+                "Record has no attribute",
+                extra={
+                    "table_name": table_name,
+                    "key": key,
+                    "attribute_name": attribute_name,
+                },
+            )
             return None
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
-    def key_exists(self, table_name: str, key: dict) -> bool:
+    def key_exists(
+        self, table_name: str, key: dict, consistent_read: bool = False
+    ) -> bool:
         """
-        Funzione per verificare se un elemento esiste all'interno di una tabella
+        Funzione per verificare se un elemento esiste all'interno di una tabella. Viene eseguita una sola richiesta
+        che restituisce solo gli attributi della chiave
         :param table_name: nome tabella
         :param key: chiave del record da verificare
+        :param consistent_read: se True esegue una lettura fortemente consistente
         :return: Booleano che indica se l'elemento esiste o meno
         """
+        projection_expression, expression_attribute_names = self.__key_projection(key)
+        return (
+            self.get_record(
+                table_name,
+                key,
+                consistent_read,
+                projection_expression,
+                expression_attribute_names,
+            )
+            is not None
+        )
+
+    def keys_exist(
+        self,
+        table_name: str,
+        keys: list[dict],
+        consistent_read: bool = False,
+        max_workers: int = 4,
+    ) -> list[bool]:
+        """
+        Funzione per verificare l'esistenza di più elementi con BatchGetItem (fino a MAX_BATCH_GET_KEYS chiavi per
+        richiesta, eseguite in parallelo), restituendo solo gli attributi della chiave
+        :param table_name: nome tabella
+        :param keys: lista delle chiavi da verificare
+        :param consistent_read: se True esegue letture fortemente consistenti
+        :param max_workers: numero massimo di richieste contemporanee
+        :return: lista di booleani nello stesso ordine delle chiavi
+        """
+        if not keys:
+            return []
         try:
-            return self.get_record(
-                table_name, key
-            ) is not None and "Item" in self.get_record(table_name, key)
-        except Exception:
-            raise GenericException(traceback.format_exc())
+            serialized_keys = {}
+            for key in keys:
+                serialized = serialize_item(key)
+                serialized_keys.setdefault(self.__key_id(serialized), serialized)
+            unique_keys = list(serialized_keys.values())
+            chunks = [
+                unique_keys[i : i + self.MAX_BATCH_GET_KEYS]
+                for i in range(0, len(unique_keys), self.MAX_BATCH_GET_KEYS)
+            ]
+            projection_expression, expression_attribute_names = self.__key_projection(
+                keys[0]
+            )
+            request = {
+                "ConsistentRead": consistent_read,
+                "ProjectionExpression": projection_expression,
+                "ExpressionAttributeNames": expression_attribute_names,
+            }
+
+            def fetch(chunk: list) -> list:
+                return self.__batch_get(table_name, {**request, "Keys": chunk})
 
-    def delete_item(self, table_name: str, key: dict) -> bool:
+            found: set = set()
+            if len(chunks) == 1 or max_workers <= 1:
+                results = map(fetch, chunks)
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(chunks))
+                ) as executor:
+                    results = list(executor.map(fetch, chunks))
+            for items in results:
+                found.update(self.__key_id(item) for item in items)
+            return [self.__key_id(serialize_item(key)) in found for key in keys]
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def __batch_get(self, table_name: str, request: dict) -> list:
+        """
+        Esegue una BatchGetItem su una tabella, ripetendo con backoff le chiavi non elaborate
+        :return: lista degli elementi (AttributeValue) restituiti
+        """
+        items: list = []
+        attempt = 0
+        while True:
+            response = self.__dynamodb.batch_get_item(RequestItems={table_name: request})
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            unprocessed = response.get("UnprocessedKeys", {}).get(table_name)
+            if not unprocessed or not unprocessed.get("Keys"):
+                return items
+            attempt += 1
+            if attempt >= DEFAULT_RETRY_POLICY.max_attempts:
+                raise ThrottlingException(
+                    f"{len(unprocessed['Keys'])} keys not processed by BatchGetItem"
+                )
+            time.sleep(DEFAULT_RETRY_POLICY.get_delay(attempt))
+            request = unprocessed
+
+    @staticmethod
+    def __key_projection(key: dict) -> tuple:
+        """
+        Restituisce ProjectionExpression e ExpressionAttributeNames per leggere solo gli attributi della chiave
+        """
+        names = {f"#key{i}": name for i, name in enumerate(key)}
+        return ", ".join(names), names
+
+    @staticmethod
+    def __key_id(item: dict) -> tuple:
+        """
+        Restituisce un identificativo hashable di una chiave già convertita in AttributeValue
+        """
+        return tuple(
+            sorted(
+                # i numeri vengono normalizzati ("1.0" e "1" identificano la stessa chiave)
+                (name, tag, decimal.Decimal(value).normalize() if tag == "N" else value)
+                for name, attribute in item.items()
+                for tag, value in attribute.items()
+            )
+        )
+
+    def delete_item(
+        self,
+        table_name: str,
+        key: dict,
+        condition_expression: str | None = None,
+        expression_attribute_names: dict | None = None,
+        expression_attribute_values: dict | None = None,
+    ) -> bool:
         """
         Funzione per eliminare un elemento all'interno di una tabella
         :param table_name: nome tabella
         :param key: chiave del record da eliminare
+        :param condition_expression: eventuale condizione per la cancellazione. Se non soddisfatta viene sollevata
+        ConditionalCheckFailedException
+        :param expression_attribute_names: eventuali segnaposto dei nomi degli attributi
+        :param expression_attribute_values: eventuali valori usati nella condizione
         :return: Booleano che indica se l'operazione Ã© andata a buon fine o meno
         """
         try:
-            self.__get_table_resource(table_name).delete_item(Key=key)
+            kwargs = self.__expression_kwargs(
+                condition_expression,
+                expression_attribute_names,
+                expression_attribute_values,
+            )
+            delete_offloaded = self.offload is not None and self.offload.delete_replaced
+            if delete_offloaded:
+                kwargs["ReturnValues"] = "ALL_OLD"
+            response = self.__get_table_resource(table_name).delete_item(
+                Key=key, **kwargs
+            )
+            if delete_offloaded:
+                self.offload.delete_objects(
+                    self.offload.object_keys(response.get("Attributes"))
+                )
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def increment_counter(
+        self,
+        table_name: str,
+        key: dict,
+        attribute_name: str,
+        amount: int | decimal.Decimal = 1,
+        condition_expression: str | None = None,
+        expression_attribute_names: dict | None = None,
+        expression_attribute_values: dict | None = None,
+    ) -> decimal.Decimal:
+        """
+        Funzione per incrementare in modo atomico un contatore, con una sola richiesta. Se l'elemento o l'attributo
+        non esistono, il contatore parte da 0
+        :param table_name: nome tabella
+        :param key: chiave del record
+        :param attribute_name: nome dell'attributo contatore
+        :param amount: incremento (negativo per decrementare)
+        :param condition_expression: eventuale condizione per l'incremento (es. "#counter < :max"). Il contatore è
+        disponibile come "#counter" e l'incremento come ":amount"
+        :param expression_attribute_names: eventuali ulteriori segnaposto dei nomi degli attributi
+        :param expression_attribute_values: eventuali ulteriori valori usati nella condizione
+        :return: nuovo valore del contatore
+        """
+        attributes = self.update_item(
+            table_name,
+            key,
+            "ADD #counter :amount",
+            {":amount": amount, **(expression_attribute_values or {})},
+            condition_expression,
+            {"#counter": attribute_name, **(expression_attribute_names or {})},
+            "UPDATED_NEW",
+        )
+        return attributes[attribute_name]
+
+    def transact_write(
+        self, operations: list[dict], client_request_token: str | None = None
+    ) -> bool:
+        """
+        Funzione per eseguire fino a MAX_TRANSACTION_ITEMS scritture in un'unica transazione (tutte o nessuna).
+        Ogni operazione è un dizionario nel formato di TransactWriteItems con valori Python, ad esempio
+        {"Put": {"TableName": "t", "Item": {"id": "1"}, "ConditionExpression": "attribute_not_exists(id)"}},
+        {"Update": {...}}, {"Delete": {...}} o {"ConditionCheck": {...}}. Se una condizione non è soddisfatta viene
+        sollevata ConditionalCheckFailedException, se la transazione è annullata per throttling ThrottlingException,
+        per gli altri motivi (es. conflitto con un'altra transazione, ripetibile) TransactionCanceledException. I
+        motivi sono in cause.response["CancellationReasons"]
+        Con lo spostamento su S3 attivo gli attributi grandi degli elementi di Put e i valori assegnati direttamente
+        negli Update vengono spostati come in put_item e update_item
+        :param operations: lista delle operazioni
+        :param client_request_token: eventuale token di idempotenza
+        :return: True se la transazione va a buon fine
+        """
+        if not operations:
+            return True
+        if len(operations) > self.MAX_TRANSACTION_ITEMS:
+            raise ValueError(
+                f"A transaction supports at most {self.MAX_TRANSACTION_ITEMS} operations"
+            )
+        object_keys: list = []
+        try:
+            if self.offload is not None:
+                operations = [
+                    self.__offload_transact_item(operation, object_keys)
+                    for operation in operations
+                ]
+            kwargs: dict = {
+                "TransactItems": [
+                    self.__serialize_transact_item(operation) for operation in operations
+                ]
+            }
+            if client_request_token is not None:
+                kwargs["ClientRequestToken"] = client_request_token
+            self.__dynamodb.transact_write_items(**kwargs)
+            return True
+        except Exception as e:
+            if object_keys:
+                # transazione non eseguita: gli oggetti caricati non sono referenziati
+                self.offload.delete_objects(object_keys)
+            raise wrap_exception(e)
+
+    def __offload_transact_item(self, operation: dict, object_keys: list) -> dict:
+        """
+        Sposta su S3 gli attributi grandi di un'operazione Put o Update di TransactWriteItems, aggiungendo a
+        object_keys gli oggetti caricati
+        """
+        ((operation_type, request),) = operation.items()
+        if operation_type == "Put":
+            (item,), keys = self.offload.offload_items(
+                request["TableName"], [request["Item"]]
+            )
+            request = {**request, "Item": item}
+        elif operation_type == "Update" and request.get("ExpressionAttributeValues"):
+            values, keys = self.offload.offload_update(
+                request["TableName"],
+                request["UpdateExpression"],
+                request["ExpressionAttributeValues"],
+                request.get("ConditionExpression"),
+            )
+            request = {**request, "ExpressionAttributeValues": values}
+        else:
+            return operation
+        object_keys.extend(keys)
+        return {operation_type: request}
+
+    def transact_get(
+        self, requests: list, use_native_numbers: bool = False
+    ) -> list[dict | None]:
+        """
+        Funzione per leggere fino a MAX_TRANSACTION_ITEMS elementi in un'unica richiesta, con una vista consistente
+        :param requests: lista di tuple (nome_tabella, chiave) o di dizionari nel formato di Get di TransactGetItems
+        (es. {"TableName": "t", "Key": {"id": "1"}, "ProjectionExpression": "id"})
+        :param use_native_numbers: se True i numeri vengono restituiti come int/float invece che come Decimal
+        :return: lista degli elementi nello stesso ordine delle richieste (None per gli elementi inesistenti)
+        """
+        if not requests:
+            return []
+        if len(requests) > self.MAX_TRANSACTION_ITEMS:
+            raise ValueError(
+                f"A transaction supports at most {self.MAX_TRANSACTION_ITEMS} operations"
+            )
+        try:
+            transact_items = []
+            for request in requests:
+                if isinstance(request, tuple):
+                    table_name, key = request
+                    request = {"TableName": table_name, "Key": key}
+                transact_items.append(
+                    {"Get": {**request, "Key": serialize_item(request["Key"])}}
+                )
+            response = self.__dynamodb.transact_get_items(TransactItems=transact_items)
+            return [
+                self.__load_item(deserialize_item(item["Item"], use_native_numbers))
+                if "Item" in item
+                else None
+                for item in response["Responses"]
+            ]
+        except Exception as e:
+            raise wrap_exception(e)
+
+    @staticmethod
+    def __serialize_transact_item(operation: dict) -> dict:
+        """
+        Converte i valori Python di un'operazione di TransactWriteItems in AttributeValue
+        """
+        ((operation_type, request),) = operation.items()
+        request = dict(request)
+        for field in ("Item", "Key", "ExpressionAttributeValues"):
+            if field in request:
+                request[field] = serialize_item(request[field])
+        return {operation_type: request}
 
     def load(self, table_name: str):
         """
@@ -179,8 +685,8 @@ class DynamoDB:
         """
         try:
             return self.__get_table_resource(table_name).load()
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def create_table(
         self,
@@ -208,8 +714,8 @@ class DynamoDB:
                 **kwargs,
             )
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def delete_table(self, table_name: str) -> bool:
         """
@@ -219,31 +725,656 @@ class DynamoDB:
         """
         try:
             self.__get_table_resource(table_name).delete()
+            DynamoDB.__tables.invalidate((self.config, table_name))
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def scan_items(
+        self,
+        table_name: str,
+        use_native_numbers: bool = False,
+        target_rcu: float | None = None,
+        capacity_percentage: float | None = None,
+        **kwargs,
+    ):
+        """
+        Funzione per scorrere tutti gli elementi di una tabella (gestendo la paginazione). Usa direttamente il client,
+        senza passare dalla risorsa boto3, e converte gli elementi con dynamodb_types.
+        Indicando target_rcu o capacity_percentage la scansione limita la capacità di lettura consumata, così da non
+        sottrarla al traffico applicativo
+        :param table_name: nome tabella
+        :param use_native_numbers: se True i numeri vengono restituiti come int/float invece che come Decimal
+        :param target_rcu: eventuali unità di capacità di lettura al secondo da non superare
+        :param capacity_percentage: eventuale percentuale (0-100) della capacità di lettura provisioned della tabella
+        da non superare (letta con describe_table)
+        :param kwargs: parametri aggiuntivi di scan (es. FilterExpression, ProjectionExpression, Segment)
+        :return: generatore degli elementi
+        """
+        try:
+            if target_rcu is None and capacity_percentage is None:
+                paginator = self.__dynamodb.get_paginator("scan")
+                pages = paginator.paginate(TableName=table_name, **kwargs)
+            else:
+                pages = self.__throttled_scan_pages(
+                    table_name, target_rcu, capacity_percentage, kwargs
+                )
+            for page in pages:
+                for item in page.get("Items", []):
+                    yield self.__load_item(deserialize_item(item, use_native_numbers))
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def get_read_capacity(self, table_name: str) -> float:
+        """
+        Funzione per leggere la capacità di lettura provisioned di una tabella
+        :param table_name: nome tabella
+        :return: unità di capacità di lettura al secondo (0 per le tabelle on-demand)
+        """
+        try:
+            table = self.__dynamodb.describe_table(TableName=table_name)["Table"]
+            if table.get("BillingModeSummary", {}).get("BillingMode") == "PAY_PER_REQUEST":
+                return 0.0
+            return float(table.get("ProvisionedThroughput", {}).get("ReadCapacityUnits", 0))
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def __throttled_scan_pages(
+        self,
+        table_name: str,
+        target_rcu: float | None,
+        capacity_percentage: float | None,
+        kwargs: dict,
+    ):
+        """
+        Generatore delle pagine di una scan che consuma al massimo target_rcu unità di lettura al secondo. La capacità
+        consumata da ogni pagina (ReturnConsumedCapacity) viene prelevata da un token bucket e il Limit della pagina
+        successiva viene adattato per consumare circa un secondo di capacità per pagina
+        """
+        if target_rcu is None:
+            if not 0 < capacity_percentage <= 100:
+                raise ValueError("capacity_percentage must be between 0 and 100")
+            target_rcu = self.get_read_capacity(table_name) * capacity_percentage / 100
+            if target_rcu <= 0:
+                raise ValueError(
+                    "target_rcu is required for tables without provisioned read capacity"
+                )
+        elif target_rcu <= 0:
+            raise ValueError("target_rcu must be greater than 0")
+        rate_limiter = RateLimiter(target_rcu)
+        max_limit = kwargs.pop("Limit", self.MAX_THROTTLED_SCAN_LIMIT)
+        limit = min(max_limit, self.INITIAL_THROTTLED_SCAN_LIMIT)
+        request = {
+            **kwargs,
+            "TableName": table_name,
+            "ReturnConsumedCapacity": "TOTAL",
+        }
+        while True:
+            page = self.__dynamodb.scan(Limit=limit, **request)
+            yield page
+            consumed = page.get("ConsumedCapacity", {}).get("CapacityUnits", 0.0)
+            scanned = page.get("ScannedCount", 0)
+            if "LastEvaluatedKey" not in page:
+                return
+            request["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+            if consumed > 0:
+                # la capacità consumata viene pagata prima della richiesta successiva
+                rate_limiter.acquire(consumed)
+                if scanned > 0:
+                    limit = max(1, min(max_limit, int(target_rcu * scanned / consumed)))
+            logger.debug(
+                "Throttled scan page",
+                extra={
+                    "table_name": table_name,
+                    "consumed_capacity": consumed,
+                    "scanned_count": scanned,
+                    "next_limit": limit,
+                },
+            )
 
     def scan_filter_elements(
-        self, table_name: str, column_name: str, value: any, type: str
+        self,
+        table_name: str,
+        column_name: str,
+        value: any,
+        type: str | None = None,
+        use_native_numbers: bool = False,
+        target_rcu: float | None = None,
+        capacity_percentage: float | None = None,
     ) -> list[dict] | None:
-        response = self.__dynamodb.scan(
-            TableName=table_name,
-            FilterExpression=f"{column_name} = :val",
-            ExpressionAttributeValues={":val": {type: value}},
+        """
+        Funzione per prelevare gli elementi di una tabella con un attributo uguale al valore indicato
+        :param table_name: nome tabella
+        :param column_name: nome dell'attributo
+        :param value: valore dell'attributo
+        :param type: tipo DynamoDB del valore (es. "S", "N", "BOOL"). Se None viene ricavato dal valore
+        :param use_native_numbers: se True i numeri vengono restituiti come int/float invece che come Decimal
+        :param target_rcu: eventuali unità di capacità di lettura al secondo da non superare
+        :param capacity_percentage: eventuale percentuale della capacità di lettura provisioned da non superare
+        :return: lista degli elementi
+        """
+        return list(
+            self.scan_items(
+                table_name,
+                use_native_numbers,
+                target_rcu,
+                capacity_percentage,
+                FilterExpression="#column = :val",
+                ExpressionAttributeNames={"#column": column_name},
+                ExpressionAttributeValues={
+                    ":val": serialize(value) if type is None else {type: value}
+                },
+            )
         )
-        output_list: list[dict] = []
-        items = response.get("Items", [])
-        output_list.extend(items)
-        while "LastEvaluatedKey" in response:
-            response = self.__dynamodb.scan(
-                TableName=table_name,
-                FilterExpression=f"{column_name} = :val",
-                ExpressionAttributeValues={":val": {type: value}},
-                ExclusiveStartKey=response["LastEvaluatedKey"],
-            )
-            items = response.get("Items", [])
-            output_list.extend(items)
-        for item in output_list:
-            for k, v in item.items():
-                item[k] = list(v.values())[0]
-        return output_list
+
+    def execute_statement(
+        self,
+        statement: str,
+        parameters: list | None = None,
+        consistent_read: bool = False,
+        use_native_numbers: bool = False,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """
+        Funzione per eseguire un'istruzione PartiQL (SELECT, INSERT, UPDATE, DELETE), leggendo tutte le pagine del
+        risultato. I parametri vengono convertiti con dynamodb_types
+        :param statement: istruzione PartiQL (es. "SELECT * FROM t WHERE id = ?")
+        :param parameters: eventuali valori dei segnaposto "?", in ordine
+        :param consistent_read: se True esegue una lettura fortemente consistente
+        :param use_native_numbers: se True i numeri vengono restituiti come int/float invece che come Decimal
+        :param limit: eventuale numero massimo di elementi valutati per pagina
+        :return: lista degli elementi restituiti (vuota per le istruzioni di scrittura)
+        """
+        try:
+            request = self.__statement_request(statement, parameters, consistent_read)
+            if limit is not None:
+                request["Limit"] = limit
+            items = []
+            while True:
+                response = self.__dynamodb.execute_statement(**request)
+                items.extend(
+                    self.__load_item(deserialize_item(item, use_native_numbers))
+                    for item in response.get("Items", [])
+                )
+                if "NextToken" not in response:
+                    return items
+                request["NextToken"] = response["NextToken"]
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def batch_execute_statement(
+        self,
+        statements: list,
+        use_native_numbers: bool = False,
+        max_workers: int = 4,
+    ) -> list[dict]:
+        """
+        Funzione per eseguire più istruzioni PartiQL con BatchExecuteStatement (fino a MAX_BATCH_STATEMENTS istruzioni
+        per richiesta, eseguite in parallelo). Letture e scritture vengono inviate in richieste separate, come
+        richiesto da DynamoDB. L'errore di un'istruzione non interrompe le altre: viene riportato nel suo risultato
+        (anche se i parametri non possono essere convertiti, con codice "ValidationError"); le istruzioni fallite per
+        throttling vengono ripetute con backoff
+        :param statements: lista di istruzioni, come stringhe, tuple (istruzione, parametri) o dizionari
+        {"Statement", "Parameters", "ConsistentRead"} con i parametri come valori Python
+        :param use_native_numbers: se True i numeri vengono restituiti come int/float invece che come Decimal
+        :param max_workers: numero massimo di richieste contemporanee
+        :return: lista dei risultati nello stesso ordine delle istruzioni, ognuno nel formato {"Item": elemento o
+        None, "Error": None o {"Code": ..., "Message": ...}}
+        """
+        if not statements:
+            return []
+        try:
+            requests: list = [None] * len(statements)
+            results: list = [None] * len(statements)
+            for index, statement in enumerate(statements):
+                if isinstance(statement, str):
+                    statement = {"Statement": statement}
+                elif isinstance(statement, tuple):
+                    statement = {"Statement": statement[0], "Parameters": statement[1]}
+                try:
+                    requests[index] = self.__statement_request(
+                        statement["Statement"],
+                        statement.get("Parameters"),
+                        statement.get("ConsistentRead", False),
+                    )
+                except (TypeError, ValueError) as e:
+                    # parametri non convertibili (es. NaN): l'istruzione non viene inviata, le altre sì
+                    results[index] = {
+                        "Item": None,
+                        "Error": {"Code": "ValidationError", "Message": str(e)},
+                    }
+            reads: list = []
+            writes: list = []
+            for index, request in enumerate(requests):
+                if request is None:
+                    continue
+                if request["Statement"].lstrip()[:6].upper() == "SELECT":
+                    reads.append(index)
+                else:
+                    writes.append(index)
+            chunks = [
+                indexes[i : i + self.MAX_BATCH_STATEMENTS]
+                for indexes in (reads, writes)
+                for i in range(0, len(indexes), self.MAX_BATCH_STATEMENTS)
+            ]
+
+            def execute(chunk: list):
+                responses = self.__batch_execute([requests[index] for index in chunk])
+                for index, response in zip(chunk, responses):
+                    item = response.get("Item")
+                    results[index] = {
+                        "Item": None
+                        if item is None
+                        else self.__load_item(deserialize_item(item, use_native_numbers)),
+                        "Error": response.get("Error"),
+                    }
+
+            if len(chunks) <= 1 or max_workers <= 1:
+                for chunk in chunks:
+                    execute(chunk)
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(chunks))
+                ) as executor:
+                    list(executor.map(execute, chunks))
+            return results
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def __batch_execute(self, requests: list) -> list:
+        """
+        Esegue una BatchExecuteStatement, ripetendo con backoff le istruzioni fallite per errori temporanei. Dopo
+        l'ultimo tentativo l'errore resta nella risposta dell'istruzione
+        :return: lista delle risposte (formato di BatchExecuteStatement) nello stesso ordine delle istruzioni
+        """
+        responses: list = [None] * len(requests)
+        pending = list(range(len(requests)))
+        attempt = 0
+        while True:
+            output = self.__dynamodb.batch_execute_statement(
+                Statements=[requests[index] for index in pending]
+            )
+            retry = []
+            for index, response in zip(pending, output["Responses"]):
+                responses[index] = response
+                if (
+                    response.get("Error", {}).get("Code")
+                    in self.RETRYABLE_STATEMENT_ERRORS
+                ):
+                    retry.append(index)
+            attempt += 1
+            if not retry or attempt >= DEFAULT_RETRY_POLICY.max_attempts:
+                return responses
+            time.sleep(DEFAULT_RETRY_POLICY.get_delay(attempt))
+            pending = retry
+
+    @staticmethod
+    def __statement_request(
+        statement: str, parameters: list | None, consistent_read: bool
+    ) -> dict:
+        """
+        Restituisce la richiesta di un'istruzione PartiQL, con i parametri convertiti in AttributeValue
+        """
+        request: dict = {"Statement": statement}
+        if parameters:
+            request["Parameters"] = [serialize(parameter) for parameter in parameters]
+        if consistent_read:
+            request["ConsistentRead"] = True
+        return request
+
+    def batch_put_items(self, table_name: str, items: list[dict]) -> int:
+        """
+        Funzione per inserire più elementi con BatchWriteItem (MAX_BATCH_WRITE_ITEMS elementi per richiesta),
+        ripetendo con backoff gli elementi non elaborati. Con lo spostamento su S3 attivo gli attributi grandi di
+        tutti gli elementi vengono caricati in parallelo prima della scrittura
+        :param table_name: nome tabella
+        :param items: lista degli elementi da inserire
+        :return: numero di elementi inseriti
+        """
+        try:
+            object_keys: list = []
+            if self.offload is not None:
+                items, object_keys = self.offload.offload_items(table_name, items)
+            requests = [{"PutRequest": {"Item": serialize_item(item)}} for item in items]
+            for i in range(0, len(requests), self.MAX_BATCH_WRITE_ITEMS):
+                chunk = requests[i : i + self.MAX_BATCH_WRITE_ITEMS]
+                try:
+                    self.__batch_write(table_name, chunk)
+                except Exception:
+                    if object_keys:
+                        self.__delete_unwritten_objects(
+                            items[i:], requests[i:], chunk, object_keys
+                        )
+                    raise
+            return len(requests)
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def __delete_unwritten_objects(
+        self, items: list, requests: list, unprocessed: list, object_keys: list
+    ):
+        """
+        Cancella gli oggetti S3 caricati per gli elementi non scritti da una batch_put_items non riuscita: quelli
+        ancora da elaborare nel blocco fallito e quelli dei blocchi successivi. Gli oggetti degli elementi già scritti
+        e quelli riusati (OffloadedAttribute riletti) non vengono cancellati
+        :param items: elementi (con i puntatori) dal blocco fallito in poi
+        :param requests: richieste corrispondenti agli elementi
+        :param unprocessed: richieste del blocco fallito non elaborate
+        :param object_keys: objectkey caricati da offload_items
+        """
+        first_chunk = min(self.MAX_BATCH_WRITE_ITEMS, len(requests))
+        unwritten = set()
+        for index, (item, request) in enumerate(zip(items, requests)):
+            if index >= first_chunk or request in unprocessed:
+                unwritten |= self.offload.object_keys(item)
+        uploaded = {(self.offload.bucket_name, object_key) for object_key in object_keys}
+        self.offload.delete_objects(list(uploaded & unwritten))
+
+    def __batch_write(self, table_name: str, requests: list):
+        """
+        Esegue una BatchWriteItem su una tabella, ripetendo con backoff le richieste non elaborate. La lista requests
+        viene aggiornata con le richieste non ancora elaborate: se viene sollevata un'eccezione contiene quelle non
+        scritte
+        """
+        attempt = 0
+        while requests:
+            response = self.__dynamodb.batch_write_item(
+                RequestItems={table_name: requests}
+            )
+            requests[:] = response.get("UnprocessedItems", {}).get(table_name, [])
+            if not requests:
+                return
+            attempt += 1
+            if attempt >= DEFAULT_RETRY_POLICY.max_attempts:
+                raise ThrottlingException(
+                    f"{len(requests)} items not processed by BatchWriteItem"
+                )
+            time.sleep(DEFAULT_RETRY_POLICY.get_delay(attempt))
+
+    def copy_table(
+        self,
+        source_table: str,
+        destination_table: str,
+        transform: Callable[[dict], dict | None] | None = None,
+        segments: int = 4,
+        checkpoint_file: str | None = None,
+        destination: "DynamoDB | None" = None,
+        target_rcu: float | None = None,
+    ) -> dict:
+        """
+        Funzione per copiare gli elementi di una tabella in un'altra (anche di un'altra regione o account), leggendo
+        con scan parallele per segmento e scrivendo con BatchWriteItem. Dopo ogni pagina scritta viene salvato nel
+        file di checkpoint il LastEvaluatedKey del segmento: rieseguendo la copia con lo stesso file, i segmenti
+        riprendono da dove si erano fermati
+        :param source_table: nome della tabella di origine
+        :param destination_table: nome della tabella di destinazione
+        :param transform: eventuale funzione applicata ad ogni elemento prima della scrittura. Se restituisce None
+        l'elemento viene scartato
+        :param segments: numero di segmenti letti in parallelo
+        :param checkpoint_file: eventuale file (JSON) in cui salvare l'avanzamento
+        :param destination: eventuale istanza DynamoDB da usare per la scrittura (es. altra regione o account)
+        :param target_rcu: eventuali unità di capacità di lettura al secondo da non superare (sull'intera copia)
+        :return: dizionario {"read": <elementi letti>, "written": <elementi scritti>, "skipped": <elementi scartati>}
+        """
+        if segments <= 0:
+            raise ValueError("segments must be greater than 0")
+        destination = destination or self
+        checkpoint = _CopyCheckpoint(
+            checkpoint_file, source_table, destination_table, segments
+        )
+        stop = threading.Event()
+
+        def copy_segment(segment: int):
+            state = checkpoint.segments[segment]
+            if state["done"]:
+                return
+            request: dict = {
+                "TableName": source_table,
+                "Segment": segment,
+                "TotalSegments": segments,
+            }
+            if state["last_evaluated_key"] is not None:
+                request["ExclusiveStartKey"] = state["last_evaluated_key"]
+            if target_rcu is None:
+                pages = self.__scan_pages(request)
+            else:
+                request.pop("TableName")
+                pages = self.__throttled_scan_pages(
+                    source_table, target_rcu / segments, None, request
+                )
+            for page in pages:
+                items = page.get("Items", [])
+                if transform is not None:
+                    items = [
+                        serialize_item(transformed)
+                        for transformed in (
+                            transform(deserialize_item(item)) for item in items
+                        )
+                        if transformed is not None
+                    ]
+                for i in range(0, len(items), self.MAX_BATCH_WRITE_ITEMS):
+                    destination.__batch_write(
+                        destination_table,
+                        [
+                            {"PutRequest": {"Item": item}}
+                            for item in items[i : i + self.MAX_BATCH_WRITE_ITEMS]
+                        ],
+                    )
+                checkpoint.update(
+                    segment,
+                    page.get("LastEvaluatedKey"),
+                    len(page.get("Items", [])),
+                    len(items),
+                )
+                if stop.is_set():
+                    return
+
+        def run_segment(segment: int):
+            try:
+                copy_segment(segment)
+            except Exception:
+                # gli altri segmenti si fermano dopo la pagina corrente; l'avanzamento resta nel checkpoint
+                stop.set()
+                raise
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=segments, thread_name_prefix="dynamodb-copy"
+            ) as executor:
+                futures = [
+                    executor.submit(run_segment, segment) for segment in range(segments)
+                ]
+            for future in futures:
+                future.result()
+            return checkpoint.totals()
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def export_parquet(
+        self,
+        table_name: str,
+        file_path: str | None = None,
+        s3: "S3 | None" = None,
+        bucket_name: str | None = None,
+        object_key: str | None = None,
+        schema=None,
+        batch_size: int = parquet.DEFAULT_BATCH_SIZE,
+        **kwargs,
+    ) -> int:
+        """
+        Funzione per esportare una tabella in un file Parquet (richiede pyarrow), localmente o su S3. Le pagine della
+        scan vengono convertite in record batch Arrow man mano che arrivano: la memoria usata è limitata a un batch.
+        Lo schema, se non indicato, viene ricavato da tutti gli elementi (salvati prima in un file temporaneo); gli
+        attributi senza un tipo comune vengono scritti in DynamoDB JSON e ripristinati da import_parquet
+        :param table_name: nome tabella
+        :param file_path: percorso del file Parquet locale (se non si esporta su S3)
+        :param s3: istanza S3 da usare per l'upload
+        :param bucket_name: nome del bucket di destinazione
+        :param object_key: objectkey del file Parquet
+        :param schema: eventuale schema pyarrow
+        :param batch_size: numero di elementi per record batch
+        :param kwargs: parametri aggiuntivi di scan_items (es. target_rcu, FilterExpression)
+        :return: numero di elementi esportati
+        """
+        if s3 is None and file_path is None:
+            raise ValueError("file_path or s3, bucket_name and object_key are required")
+        try:
+            items = self.scan_items(table_name, use_native_numbers=True, **kwargs)
+            if self.offload is not None:
+                # vengono esportati i puntatori, non il contenuto degli attributi spostati su S3
+                items = map(self.offload.dump_item, items)
+            if s3 is None:
+                return parquet.write_parquet(items, file_path, schema, batch_size)
+            with parquet.TemporaryParquetFile() as temp_path:
+                count = parquet.write_parquet(items, temp_path, schema, batch_size)
+                s3.upload_file(temp_path, bucket_name, object_key)
+            return count
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def import_parquet(
+        self,
+        table_name: str,
+        file_path: str | None = None,
+        s3: "S3 | None" = None,
+        bucket_name: str | None = None,
+        object_key: str | None = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Funzione per importare in una tabella un file Parquet (richiede pyarrow), locale o su S3, con BatchWriteItem.
+        Il file viene letto un batch alla volta; gli attributi nulli non vengono scritti
+        :param table_name: nome tabella
+        :param file_path: percorso del file Parquet locale (se non si importa da S3)
+        :param s3: istanza S3 da usare per il download
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey del file Parquet
+        :param batch_size: numero di righe lette per batch
+        :return: numero di elementi importati
+        """
+        if s3 is None and file_path is None:
+            raise ValueError("file_path or s3, bucket_name and object_key are required")
+        try:
+            if s3 is None:
+                return self.__import_parquet_file(table_name, file_path, batch_size)
+            with parquet.TemporaryParquetFile() as temp_path:
+                s3.download_file(bucket_name, object_key, temp_path)
+                return self.__import_parquet_file(table_name, temp_path, batch_size)
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def __import_parquet_file(
+        self, table_name: str, file_path: str, batch_size: int
+    ) -> int:
+        count = 0
+        for rows in parquet.read_parquet(file_path, batch_size):
+            count += self.batch_put_items(table_name, rows)
+        return count
+
+    def resolve_offloaded(self, items: list[dict]) -> list[dict]:
+        """
+        Funzione per scaricare in parallelo gli attributi spostati su S3 di più elementi (es. il risultato di una
+        scan), sostituendo gli OffloadedAttribute con il loro contenuto
+        :param items: elementi letti dalla tabella
+        :return: gli stessi elementi, con il contenuto degli attributi
+        """
+        if self.offload is None:
+            return items
+        return self.offload.resolve(items)
+
+    def __load_item(self, item: dict) -> dict:
+        """
+        Sostituisce i puntatori agli attributi spostati su S3 con OffloadedAttribute, se lo spostamento è attivo
+        """
+        if self.offload is None:
+            return item
+        return self.offload.load_item(item)
+
+    def __scan_pages(self, request: dict):
+        """
+        Generatore delle pagine (AttributeValue) di una scan a partire dalla richiesta indicata
+        """
+        request = dict(request)
+        while True:
+            page = self.__dynamodb.scan(**request)
+            yield page
+            if "LastEvaluatedKey" not in page:
+                return
+            request["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+
+class _CopyCheckpoint:
+    """
+    Avanzamento di una copia tra tabelle, per segmento, eventualmente salvato su file
+    """
+
+    def __init__(
+        self,
+        file_path: str | None,
+        source_table: str,
+        destination_table: str,
+        total_segments: int,
+    ):
+        self.file_path = file_path
+        self.__lock = threading.Lock()
+        self.__header = {
+            "source_table": source_table,
+            "destination_table": destination_table,
+            "total_segments": total_segments,
+        }
+        self.segments = [
+            {"last_evaluated_key": None, "done": False, "read": 0, "written": 0}
+            for _ in range(total_segments)
+        ]
+        if file_path is not None and os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f, object_hook=_decode_bytes)
+            if any(data.get(key) != value for key, value in self.__header.items()):
+                raise ValueError(
+                    f"Checkpoint file {file_path} belongs to a different copy"
+                )
+            self.segments = data["segments"]
+
+    def update(
+        self, segment: int, last_evaluated_key: dict | None, read: int, written: int
+    ):
+        """
+        Registra una pagina copiata e salva il checkpoint
+        """
+        with self.__lock:
+            state = self.segments[segment]
+            state["last_evaluated_key"] = last_evaluated_key
+            state["done"] = last_evaluated_key is None
+            state["read"] += read
+            state["written"] += written
+            if self.file_path is None:
+                return
+            # scrittura atomica: un'interruzione non lascia mai un checkpoint incompleto
+            temp_path = f"{self.file_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {**self.__header, "segments": self.segments},
+                    f,
+                    default=_encode_bytes,
+                )
+            os.replace(temp_path, self.file_path)
+
+    def totals(self) -> dict:
+        """
+        Restituisce i totali della copia
+        """
+        read = sum(state["read"] for state in self.segments)
+        written = sum(state["written"] for state in self.segments)
+        return {"read": read, "written": written, "skipped": read - written}
+
+
+def _encode_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Object of type {type(value)} is not JSON serializable")
+
+
+def _decode_bytes(value: dict):
+    if len(value) == 1 and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return value
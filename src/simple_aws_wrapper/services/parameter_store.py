@@ -1,15 +1,25 @@
 from __future__ import annotations
 
-import traceback
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.cache import TTLCache
+from simple_aws_wrapper.config import AWSConfig, AWSConfigSnapshot
+from simple_aws_wrapper.rate_limiter import RateLimiter
 from simple_aws_wrapper.const import services
+from simple_aws_wrapper.const.regions import Region
 from simple_aws_wrapper.exceptions.exceptions import (
     MissingConfigurationException,
-    GenericException,
+    wrap_exception,
+    InvalidParametersException,
 )
 from simple_aws_wrapper.resource_manager import ResourceManager
 
+logger = logging.getLogger(__name__)
+
 
 class ParameterStore:
     """
@@ -25,41 +35,100 @@ class ParameterStore:
         STRING_LIST = "StringList"
         SECURE_STRING = "SecureString"
 
-    def __init__(self):
-        if not AWSConfig().is_configured():
-            raise MissingConfigurationException
-        self.client = ResourceManager.get_client(services.SSM, **AWSConfig().to_dict())
+    MAX_PARAMETERS_PER_REQUEST = 10
+
+    # cache condivisa tra tutte le istanze del processo
+    __cache: TTLCache = TTLCache(default_ttl=60.0, default_stale_ttl=300.0)
+    __refresh_executor: ThreadPoolExecutor | None = None
+    __refreshing: set = set()
+    __refresh_lock = threading.Lock()
+
+    def __init__(
+        self,
+        region: Region | str | None = None,
+        endpoint_url: str | None = None,
+        config: AWSConfigSnapshot | None = None,
+    ):
+        """
+        :param region: eventuale regione da usare al posto di quella configurata in AWSConfig
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato in AWSConfig
+        :param config: eventuale configurazione da usare al posto di AWSConfig().snapshot()
+        """
+        if config is None:
+            if not AWSConfig().is_configured():
+                raise MissingConfigurationException
+            config = AWSConfig().snapshot(region, endpoint_url)
+        else:
+            config = config.replace(region, endpoint_url)
+        self.config = config
+        self.region_name = config.region_name
+        self.client = ResourceManager.get_service_client(services.SSM, config)
 
-    def get_parameters_values_from_list(self, parameters_list: list) -> dict:
+    def get_parameters_values_from_list(
+        self,
+        parameters_list: list,
+        max_workers: int = 4,
+        raise_on_invalid: bool = False,
+    ) -> dict:
         """
         Funzione per il recupero dei valori dal servizio Parameter Store a partire dalla lista dei nomi dei parametri
-        da recuperare
+        da recuperare. I nomi vengono suddivisi in blocchi da 10 (limite di get_parameters) recuperati in parallelo
         :param parameters_list: lista dei nomi dei parametri di cui recuperare il valore
+        :param max_workers: numero massimo di richieste contemporanee
+        :param raise_on_invalid: se True solleva InvalidParametersException se alcuni parametri non esistono
         :return: dizionario {"<nome_parametro>": "<valore_parametro>"}
         """
+        parameters, invalid_parameters = self.__fetch_parameters(
+            parameters_list, max_workers
+        )
+        output_dict = {
+            parameter["Name"]: parameter["Value"] for parameter in parameters
+        }
+        if invalid_parameters and raise_on_invalid:
+            raise InvalidParametersException(invalid_parameters, output_dict)
+        return output_dict
+
+    def __fetch_parameters(
+        self, parameters_list: list, max_workers: int
+    ) -> tuple[list[dict], list]:
+        """
+        Recupera i parametri a blocchi da 10, in parallelo
+        :param parameters_list: lista dei nomi dei parametri
+        :param max_workers: numero massimo di richieste contemporanee
+        :return: tupla (parametri restituiti da get_parameters, nomi dei parametri inesistenti)
+        """
+        if len(parameters_list) == 0:
+            return [], []
+        chunks = [
+            parameters_list[i : i + self.MAX_PARAMETERS_PER_REQUEST]
+            for i in range(0, len(parameters_list), self.MAX_PARAMETERS_PER_REQUEST)
+        ]
         try:
-            output_dict: dict = {}
-            if len(parameters_list) == 0:
-                return {}
-            if len(parameters_list) > 10:
-                output_dict = dict(
-                    output_dict,
-                    **self.get_parameters_values_from_list(parameters_list[0:10]),
-                )
-                output_dict = dict(
-                    output_dict,
-                    **self.get_parameters_values_from_list(parameters_list[10:]),
-                )
+            if len(chunks) == 1 or max_workers <= 1:
+                responses = [self.__get_parameters_chunk(chunk) for chunk in chunks]
             else:
-                print(f"Attempting to retrieve following parameters from Parameter Store:{parameters_list}")
-                response = self.client.get_parameters(
-                    Names=parameters_list, WithDecryption=True
-                )["Parameters"]
-                for parameter in response:
-                    output_dict[parameter["Name"]] = parameter["Value"]
-            return output_dict
-        except Exception:
-            raise GenericException("Error retrieving parameters from Parameter Store. \n" + traceback.format_exc())
+                with ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(chunks))
+                ) as executor:
+                    responses = list(executor.map(self.__get_parameters_chunk, chunks))
+        except Exception as e:
+            raise wrap_exception(
+                e, "Error retrieving parameters from Parameter Store. \n"
+            )
+        parameters: list = []
+        invalid_parameters: list = []
+        for response in responses:
+            parameters.extend(response["Parameters"])
+            invalid_parameters.extend(response.get("InvalidParameters", []))
+        return parameters, invalid_parameters
+
+    def __get_parameters_chunk(self, names: list) -> dict:
+        """
+        Recupera un blocco di massimo 10 parametri
+        :param names: nomi dei parametri
+        :return: risposta di get_parameters
+        """
+        return self.client.get_parameters(Names=names, WithDecryption=True)
 
     def create_parameter(self, key: str, value: str, type: str, **kwargs) -> bool:
         """
@@ -72,9 +141,10 @@ class ParameterStore:
         """
         try:
             self.client.put_parameter(Name=key, Value=value, Type=type, **kwargs)
+            ParameterStore.__cache.invalidate(self.__key(key))
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def delete_parameter(self, key: str) -> bool:
         """
@@ -84,6 +154,349 @@ class ParameterStore:
         """
         try:
             self.client.delete_parameter(Name=key)
+            ParameterStore.__cache.invalidate(self.__key(key))
             return True
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def put_parameters(
+        self,
+        parameters: dict | list,
+        type: str = Type.STRING,
+        overwrite: bool = True,
+        max_workers: int = 4,
+        requests_per_second: float = 10.0,
+    ) -> dict:
+        """
+        Funzione per la creazione/aggiornamento massivo di parametri nel servizio Parameter Store. Le richieste sono
+        eseguite in parallelo, limitate a requests_per_second, e ripetute in caso di throttling
+        :param parameters: dizionario {"<nome_parametro>": "<valore_parametro>"} oppure lista di dizionari con i
+        parametri di put_parameter (es. {"Name": ..., "Value": ..., "Type": ...})
+        :param type: tipo dei parametri passati come dizionario
+        :param overwrite: se True sovrascrive i parametri esistenti
+        :param max_workers: numero massimo di richieste contemporanee
+        :param requests_per_second: numero massimo di richieste al secondo
+        :return: dizionario {"<nome_parametro>": "<errore>"} dei parametri non scritti (vuoto se tutto ok)
+        """
+        if isinstance(parameters, dict):
+            requests = [
+                {"Name": name, "Value": value, "Type": type}
+                for name, value in parameters.items()
+            ]
+        else:
+            requests = [dict(request) for request in parameters]
+        for request in requests:
+            request.setdefault("Type", type)
+            request.setdefault("Overwrite", overwrite)
+        rate_limiter = RateLimiter(requests_per_second)
+
+        def put(request: dict):
+            rate_limiter.acquire()
+            self.client.put_parameter(**request)
+            ParameterStore.__cache.invalidate(self.__key(request["Name"]))
+
+        return self.__run_bulk(
+            put, [(request["Name"], request) for request in requests], max_workers
+        )
+
+    def delete_parameters(
+        self,
+        parameters_list: list,
+        max_workers: int = 4,
+        requests_per_second: float = 10.0,
+    ) -> dict:
+        """
+        Funzione per la cancellazione massiva di parametri dal servizio Parameter Store, in blocchi da 10 tramite
+        delete_parameters
+        :param parameters_list: lista dei nomi dei parametri da eliminare
+        :param max_workers: numero massimo di richieste contemporanee
+        :param requests_per_second: numero massimo di richieste al secondo
+        :return: dizionario {"<nome_parametro>": "<errore>"} dei parametri non eliminati (vuoto se tutto ok)
+        """
+        chunks = [
+            parameters_list[i : i + self.MAX_PARAMETERS_PER_REQUEST]
+            for i in range(0, len(parameters_list), self.MAX_PARAMETERS_PER_REQUEST)
+        ]
+        rate_limiter = RateLimiter(requests_per_second)
+        invalid_parameters: list = []
+
+        def delete(names: list):
+            rate_limiter.acquire()
+            response = self.client.delete_parameters(Names=names)
+            ParameterStore.invalidate_cache(names)
+            invalid_parameters.extend(response.get("InvalidParameters", []))
+
+        failed = self.__run_bulk(
+            delete, [(", ".join(chunk), chunk) for chunk in chunks], max_workers
+        )
+        for name in invalid_parameters:
+            failed[name] = "ParameterNotFound"
+        return failed
+
+    @staticmethod
+    def __run_bulk(function, tasks: list, max_workers: int) -> dict:
+        """
+        Esegue function su ogni task con un pool di worker, raccogliendo gli errori
+        :param function: funzione da eseguire con il payload del task
+        :param tasks: lista di coppie (nome, payload)
+        :param max_workers: numero massimo di worker
+        :return: dizionario {"<nome>": "<errore>"} dei task falliti
+        """
+        failed: dict = {}
+        if not tasks:
+            return failed
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            futures = {
+                executor.submit(function, payload): name for name, payload in tasks
+            }
+            for future, name in futures.items():
+                exception = future.exception()
+                if exception is not None:
+                    failed[name] = str(exception)
+        return failed
+
+    def export_path(self, path: str, file_path: str, recursive: bool = True) -> int:
+        """
+        Funzione per esportare una gerarchia di parametri su un file locale in formato JSON lines. Ogni riga contiene
+        {"Name": ..., "Value": ..., "Type": ...}; le pagine vengono scritte man mano che vengono lette
+        :param path: percorso della gerarchia (es. "/my-app/prod")
+        :param file_path: file su cui scrivere l'esportazione
+        :param recursive: se True esporta anche i sotto-percorsi
+        :return: numero di parametri esportati
+        """
+        try:
+            count = 0
+            paginator = self.client.get_paginator("get_parameters_by_path")
+            with open(file_path, "w", encoding="utf-8") as f:
+                for page in paginator.paginate(
+                    Path=path, Recursive=recursive, WithDecryption=True
+                ):
+                    for parameter in page["Parameters"]:
+                        f.write(
+                            json.dumps(
+                                {
+                                    "Name": parameter["Name"],
+                                    "Value": parameter["Value"],
+                                    "Type": parameter["Type"],
+                                }
+                            )
+                            + "\n"
+                        )
+                        count += 1
+            return count
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def import_path(
+        self,
+        file_path: str,
+        max_workers: int = 4,
+        requests_per_second: float = 10.0,
+        batch_size: int = 100,
+    ) -> dict:
+        """
+        Funzione per importare nel Parameter Store i parametri di un file JSON lines prodotto da export_path.
+        Il file viene letto a blocchi di batch_size righe; i parametri già presenti con valore e tipo invariati
+        non vengono riscritti
+        :param file_path: file da importare
+        :param max_workers: numero massimo di richieste contemporanee
+        :param requests_per_second: numero massimo di scritture al secondo
+        :param batch_size: numero di righe lette e confrontate per blocco
+        :return: dizionario {"written": <int>, "skipped": <int>, "failed": {"<nome_parametro>": "<errore>"}}
+        """
+        result: dict = {"written": 0, "skipped": 0, "failed": {}}
+
+        def flush(batch: list):
+            parameters, _ = self.__fetch_parameters(
+                [parameter["Name"] for parameter in batch], max_workers
+            )
+            current = {
+                parameter["Name"]: (parameter["Value"], parameter["Type"])
+                for parameter in parameters
+            }
+            changed = [
+                parameter
+                for parameter in batch
+                if current.get(parameter["Name"])
+                != (parameter["Value"], parameter.get("Type", ParameterStore.Type.STRING))
+            ]
+            result["skipped"] += len(batch) - len(changed)
+            failed = self.put_parameters(
+                changed,
+                max_workers=max_workers,
+                requests_per_second=requests_per_second,
+            )
+            result["written"] += len(changed) - len(failed)
+            result["failed"].update(failed)
+
+        batch: list = []
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+        if batch:
+            flush(batch)
+        return result
+
+    @staticmethod
+    def configure_cache(ttl: float = 60.0, stale_ttl: float = 300.0):
+        """
+        Imposta le durate di default della cache dei parametri condivisa tra le istanze
+        :param ttl: durata (in secondi) di validità dei valori in cache
+        :param stale_ttl: durata (in secondi) oltre il TTL per cui un valore scaduto viene restituito mentre viene
+        aggiornato in background
+        """
+        ParameterStore.__cache.default_ttl = ttl
+        ParameterStore.__cache.default_stale_ttl = stale_ttl
+
+    @staticmethod
+    def invalidate_cache(parameters_list: list | None = None):
+        """
+        Invalida la cache dei parametri, in tutte le regioni
+        :param parameters_list: lista dei nomi dei parametri da invalidare. Se None, viene svuotata l'intera cache
+        """
+        if parameters_list is None:
+            ParameterStore.__cache.clear()
+            return
+        names = set(parameters_list)
+        for key in ParameterStore.__cache.keys():
+            if key[1] in names:
+                ParameterStore.__cache.invalidate(key)
+
+    def get_cached_parameters_values(
+        self,
+        parameters_list: list,
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+    ) -> dict:
+        """
+        Funzione per il recupero dei valori dal servizio Parameter Store passando dalla cache in memoria.
+        I parametri assenti dalla cache vengono recuperati subito; quelli scaduti ma ancora entro la finestra di stale
+        vengono restituiti e aggiornati in background
+        :param parameters_list: lista dei nomi dei parametri di cui recuperare il valore
+        :param ttl: durata (in secondi) di validità dei valori recuperati (default della cache se None)
+        :param stale_ttl: finestra di stale in secondi (default della cache se None)
+        :return: dizionario {"<nome_parametro>": "<valore_parametro>"}
+        """
+        cache = ParameterStore.__cache
+        now = time.monotonic()
+        output_dict: dict = {}
+        missing: list = []
+        stale: list = []
+        for name in parameters_list:
+            entry = cache.get_entry(self.__key(name))
+            if entry is None or not entry.is_usable(now):
+                missing.append(name)
+                continue
+            output_dict[name] = entry.value
+            if not entry.is_fresh(now):
+                stale.append(name)
+        if missing:
+            fetched = self.get_parameters_values_from_list(missing)
+            for name, value in fetched.items():
+                cache.set(self.__key(name), value, ttl, stale_ttl)
+            output_dict.update(fetched)
+        if stale:
+            self.__schedule_refresh(stale, ttl, stale_ttl)
+        return output_dict
+
+    def get_cached_parameter_value(
+        self, name: str, ttl: float | None = None, stale_ttl: float | None = None
+    ) -> str | None:
+        """
+        Funzione per il recupero del valore di un singolo parametro passando dalla cache in memoria
+        :param name: nome del parametro
+        :param ttl: durata (in secondi) di validità del valore recuperato (default della cache se None)
+        :param stale_ttl: finestra di stale in secondi (default della cache se None)
+        :return: valore del parametro o None se il parametro non esiste
+        """
+        return self.get_cached_parameters_values([name], ttl, stale_ttl).get(name)
+
+    def preload_path(
+        self,
+        path: str,
+        recursive: bool = True,
+        ttl: float | None = None,
+        stale_ttl: float | None = None,
+    ) -> dict:
+        """
+        Funzione per caricare in cache tutti i parametri di una gerarchia (gestendo la paginazione)
+        :param path: percorso della gerarchia (es. "/my-app/prod")
+        :param recursive: se True carica anche i sotto-percorsi
+        :param ttl: durata (in secondi) di validità dei valori caricati (default della cache se None)
+        :param stale_ttl: finestra di stale in secondi (default della cache se None)
+        :return: dizionario {"<nome_parametro>": "<valore_parametro>"} dei parametri caricati
+        """
+        try:
+            output_dict: dict = {}
+            paginator = self.client.get_paginator("get_parameters_by_path")
+            for page in paginator.paginate(
+                Path=path, Recursive=recursive, WithDecryption=True
+            ):
+                for parameter in page["Parameters"]:
+                    output_dict[parameter["Name"]] = parameter["Value"]
+                    ParameterStore.__cache.set(
+                        self.__key(parameter["Name"]),
+                        parameter["Value"],
+                        ttl,
+                        stale_ttl,
+                    )
+            return output_dict
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def __key(self, name: str) -> tuple:
+        """
+        Chiave della cache: i parametri di account, endpoint o regioni diversi non condividono le voci
+        """
+        return self.config, name
+
+    def __schedule_refresh(
+        self, parameters_list: list, ttl: float | None, stale_ttl: float | None
+    ):
+        """
+        Pianifica l'aggiornamento in background dei parametri scaduti, evitando aggiornamenti duplicati
+        """
+        with ParameterStore.__refresh_lock:
+            to_refresh = [
+                name
+                for name in parameters_list
+                if self.__key(name) not in ParameterStore.__refreshing
+            ]
+            if not to_refresh:
+                return
+            ParameterStore.__refreshing.update(
+                self.__key(name) for name in to_refresh
+            )
+            if ParameterStore.__refresh_executor is None:
+                ParameterStore.__refresh_executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="parameter-store-refresh"
+                )
+        ParameterStore.__refresh_executor.submit(
+            self.__refresh, to_refresh, ttl, stale_ttl
+        )
+
+    def __refresh(self, parameters_list: list, ttl: float | None, stale_ttl: float | None):
+        try:
+            for name, value in self.get_parameters_values_from_list(
+                parameters_list
+            ).items():
+                ParameterStore.__cache.set(
+                    self.__key(name), value, ttl, stale_ttl
+                )
         except Exception:
-            raise GenericException(traceback.format_exc())
+            # in caso di errore restano in cache i valori precedenti, fino alla fine della finestra di stale
+            logger.warning(
+                "Error refreshing parameters from Parameter Store",
+                extra={"parameters": parameters_list},
+                exc_info=True,
+            )
+        finally:
+            with ParameterStore.__refresh_lock:
+                ParameterStore.__refreshing.difference_update(
+                    self.__key(name) for name in parameters_list
+                )
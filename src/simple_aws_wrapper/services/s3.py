@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import datetime
+import math
+import os
 import sys
-import traceback
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-from simple_aws_wrapper.config import AWSConfig
+import boto3
+import botocore
+from botocore.credentials import ReadOnlyCredentials
+from botocore.exceptions import FlexibleChecksumError
+from botocore.httpchecksum import StreamingChecksumBody
+
+from simple_aws_wrapper import checksums, presigner
+from simple_aws_wrapper.cache import TTLCache
+from simple_aws_wrapper.config import AWSConfig, AWSConfigSnapshot
 from simple_aws_wrapper.const import services, regions
+from simple_aws_wrapper.const.regions import Region
 from simple_aws_wrapper.exceptions.exceptions import (
+    ChecksumMismatchException,
     MissingConfigurationException,
-    GenericException,
+    ResourceNotFoundException,
+    ValidationException,
+    wrap_exception,
 )
 from simple_aws_wrapper.resource_manager import ResourceManager
 
@@ -17,42 +33,96 @@ class S3:
     Classe per la gestione di bucket S3 su AWS
     """
 
-    def __init__(self):
-        if not AWSConfig().is_configured():
-            raise MissingConfigurationException
-        self.client = ResourceManager.get_global_client(
-            services.S3, **AWSConfig().to_dict()
+    # dimensione di default delle parti degli upload multipart con checksum
+    DEFAULT_PART_SIZE = 8 * 1024 * 1024
+    # dimensione dei blocchi letti nei download con verifica del checksum
+    READ_CHUNK_SIZE = 1024 * 1024
+    # metadato con la dimensione delle parti, usato per verificare il checksum composito in download
+    PART_SIZE_METADATA = "checksum-part-size"
+
+    # cache dei metadati (head_object) e dell'esistenza dei bucket, condivisa tra tutte le istanze del processo
+    __cache: TTLCache = TTLCache(default_ttl=60.0, max_size=10000)
+    # durata in secondi dei risultati negativi (oggetto o bucket inesistente)
+    __negative_ttl: float = 10.0
+
+    def __init__(
+        self,
+        region: Region | str | None = None,
+        endpoint_url: str | None = None,
+        config: AWSConfigSnapshot | None = None,
+    ):
+        """
+        :param region: eventuale regione da usare al posto di quella configurata in AWSConfig
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato in AWSConfig
+        :param config: eventuale configurazione da usare al posto di AWSConfig().snapshot()
+        """
+        if config is None:
+            if not AWSConfig().is_configured():
+                raise MissingConfigurationException
+            config = AWSConfig().snapshot(region, endpoint_url)
+        else:
+            config = config.replace(region, endpoint_url)
+        self.config = config
+        self.region_name = config.region_name
+        # i nomi dei bucket sono globali: la cache è condivisa tra le regioni dello stesso endpoint e account
+        self.__cache_scope = (
+            config.endpoint_url,
+            config.credentials_provider or config.aws_access_key_id,
         )
-        self.region_name = AWSConfig().get_region_name()
+        self.client = ResourceManager.get_service_client(services.S3, config)
 
-    def put_object(self, body: bytes | str, bucket_name: str, object_key: str) -> bool:
+    def put_object(
+        self,
+        body: bytes | str,
+        bucket_name: str,
+        object_key: str,
+        checksum_algorithm: str | None = None,
+    ) -> bool:
         """
         Funzione per inserire un oggetto all'interno di un bucket
         :param body: contenuto del file codificato in byte
         :param bucket_name: nome del buket su cui effettuare l'upload
         :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param checksum_algorithm: eventuale algoritmo di checksum (CRC32, CRC32C, SHA1, SHA256). Il checksum viene
+        inviato negli header x-amz-checksum-* e verificato da S3, che rifiuta l'oggetto se non corrisponde
         :return: bool True se l'upload è andato OK, False altrimenti
         """
         if isinstance(body, str):
             body = body.encode("utf-8")
         try:
-            self.client.put_object(Body=body, Bucket=bucket_name, Key=object_key)
+            kwargs = {}
+            if checksum_algorithm is not None:
+                kwargs = self.__checksum_kwargs(
+                    checksum_algorithm, checksums.compute(checksum_algorithm, body)
+                )
+            self.client.put_object(
+                Body=body, Bucket=bucket_name, Key=object_key, **kwargs
+            )
+            self.__invalidate_object(bucket_name, object_key)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
-    def get_file_content(self, bucket_name: str, object_key: str) -> bytes:
+    def get_file_content(
+        self, bucket_name: str, object_key: str, verify_checksum: bool = False
+    ) -> bytes:
         """
         Funzione per prelevare il contenuto di un file dal bucket
         :param bucket_name: nome del bucket
         :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param verify_checksum: se True il contenuto viene verificato con il checksum salvato da S3, calcolato mentre
+        viene scaricato. Se non corrisponde viene sollevata ChecksumMismatchException
         :return: contenuto del file codificato in byte
         """
         try:
+            if verify_checksum:
+                chunks: list[bytes] = []
+                self.__read_verified(bucket_name, object_key, chunks.append)
+                return b"".join(chunks)
             file = self.client.get_object(Bucket=bucket_name, Key=object_key)
             file_content = file["Body"].read()
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
         return file_content
 
     def get_str_file_content(self, bucket_name: str, object_key: str) -> str:
@@ -64,8 +134,243 @@ class S3:
         """
         try:
             return self.get_file_content(bucket_name, object_key).decode("utf-8")
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def upload_file(
+        self,
+        file_path: str,
+        bucket_name: str,
+        object_key: str,
+        checksum_algorithm: str | None = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = 4,
+    ) -> bool:
+        """
+        Funzione per caricare un file locale in un bucket. Il file viene letto a blocchi (upload multipart per i file
+        grandi), senza caricarlo interamente in memoria.
+        Indicando checksum_algorithm ogni parte viene letta una sola volta: il checksum viene calcolato dal thread che
+        la invia (in parallelo all'invio delle altre parti), S3 lo verifica parte per parte e il checksum composito
+        restituito a fine upload viene confrontato con quello calcolato
+        :param file_path: percorso del file da caricare
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param checksum_algorithm: eventuale algoritmo di checksum (CRC32, CRC32C, SHA1, SHA256)
+        :param part_size: dimensione delle parti (solo con checksum_algorithm, minimo 5 MB)
+        :param max_workers: numero massimo di parti inviate in parallelo (solo con checksum_algorithm)
+        :return: bool True se l'upload è andato OK
+        """
+        try:
+            if checksum_algorithm is not None:
+                self.__upload_with_checksum(
+                    file_path,
+                    bucket_name,
+                    object_key,
+                    checksum_algorithm.upper(),
+                    part_size,
+                    max_workers,
+                )
+                return True
+            self.client.upload_file(file_path, bucket_name, object_key)
+            self.__invalidate_object(bucket_name, object_key)
+            return True
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def download_file(
+        self,
+        bucket_name: str,
+        object_key: str,
+        file_path: str,
+        verify_checksum: bool = False,
+    ) -> bool:
+        """
+        Funzione per scaricare un oggetto in un file locale, a blocchi e senza caricarlo interamente in memoria
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param file_path: percorso del file da scrivere
+        :param verify_checksum: se True il contenuto viene verificato con il checksum salvato da S3, calcolato mentre
+        viene scritto. Se non corrisponde il file viene cancellato e viene sollevata ChecksumMismatchException
+        :return: bool True se il download è andato OK
+        """
+        try:
+            if not verify_checksum:
+                self.client.download_file(bucket_name, object_key, file_path)
+                return True
+            try:
+                with open(file_path, "wb") as file:
+                    self.__read_verified(bucket_name, object_key, file.write)
+            except Exception:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                raise
+            return True
+        except Exception as e:
+            raise wrap_exception(e)
+
+    @staticmethod
+    def __checksum_kwargs(algorithm: str, checksum: str) -> dict:
+        return {
+            "ChecksumAlgorithm": algorithm.upper(),
+            checksums.parameter_name(algorithm): checksum,
+        }
+
+    def __read_verified(self, bucket_name: str, object_key: str, write) -> None:
+        """
+        Scarica l'oggetto passando i blocchi a write e verifica il checksum in un solo passaggio. Se botocore supporta
+        l'algoritmo e il checksum non è composito la verifica è quella di botocore sul flusso, altrimenti il checksum
+        viene calcolato su un thread separato (StreamChecksum)
+        """
+        response = self.client.get_object(
+            Bucket=bucket_name, Key=object_key, ChecksumMode="ENABLED"
+        )
+        body = response["Body"]
+        algorithm, expected = checksums.find_checksum(response)
+        if expected is None:
+            body.close()
+            raise ValidationException(
+                f"Object s3://{bucket_name}/{object_key} has no checksum to verify"
+            )
+        if isinstance(body, StreamingChecksumBody):
+            try:
+                for chunk in body.iter_chunks(S3.READ_CHUNK_SIZE):
+                    write(chunk)
+            except FlexibleChecksumError as e:
+                raise ChecksumMismatchException(
+                    f"{algorithm} checksum mismatch for s3://{bucket_name}/{object_key}",
+                    e,
+                )
+            return
+        part_sizes = None
+        if "-" in expected:
+            part_sizes = self.__part_sizes(
+                bucket_name, object_key, response, int(expected.rsplit("-", 1)[1])
+            )
+        stream = checksums.StreamChecksum(algorithm, part_sizes)
+        try:
+            for chunk in body.iter_chunks(S3.READ_CHUNK_SIZE):
+                stream.update(chunk)
+                write(chunk)
+        except BaseException:
+            # l'errore di lettura o scrittura non deve attendere (né essere nascosto da) il calcolo del checksum
+            stream.abort()
+            body.close()
+            raise
+        actual = stream.finish()
+        if actual != expected:
+            raise ChecksumMismatchException(
+                f"{algorithm} checksum mismatch for s3://{bucket_name}/{object_key}: "
+                f"expected {expected}, computed {actual}"
+            )
+
+    def __part_sizes(
+        self, bucket_name: str, object_key: str, response: dict, parts_count: int
+    ) -> list[int]:
+        """
+        Restituisce le dimensioni delle parti di un oggetto multipart, necessarie per il checksum composito: dal
+        metadato scritto da upload_file o, se assente, da get_object_attributes
+        """
+        content_length = response["ContentLength"]
+        part_size = response.get("Metadata", {}).get(S3.PART_SIZE_METADATA)
+        if part_size is not None:
+            part_size = int(part_size)
+            if math.ceil(content_length / part_size) == parts_count:
+                return [
+                    min(part_size, content_length - offset)
+                    for offset in range(0, content_length, part_size)
+                ]
+        part_sizes = []
+        kwargs = {}
+        while True:
+            attributes = self.client.get_object_attributes(
+                Bucket=bucket_name,
+                Key=object_key,
+                ObjectAttributes=["ObjectParts"],
+                **kwargs,
+            )
+            parts = attributes.get("ObjectParts", {})
+            part_sizes.extend(part["Size"] for part in parts.get("Parts", []))
+            if not parts.get("IsTruncated"):
+                break
+            kwargs["PartNumberMarker"] = parts["NextPartNumberMarker"]
+        if len(part_sizes) != parts_count or sum(part_sizes) != content_length:
+            raise ValidationException(
+                f"Cannot determine the part sizes of s3://{bucket_name}/{object_key} "
+                "to verify its composite checksum"
+            )
+        return part_sizes
+
+    def __upload_with_checksum(
+        self,
+        file_path: str,
+        bucket_name: str,
+        object_key: str,
+        algorithm: str,
+        part_size: int,
+        max_workers: int,
+    ) -> None:
+        """
+        Upload di un file con checksum: put_object per i file di una sola parte, altrimenti upload multipart in cui
+        ogni thread legge una parte, ne calcola il checksum e la invia con l'header x-amz-checksum-*
+        """
+        if part_size < 5 * 1024 * 1024:
+            raise ValueError("part_size must be at least 5 MB")
+        size = os.path.getsize(file_path)
+        if size <= part_size:
+            with open(file_path, "rb") as file:
+                body = file.read()
+            self.put_object(body, bucket_name, object_key, algorithm)
+            return
+
+        upload_id = self.client.create_multipart_upload(
+            Bucket=bucket_name,
+            Key=object_key,
+            ChecksumAlgorithm=algorithm,
+            Metadata={S3.PART_SIZE_METADATA: str(part_size)},
+        )["UploadId"]
+
+        def upload_part(part_number: int) -> tuple[dict, bytes]:
+            with open(file_path, "rb") as file:
+                file.seek((part_number - 1) * part_size)
+                body = file.read(part_size)
+            checksum = checksums.Checksum(algorithm).update(body)
+            response = self.client.upload_part(
+                Bucket=bucket_name,
+                Key=object_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+                **self.__checksum_kwargs(algorithm, checksum.b64digest()),
+            )
+            part = {"ETag": response["ETag"], "PartNumber": part_number}
+            part[checksums.parameter_name(algorithm)] = checksum.b64digest()
+            return part, checksum.digest()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                results = list(
+                    executor.map(upload_part, range(1, math.ceil(size / part_size) + 1))
+                )
+            response = self.client.complete_multipart_upload(
+                Bucket=bucket_name,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [part for part, _ in results]},
+            )
         except Exception:
-            raise GenericException(traceback.format_exc())
+            self.client.abort_multipart_upload(
+                Bucket=bucket_name, Key=object_key, UploadId=upload_id
+            )
+            raise
+        finally:
+            self.__invalidate_object(bucket_name, object_key)
+        returned = response.get(checksums.parameter_name(algorithm))
+        expected = checksums.composite_checksum(algorithm, [digest for _, digest in results])
+        if returned is not None and returned != expected:
+            raise ChecksumMismatchException(
+                f"{algorithm} checksum mismatch for s3://{bucket_name}/{object_key}: "
+                f"expected {expected}, returned {returned}"
+            )
 
     def copy_object(
         self,
@@ -91,9 +396,10 @@ class S3:
                 Key=destination_object_key,
                 CopySource={"Bucket": bucket_name, "Key": object_key},
             )
+            self.__invalidate_object(destination_bucket_name, destination_object_key)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def delete_object(self, bucket_name: str, object_key: str) -> bool:
         """
@@ -104,9 +410,10 @@ class S3:
         """
         try:
             self.client.delete_object(Bucket=bucket_name, Key=object_key)
+            self.__invalidate_object(bucket_name, object_key)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def move_object(
         self,
@@ -132,8 +439,8 @@ class S3:
             )
             self.delete_object(bucket_name, object_key)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def create_bucket(self, bucket_name: str, **kwargs):
         """
@@ -148,9 +455,10 @@ class S3:
                     "LocationConstraint": self.region_name
                 }
             self.client.create_bucket(Bucket=bucket_name, **kwargs)
+            S3.__cache.invalidate((self.__cache_scope, "bucket", bucket_name))
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def delete_bucket(self, bucket_name: str):
         """
@@ -160,16 +468,298 @@ class S3:
         """
         try:
             self.client.delete_bucket(Bucket=bucket_name)
+            self.invalidate_cache(bucket_name)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
-    def bucket_exists(self, bucket_name: str) -> bool:
+    def presign_get(
+        self, bucket_name: str, object_key: str, expires_in: int = 3600
+    ) -> str:
+        """
+        Funzione per generare un URL prefirmato (SigV4) per scaricare un oggetto
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param expires_in: secondi di validità dell'URL (massimo 7 giorni)
+        :return: URL prefirmato
+        """
+        return self.presign_urls(bucket_name, [object_key], expires_in)[0]
+
+    def presign_put(
+        self,
+        bucket_name: str,
+        object_key: str,
+        expires_in: int = 3600,
+        content_type: str | None = None,
+    ) -> str:
+        """
+        Funzione per generare un URL prefirmato (SigV4) per caricare un oggetto con una PUT
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param expires_in: secondi di validità dell'URL (massimo 7 giorni)
+        :param content_type: eventuale Content-Type che il client dovrà inviare (incluso nella firma)
+        :return: URL prefirmato
+        """
+        return self.presign_urls(
+            bucket_name, [object_key], expires_in, "PUT", content_type
+        )[0]
+
+    def presign_urls(
+        self,
+        bucket_name: str,
+        object_keys: list[str],
+        expires_in: int = 3600,
+        method: str = "GET",
+        content_type: str | None = None,
+        processes: int | None = None,
+        chunk_size: int = 10000,
+    ) -> list[str]:
+        """
+        Funzione per generare gli URL prefirmati di molti oggetti di un bucket. La chiave di firma giornaliera e le
+        parti canoniche comuni vengono calcolate una sola volta; per batch molto grandi le chiavi possono essere
+        suddivise tra più processi
+        :param bucket_name: nome del bucket
+        :param object_keys: lista degli objectkey
+        :param expires_in: secondi di validità degli URL (massimo 7 giorni)
+        :param method: metodo HTTP ("GET" o "PUT")
+        :param content_type: eventuale Content-Type firmato (solo per "PUT")
+        :param processes: eventuale numero di processi da usare quando le chiavi sono più di chunk_size
+        :param chunk_size: numero di chiavi firmate da ogni processo
+        :return: lista degli URL nello stesso ordine delle chiavi
+        """
+        if not 0 < expires_in <= presigner.MAX_EXPIRES_IN:
+            raise ValueError(
+                f"expires_in must be between 1 and {presigner.MAX_EXPIRES_IN} seconds"
+            )
+        if not object_keys:
+            return []
         try:
-            self.client.head_bucket(Bucket=bucket_name)
-            return True
-        except Exception:
-            return False
+            url_presigner = self.__presigner()
+            # tutti gli URL condividono lo stesso istante di firma (e quindi la stessa chiave di firma)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            if not processes or processes <= 1 or len(object_keys) <= chunk_size:
+                return url_presigner.presign_many(
+                    method, bucket_name, object_keys, expires_in, content_type, now
+                )
+            chunks = [
+                object_keys[i : i + chunk_size]
+                for i in range(0, len(object_keys), chunk_size)
+            ]
+            urls: list[str] = []
+            with ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as executor:
+                for chunk_urls in executor.map(
+                    presigner.presign_chunk,
+                    [url_presigner] * len(chunks),
+                    [method] * len(chunks),
+                    [bucket_name] * len(chunks),
+                    chunks,
+                    [expires_in] * len(chunks),
+                    [content_type] * len(chunks),
+                    [now] * len(chunks),
+                ):
+                    urls.extend(chunk_urls)
+            return urls
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def __presigner(self) -> presigner.S3Presigner:
+        """
+        Restituisce un S3Presigner con le stesse credenziali (eventualmente rinnovate) e lo stesso stile di indirizzo
+        del client
+        :return: S3Presigner
+        """
+        if self.client.meta.config.signature_version is botocore.UNSIGNED:
+            raise ValidationException("Cannot presign URLs with an unsigned client")
+        if self.config.credentials_provider is not None:
+            credentials = self.config.credentials_provider.get_frozen_credentials()
+        elif self.config.aws_access_key_id and self.config.aws_secret_access_key:
+            credentials = ReadOnlyCredentials(
+                self.config.aws_access_key_id,
+                self.config.aws_secret_access_key,
+                self.config.aws_session_token,
+            )
+        else:
+            # stessa catena di default (variabili d'ambiente, profili, ruolo dell'istanza) usata dal client
+            session_credentials = boto3.Session().get_credentials()
+            if session_credentials is None:
+                raise ValidationException("No AWS credentials available to presign URLs")
+            credentials = session_credentials.get_frozen_credentials()
+        addressing_style = (self.client.meta.config.s3 or {}).get("addressing_style")
+        return presigner.S3Presigner(
+            credentials.access_key,
+            credentials.secret_key,
+            credentials.token,
+            self.client.meta.region_name,
+            self.client.meta.endpoint_url,
+            # in "auto" con un endpoint personalizzato (es. localstack) il bucket fa parte del percorso, come in boto3
+            path_style=addressing_style == "path"
+            or (addressing_style != "virtual" and self.config.endpoint_url is not None),
+        )
+
+    def bucket_exists(self, bucket_name: str, use_cache: bool = True) -> bool:
+        """
+        Funzione per verificare l'esistenza di un bucket
+        :param bucket_name: nome del bucket
+        :param use_cache: se False la richiesta viene sempre eseguita (e la cache dei metadati aggiornata)
+        :return: True se il bucket esiste ed è accessibile
+        """
+
+        def load():
+            try:
+                self.client.head_bucket(Bucket=bucket_name)
+                return True
+            except Exception as e:
+                if isinstance(wrap_exception(e), ResourceNotFoundException):
+                    return False
+                # altri errori (es. accesso negato): il bucket non è accessibile ma il risultato non viene memorizzato
+                return None
+
+        exists = self.__cached(("bucket", bucket_name), load, use_cache)
+        return bool(exists)
+
+    def head_object(
+        self, bucket_name: str, object_key: str, use_cache: bool = True
+    ) -> dict | None:
+        """
+        Funzione per leggere i metadati di un oggetto (HEAD), passando dalla cache dei metadati. Anche l'assenza
+        dell'oggetto viene memorizzata, per un tempo più breve (negative caching)
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param use_cache: se False la richiesta viene sempre eseguita (e la cache aggiornata)
+        :return: dizionario {"ContentLength", "ETag", "ContentType", "LastModified"} o None se l'oggetto non esiste
+        """
+        metadata = self.__cached(
+            ("object", bucket_name, object_key),
+            lambda: self.__head_object(bucket_name, object_key),
+            use_cache,
+        )
+        return None if metadata is None else dict(metadata)
+
+    def object_exists(
+        self, bucket_name: str, object_key: str, use_cache: bool = True
+    ) -> bool:
+        """
+        Funzione per verificare l'esistenza di un oggetto, passando dalla cache dei metadati
+        :param bucket_name: nome del bucket
+        :param object_key: objectkey per identificare l'oggetto all'interno del bucket
+        :param use_cache: se False la richiesta viene sempre eseguita (e la cache aggiornata)
+        :return: True se l'oggetto esiste
+        """
+        return self.head_object(bucket_name, object_key, use_cache) is not None
+
+    def head_objects(
+        self,
+        bucket_name: str,
+        object_keys: list[str],
+        use_cache: bool = True,
+        max_workers: int = 8,
+    ) -> list[dict | None]:
+        """
+        Funzione per leggere i metadati di più oggetti: quelli in cache vengono restituiti subito, le richieste HEAD
+        degli altri vengono eseguite in parallelo
+        :param bucket_name: nome del bucket
+        :param object_keys: lista degli objectkey
+        :param use_cache: se False le richieste vengono sempre eseguite (e la cache aggiornata)
+        :param max_workers: numero massimo di richieste contemporanee
+        :return: lista dei metadati (None per gli oggetti inesistenti) nello stesso ordine delle chiavi
+        """
+        results: dict = {}
+        missing = []
+        for object_key in dict.fromkeys(object_keys):
+            entry = (
+                S3.__cache.get_entry((self.__cache_scope, "object", bucket_name, object_key))
+                if use_cache
+                else None
+            )
+            if entry is not None and entry.is_fresh(time.monotonic()):
+                results[object_key] = entry.value
+            else:
+                missing.append(object_key)
+        if missing:
+
+            def fetch(object_key: str):
+                return self.head_object(bucket_name, object_key, use_cache)
+
+            if len(missing) == 1 or max_workers <= 1:
+                fetched = list(map(fetch, missing))
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(missing))
+                ) as executor:
+                    fetched = list(executor.map(fetch, missing))
+            results.update(zip(missing, fetched))
+        return [
+            None if results[object_key] is None else dict(results[object_key])
+            for object_key in object_keys
+        ]
+
+    @staticmethod
+    def configure_cache(
+        ttl: float = 60.0, negative_ttl: float = 10.0, max_size: int | None = 10000
+    ):
+        """
+        Imposta le durate e la dimensione massima della cache dei metadati condivisa tra le istanze
+        :param ttl: durata (in secondi) dei metadati degli oggetti e dell'esistenza dei bucket
+        :param negative_ttl: durata (in secondi) dei risultati negativi (oggetto o bucket inesistente)
+        :param max_size: numero massimo di elementi in cache
+        """
+        S3.__cache.default_ttl = ttl
+        S3.__negative_ttl = negative_ttl
+        S3.__cache.max_size = max_size
+
+    def invalidate_cache(
+        self, bucket_name: str | None = None, object_key: str | None = None
+    ):
+        """
+        Invalida la cache dei metadati
+        :param bucket_name: bucket da invalidare (esistenza e metadati di tutti i suoi oggetti). Se None, viene svuotata
+        l'intera cache
+        :param object_key: eventuale oggetto del bucket da invalidare (solo i suoi metadati)
+        """
+        if bucket_name is None:
+            S3.__cache.clear()
+            return
+        if object_key is not None:
+            self.__invalidate_object(bucket_name, object_key)
+            return
+        for key in S3.__cache.keys():
+            if key[0] == self.__cache_scope and key[2] == bucket_name:
+                S3.__cache.invalidate(key)
+
+    def __head_object(self, bucket_name: str, object_key: str) -> dict | None:
+        try:
+            response = self.client.head_object(Bucket=bucket_name, Key=object_key)
+        except Exception as e:
+            wrapped = wrap_exception(e)
+            if isinstance(wrapped, ResourceNotFoundException):
+                return None
+            raise wrapped
+        return {
+            "ContentLength": response.get("ContentLength"),
+            "ETag": response.get("ETag"),
+            "ContentType": response.get("ContentType"),
+            "LastModified": response.get("LastModified"),
+        }
+
+    def __cached(self, key: tuple, loader, use_cache: bool):
+        """
+        Restituisce il valore in cache per la chiave, caricandolo con loader se assente o scaduto. I risultati negativi
+        (False o None) restano in cache per __negative_ttl secondi; i risultati None di bucket_exists non vengono
+        memorizzati
+        """
+        key = (self.__cache_scope, *key)
+        if use_cache:
+            entry = S3.__cache.get_entry(key)
+            if entry is not None and entry.is_fresh(time.monotonic()):
+                return entry.value
+        value = loader()
+        if key[1] == "bucket" and value is None:
+            return value
+        S3.__cache.set(key, value, None if value else S3.__negative_ttl)
+        return value
+
+    def __invalidate_object(self, bucket_name: str, object_key: str):
+        S3.__cache.invalidate((self.__cache_scope, "object", bucket_name, object_key))
 
     def list_object_keys(self, bucket_name: str) -> list[str]:
         try:
@@ -178,5 +768,5 @@ class S3:
             for object in result["Contents"]:
                 output_list.append(object["Key"])
             return output_list
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
@@ -1,26 +1,52 @@
 from __future__ import annotations
 
-import base64
+from concurrent.futures import ThreadPoolExecutor
 
-from simple_aws_wrapper.config import AWSConfig
+from botocore.exceptions import ClientError
+
+from simple_aws_wrapper.cache import CacheEntry, TTLCache
+from simple_aws_wrapper.config import AWSConfig, AWSConfigSnapshot
 from simple_aws_wrapper.const import services
+from simple_aws_wrapper.const.regions import Region
 from simple_aws_wrapper.exceptions.exceptions import (
     MissingConfigurationException,
-    GenericException,
+    SecretRetrievalException,
+    wrap_exception,
 )
 from simple_aws_wrapper.resource_manager import ResourceManager
 
-import traceback
-
 
 class SecretsManager:
-    def __init__(self):
-        if not AWSConfig().is_configured():
-            raise MissingConfigurationException
-        self.client = ResourceManager.get_client(
-            services.SECRETS_MANAGER, **AWSConfig().to_dict()
-        )
-        self.region_name = AWSConfig().get_region_name()
+    """
+    Classe per la gestione del servizio Secrets Manager di AWS
+    """
+
+    CURRENT_STAGE = "AWSCURRENT"
+    MAX_SECRETS_PER_BATCH = 20
+
+    # cache condivisa tra tutte le istanze del processo
+    __cache: TTLCache = TTLCache(default_ttl=300.0, max_size=1000)
+
+    def __init__(
+        self,
+        region: Region | str | None = None,
+        endpoint_url: str | None = None,
+        config: AWSConfigSnapshot | None = None,
+    ):
+        """
+        :param region: eventuale regione da usare al posto di quella configurata in AWSConfig
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato in AWSConfig
+        :param config: eventuale configurazione da usare al posto di AWSConfig().snapshot()
+        """
+        if config is None:
+            if not AWSConfig().is_configured():
+                raise MissingConfigurationException
+            config = AWSConfig().snapshot(region, endpoint_url)
+        else:
+            config = config.replace(region, endpoint_url)
+        self.config = config
+        self.region_name = config.region_name
+        self.client = ResourceManager.get_service_client(services.SECRETS_MANAGER, config)
 
     def create_secret(self, name: str, secret_string: str, **kwargs) -> bool:
         """
@@ -33,8 +59,8 @@ class SecretsManager:
         try:
             self.client.create_secret(Name=name, SecretString=secret_string, **kwargs)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def create_binary_secret(self, name: str, secret_binary: bytes, **kwargs) -> bool:
         """
@@ -47,42 +73,51 @@ class SecretsManager:
         try:
             self.client.create_secret(Name=name, SecretBinary=secret_binary, **kwargs)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
-    def get_secret_value(self, secret_id: str, **kwargs) -> dict:
+    def get_secret_value(self, secret_id: str, use_cache: bool = False, **kwargs) -> dict:
         """
         Recupera un secret
         :param secret_id: id del secret
+        :param use_cache: se True il valore viene letto dalla cache (ignorata se vengono passati kwargs). Dopo una
+        rotazione il valore in cache può restare quello precedente fino alla scadenza del TTL
         :return: dict del secret
         """
-        return self.client.get_secret_value(SecretId=secret_id, **kwargs)[
-            "SecretString"
-        ]
+        return self.__get_secret(secret_id, use_cache, **kwargs)["SecretString"]
 
-    def get_binary_secret_value(self, secret_id: str, **kwargs):
+    def get_binary_secret_value(self, secret_id: str, use_cache: bool = False, **kwargs):
         """
         Recupera un secret binario
         :param secret_id: id del secret
+        :param use_cache: se True il valore viene letto dalla cache (ignorata se vengono passati kwargs). Dopo una
+        rotazione il valore in cache può restare quello precedente fino alla scadenza del TTL
         :return: bytes del secret
         """
         try:
-            return base64.b64decode(self.client.get_secret_value(SecretId=secret_id, **kwargs)[
-                "SecretBinary"
-            ])
-        except Exception:
-            raise GenericException(traceback.format_exc())
+            return self.__get_secret(secret_id, use_cache, **kwargs)["SecretBinary"]
+        except Exception as e:
+            raise wrap_exception(e)
 
-    def get_secret_id_by_name(self, name: str, **kwargs) -> str:
+    def get_secret_id_by_name(self, name: str, use_cache: bool = False, **kwargs) -> str:
         """
-        Trova l'id del secret by name
+        Trova l'id del secret by name, tramite describe_secret (senza recuperarne il valore)
         :param name: nome del secret
+        :param use_cache: se True l'id viene letto dalla cache. Se il secret viene eliminato e ricreato, l'id in
+        cache può restare quello precedente fino alla scadenza del TTL
         :return: id del secret
         """
         try:
-            return self.client.get_secret_value(SecretId=name, **kwargs)["ARN"]
-        except Exception:
-            raise GenericException(traceback.format_exc())
+            if kwargs:
+                return self.client.get_secret_value(SecretId=name, **kwargs)["ARN"]
+            if not use_cache:
+                return self.client.describe_secret(SecretId=name)["ARN"]
+            return SecretsManager.__cache.get_or_load(
+                self.__key("arn", name),
+                lambda entry: self.client.describe_secret(SecretId=name)["ARN"],
+            )
+        except Exception as e:
+            raise wrap_exception(e)
 
     def delete_secret(self, secret_id: str, **kwargs) -> bool:
         """
@@ -92,13 +127,31 @@ class SecretsManager:
         """
         try:
             self.client.delete_secret(SecretId=secret_id, **kwargs)
+            self.invalidate_cache(secret_id)
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
+
+    def iter_secrets(self, filters: list[dict] | None = None, **kwargs):
+        """
+        Generatore che scorre tutti i secrets, pagina per pagina. Ogni elemento contiene un dizionario con le stesse
+        chiavi restituite da list_secrets
+        :param filters: filtri lato server (es. [{"Key": "name", "Values": ["my-app/"]}])
+        :param kwargs: parametri aggiuntivi di list_secrets
+        :return: generatore dei secrets
+        """
+        if filters:
+            kwargs["Filters"] = filters
+        try:
+            paginator = self.client.get_paginator("list_secrets")
+            for page in paginator.paginate(**kwargs):
+                yield from page["SecretList"]
+        except Exception as e:
+            raise wrap_exception(e)
 
     def list_secrets(self, **kwargs) -> list:
         """
-        Lista tutti i secrets. Ogni elemento contiene un dizionario con le seguenti chiavi:
+        Lista tutti i secrets (tutte le pagine). Ogni elemento contiene un dizionario con le seguenti chiavi:
             - ARN (Amazon Resource Name) del secret
             - Name (nome) del secret
             - CreatedDate (data di creazione del secret)
@@ -108,10 +161,117 @@ class SecretsManager:
         :param kwargs: parametri aggiuntivi
         :return: lista dei secrets
         """
+        return list(self.iter_secrets(**kwargs))
+
+    def get_secret_values(
+        self, secret_ids: list, use_cache: bool = False, max_workers: int = 8
+    ) -> dict:
+        """
+        Recupera i valori di più secrets in un solo passaggio tramite batch_get_secret_value (blocchi da 20).
+        Se l'API batch non è disponibile i secrets vengono recuperati singolarmente in parallelo
+        :param secret_ids: lista di id (nome o ARN) dei secrets
+        :param use_cache: se True i valori già in cache non vengono richiesti e quelli recuperati vengono salvati
+        :param max_workers: numero massimo di richieste contemporanee
+        :return: dizionario {"<secret_id>": <SecretString o bytes di SecretBinary, come get_binary_secret_value>};
+        i secrets non trovati sono omessi. Se alcuni secrets esistono ma non possono essere recuperati (es. accesso
+        negato o errore di decifratura) viene sollevata SecretRetrievalException, con gli errori
+        ({"<secret_id>": {"ErrorCode": ..., "Message": ...}}) e i valori recuperati
+        """
+        output_dict: dict = {}
+        missing: list = []
+        for secret_id in secret_ids:
+            value = (
+                SecretsManager.__cache.get(self.__key("value", secret_id))
+                if use_cache
+                else None
+            )
+            if value is None:
+                missing.append(secret_id)
+            else:
+                output_dict[secret_id] = self.__secret_content(value)
+        if not missing:
+            return output_dict
         try:
-            return self.client.list_secrets(**kwargs)["SecretList"]
-        except Exception:
-            raise GenericException(traceback.format_exc())
+            responses, errors = self.__batch_get_secrets(missing, max_workers)
+        except Exception as e:
+            raise wrap_exception(e)
+        for secret_id, response in responses.items():
+            if use_cache:
+                SecretsManager.__cache.set(self.__key("value", secret_id), response)
+            output_dict[secret_id] = self.__secret_content(response)
+        errors = {
+            secret_id: error
+            for secret_id, error in errors.items()
+            if error["ErrorCode"] != "ResourceNotFoundException"
+        }
+        if errors:
+            raise SecretRetrievalException(errors, output_dict)
+        return output_dict
+
+    def __batch_get_secrets(self, secret_ids: list, max_workers: int) -> tuple[dict, dict]:
+        """
+        Recupera i secrets con batch_get_secret_value o, se non disponibile, singolarmente
+        :return: tupla (risposte per secret_id, errori per secret_id {"ErrorCode": ..., "Message": ...})
+        """
+        chunks = [
+            secret_ids[i : i + self.MAX_SECRETS_PER_BATCH]
+            for i in range(0, len(secret_ids), self.MAX_SECRETS_PER_BATCH)
+        ]
+        responses: dict = {}
+        errors: dict = {}
+        try:
+            for chunk in chunks:
+                response = self.client.batch_get_secret_value(SecretIdList=chunk)
+                for value in response["SecretValues"]:
+                    value.pop("ResponseMetadata", None)
+                    for secret_id in chunk:
+                        if secret_id in (value["ARN"], value["Name"]):
+                            responses[secret_id] = value
+                for error in response.get("Errors", []):
+                    errors[error["SecretId"]] = {
+                        "ErrorCode": error.get("ErrorCode"),
+                        "Message": error.get("Message"),
+                    }
+            return responses, errors
+        except AttributeError:
+            # versione di botocore senza batch_get_secret_value
+            pass
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in (
+                "UnknownOperationException",
+                "InvalidAction",
+                "NotImplemented",
+            ):
+                raise
+        remaining = [secret_id for secret_id in secret_ids if secret_id not in responses]
+
+        def get(secret_id: str):
+            try:
+                response = self.client.get_secret_value(SecretId=secret_id)
+            except ClientError as e:
+                error = e.response.get("Error", {})
+                return secret_id, None, {
+                    "ErrorCode": error.get("Code"),
+                    "Message": error.get("Message"),
+                }
+            response.pop("ResponseMetadata", None)
+            return secret_id, response, None
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(remaining)))
+        ) as executor:
+            for secret_id, response, error in executor.map(get, remaining):
+                if response is not None:
+                    responses[secret_id] = response
+                else:
+                    errors[secret_id] = error
+        return responses, errors
+
+    @staticmethod
+    def __secret_content(response: dict):
+        if "SecretString" in response:
+            return response["SecretString"]
+        return response.get("SecretBinary")
 
     def get_secret_name_by_id(self, secret_id: str) -> str:
         """
@@ -121,5 +281,68 @@ class SecretsManager:
         """
         try:
             return self.client.describe_secret(SecretId=secret_id)["Name"]
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
+
+    @staticmethod
+    def configure_cache(ttl: float = 300.0, max_size: int | None = 1000):
+        """
+        Imposta la durata e la dimensione massima della cache dei secret condivisa tra le istanze
+        :param ttl: durata (in secondi) dopo cui viene verificata la versione corrente del secret
+        :param max_size: numero massimo di secret in cache
+        """
+        SecretsManager.__cache.default_ttl = ttl
+        SecretsManager.__cache.max_size = max_size
+
+    def invalidate_cache(self, secret_id: str | None = None):
+        """
+        Invalida la cache dei secret
+        :param secret_id: id del secret da invalidare. Se None, viene svuotata l'intera cache
+        """
+        if secret_id is None:
+            SecretsManager.__cache.clear()
+            return
+        SecretsManager.__cache.invalidate(self.__key("value", secret_id))
+        SecretsManager.__cache.invalidate(self.__key("arn", secret_id))
+
+    def __key(self, kind: str, secret_id: str) -> tuple:
+        """
+        Chiave della cache: i secrets di account, endpoint o regioni diversi non condividono le voci
+        """
+        return self.config, kind, secret_id
+
+    def __get_secret(self, secret_id: str, use_cache: bool, **kwargs) -> dict:
+        """
+        Recupera la risposta di get_secret_value, passando dalla cache se possibile. Alla scadenza del TTL il valore
+        viene recuperato di nuovo solo se la versione AWSCURRENT del secret è cambiata
+        :param secret_id: id del secret
+        :param use_cache: se True usa la cache
+        :return: risposta di get_secret_value
+        """
+        if not use_cache or kwargs:
+            return self.client.get_secret_value(SecretId=secret_id, **kwargs)
+        return SecretsManager.__cache.get_or_load(
+            self.__key("value", secret_id),
+            lambda entry: self.__load_secret(secret_id, entry),
+        )
+
+    def __load_secret(self, secret_id: str, entry: CacheEntry | None) -> dict:
+        if entry is not None:
+            versions = self.client.describe_secret(SecretId=secret_id).get(
+                "VersionIdsToStages", {}
+            )
+            current_version = next(
+                (
+                    version_id
+                    for version_id, stages in versions.items()
+                    if self.CURRENT_STAGE in stages
+                ),
+                None,
+            )
+            if current_version is not None and current_version == entry.value.get(
+                "VersionId"
+            ):
+                return entry.value
+        response = self.client.get_secret_value(SecretId=secret_id)
+        response.pop("ResponseMetadata", None)
+        return response
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 import json
-import traceback
 
-from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.config import AWSConfig, AWSConfigSnapshot
 from simple_aws_wrapper.const import services
+from simple_aws_wrapper.const.regions import Region
 from simple_aws_wrapper.exceptions.exceptions import (
     MissingConfigurationException,
-    GenericException,
+    wrap_exception,
 )
 from simple_aws_wrapper.resource_manager import ResourceManager
 
@@ -17,10 +17,26 @@ class SQS:
     Classe per la gestione di SQS su AWS
     """
 
-    def __init__(self):
-        if not AWSConfig().is_configured():
-            raise MissingConfigurationException
-        self.client = ResourceManager.get_client(services.SQS, **AWSConfig().to_dict())
+    def __init__(
+        self,
+        region: Region | str | None = None,
+        endpoint_url: str | None = None,
+        config: AWSConfigSnapshot | None = None,
+    ):
+        """
+        :param region: eventuale regione da usare al posto di quella configurata in AWSConfig
+        :param endpoint_url: eventuale endpoint da usare al posto di quello configurato in AWSConfig
+        :param config: eventuale configurazione da usare al posto di AWSConfig().snapshot()
+        """
+        if config is None:
+            if not AWSConfig().is_configured():
+                raise MissingConfigurationException
+            config = AWSConfig().snapshot(region, endpoint_url)
+        else:
+            config = config.replace(region, endpoint_url)
+        self.config = config
+        self.region_name = config.region_name
+        self.client = ResourceManager.get_service_client(services.SQS, config)
 
     @staticmethod
     def create_message(**kwargs) -> dict:
@@ -52,8 +68,8 @@ class SQS:
                 MessageBody=json.dumps(message_body),
             )
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
 
     def send_message(self, queue_name: str, message_body: str | dict) -> bool:
         """
@@ -72,5 +88,5 @@ class SQS:
                 MessageBody=message_body,
             )
             return True
-        except Exception:
-            raise GenericException(traceback.format_exc())
+        except Exception as e:
+            raise wrap_exception(e)
@@ -0,0 +1,143 @@
+import dataclasses
+import threading
+import time
+import unittest
+import uuid
+
+from simple_aws_wrapper.config import AWSConfig, AWSConfigSnapshot
+from simple_aws_wrapper.const import regions
+from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.credentials import (
+    AssumeRoleCredentialsProvider,
+    CredentialsProvider,
+)
+from simple_aws_wrapper.services.sqs import SQS
+
+
+class TestAWSConfig(unittest.TestCase):
+    def setUp(self) -> None:
+        AWSConfig().set_region(Region(regions.EU_WEST_1)).set_endpoint_url(
+            "http://localhost:4566"
+        ).set_aws_secret_access_key("test").set_aws_access_key_id(
+            "test"
+        ).set_aws_session_token(
+            "test"
+        )
+
+    def test_snapshot(self):
+        snapshot = AWSConfig().snapshot()
+        self.assertIs(snapshot, AWSConfig().snapshot())
+        self.assertEqual(regions.EU_WEST_1, snapshot.region_name)
+        self.assertEqual(snapshot.to_dict(), AWSConfig().to_dict())
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snapshot.region_name = regions.US_EAST_1
+        other = AWSConfig().snapshot(regions.US_EAST_1)
+        self.assertEqual(regions.US_EAST_1, other.region_name)
+        self.assertEqual(snapshot, other.replace(regions.EU_WEST_1))
+        self.assertEqual(hash(snapshot), hash(other.replace(regions.EU_WEST_1)))
+        AWSConfig().set_region(Region(regions.US_EAST_1))
+        self.assertEqual(regions.US_EAST_1, AWSConfig().snapshot().region_name)
+        self.assertEqual(regions.EU_WEST_1, snapshot.region_name)
+
+    def test_snapshot_repr_hides_secrets(self):
+        snapshot = AWSConfigSnapshot(
+            region_name=regions.EU_WEST_1,
+            aws_access_key_id="access-key",
+            aws_secret_access_key="secret-key",
+            aws_session_token="session-token",
+        )
+        self.assertIn("access-key", repr(snapshot))
+        self.assertNotIn("secret-key", repr(snapshot))
+        self.assertNotIn("session-token", repr(snapshot))
+
+    def test_invalid_region(self):
+        with self.assertRaises(ValueError):
+            AWSConfigSnapshot(region_name="invalid-region")
+
+    def test_use(self):
+        profile = AWSConfig().snapshot(regions.US_EAST_1)
+        results = {}
+
+        def worker():
+            with AWSConfig().use(profile):
+                results["worker"] = SQS().region_name
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(regions.US_EAST_1, results["worker"])
+        self.assertEqual(regions.EU_WEST_1, SQS().region_name)
+
+    def test_shared_client(self):
+        self.assertIs(SQS().client, SQS().client)
+        self.assertIs(SQS().client, SQS(config=AWSConfig().snapshot()).client)
+        self.assertIsNot(SQS().client, SQS(regions.US_EAST_1).client)
+
+    def test_assume_role_credentials_provider(self):
+        provider = AssumeRoleCredentialsProvider(
+            "arn:aws:iam::123456789012:role/test-role",
+            sts_endpoint_url="http://localhost:4566",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        try:
+            config = AWSConfig().snapshot()
+            AWSConfig().set_credentials_provider(provider)
+            sqs = SQS()
+            self.assertIsNot(config, sqs.config)
+            self.assertIs(provider, sqs.config.credentials_provider)
+            queue_name = f"test-queue-{uuid.uuid4().hex[:8]}"
+            sqs.client.create_queue(QueueName=queue_name)
+            credentials = provider.get_credentials()
+            access_key = credentials.get_frozen_credentials().access_key
+            self.assertEqual(1, provider.refresh_count)
+            provider.refresh()
+            self.assertEqual(2, provider.refresh_count)
+            self.assertNotEqual(
+                access_key, credentials.get_frozen_credentials().access_key
+            )
+            self.assertIs(sqs.client, SQS().client)
+            sqs.client.delete_queue(
+                QueueUrl=sqs.client.get_queue_url(QueueName=queue_name)["QueueUrl"]
+            )
+        finally:
+            provider.close()
+            AWSConfig().set_credentials_provider(None)
+
+    def test_assume_role_background_refresh(self):
+        threads = []
+
+        class RecordingProvider(AssumeRoleCredentialsProvider):
+            def fetch_credentials(self) -> dict:
+                threads.append(threading.current_thread())
+                return super().fetch_credentials()
+
+        # credenziali da 900 secondi rinnovate 899 secondi prima della scadenza: il timer scatta dopo un secondo
+        provider = RecordingProvider(
+            "arn:aws:iam::123456789012:role/test-role",
+            duration_seconds=900,
+            sts_endpoint_url="http://localhost:4566",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            refresh_margin=899,
+        )
+        try:
+            AWSConfig().set_credentials_provider(provider)
+            sqs = SQS()
+            sqs.client.list_queues()
+            self.assertEqual([threading.current_thread()], threads)
+            deadline = time.monotonic() + 10
+            while provider.refresh_count < 2 and time.monotonic() < deadline:
+                sqs.client.list_queues()
+                time.sleep(0.1)
+            self.assertGreaterEqual(provider.refresh_count, 2)
+            sqs.client.list_queues()
+            # solo il primo recupero avviene sul thread della richiesta, i rinnovi sul timer
+            self.assertNotIn(threading.current_thread(), threads[1:])
+        finally:
+            provider.close()
+            AWSConfig().set_credentials_provider(None)
+
+    def test_credentials_provider_is_abstract(self):
+        with self.assertRaises(TypeError):
+            CredentialsProvider()
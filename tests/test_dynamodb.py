@@ -1,10 +1,45 @@
+import decimal
+import json
+import os
 import random
+import tempfile
+import time
 import unittest
+from unittest import mock
 
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+from simple_aws_wrapper import parquet
+from simple_aws_wrapper.attribute_offload import AttributeOffload, OffloadedAttribute
 from simple_aws_wrapper.config import AWSConfig
 from simple_aws_wrapper.const import regions
 from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.dynamodb_types import (
+    deserialize,
+    deserialize_item,
+    serialize,
+    serialize_item,
+)
+from simple_aws_wrapper.exceptions.exceptions import (
+    ConditionalCheckFailedException,
+    GenericException,
+    MultiRegionException,
+    ResourceNotFoundException,
+    ThrottlingException,
+    TransactionCanceledException,
+    wrap_exception,
+)
+from simple_aws_wrapper.multi_region import first_success, run_in_regions
+from simple_aws_wrapper.resource_manager import ResourceManager
 from simple_aws_wrapper.services.dynamodb import DynamoDB
+from simple_aws_wrapper.services.s3 import S3
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 
 
 class TestDynamoDB(unittest.TestCase):
@@ -198,3 +233,710 @@ class TestDynamoDB(unittest.TestCase):
             ),
         )
         self.dynamodb.delete_table(self.table_name)
+
+    def test_missing_table_raises_resource_not_found(self):
+        with self.assertRaises(ResourceNotFoundException) as context:
+            self.dynamodb.put_item(self.table_name, {"id": "1"})
+        self.assertEqual("ResourceNotFoundException", context.exception.error_code)
+        self.assertIs(context.exception.cause, context.exception.__cause__)
+        self.assertIn("ResourceNotFoundException", str(context.exception))
+
+    def test_run_in_regions(self):
+        regions_list = [regions.EU_WEST_1, regions.US_EAST_1]
+        run_in_regions(
+            DynamoDB,
+            regions_list,
+            lambda dynamodb: dynamodb.create_table(
+                self.table_name,
+                self.key_schema,
+                self.attribute_definitions,
+                self.provisioned_throughput,
+            ),
+        )
+        DynamoDB(regions.US_EAST_1).put_item(self.table_name, {"id": "1"})
+        self.assertEqual(
+            {regions.EU_WEST_1: False, regions.US_EAST_1: True},
+            run_in_regions(
+                DynamoDB,
+                regions_list,
+                lambda dynamodb: dynamodb.key_exists(self.table_name, {"id": "1"}),
+            ),
+        )
+
+        def get_existing_item(dynamodb: DynamoDB) -> dict:
+            item = dynamodb.get_item(self.table_name, {"id": "1"})
+            if item is None:
+                raise KeyError(dynamodb.region_name)
+            return item
+
+        self.assertEqual(
+            (regions.US_EAST_1, {"id": "1"}),
+            first_success(DynamoDB, regions_list, get_existing_item),
+        )
+        run_in_regions(
+            DynamoDB,
+            regions_list,
+            lambda dynamodb: dynamodb.delete_table(self.table_name),
+        )
+        with self.assertRaises(MultiRegionException) as context:
+            run_in_regions(
+                DynamoDB,
+                regions_list,
+                lambda dynamodb: dynamodb.put_item(self.table_name, {"id": "1"}),
+            )
+        self.assertEqual(set(regions_list), set(context.exception.errors))
+
+    def test_scan_items(self):
+        self.dynamodb.create_table(
+            self.table_name,
+            self.key_schema,
+            self.attribute_definitions,
+            self.provisioned_throughput,
+        )
+        item = {
+            "id": "1",
+            "count": 3,
+            "ratio": decimal.Decimal("0.5"),
+            "tags": {"a", "b"},
+            "nested": {"values": [1, "x", {"flag": True}], "empty": None},
+        }
+        self.dynamodb.put_item(self.table_name, item)
+        self.assertEqual([item], list(self.dynamodb.scan_items(self.table_name)))
+        native = list(
+            self.dynamodb.scan_items(self.table_name, use_native_numbers=True)
+        )[0]
+        self.assertIsInstance(native["count"], int)
+        self.assertIsInstance(native["ratio"], float)
+        self.assertEqual(1, native["nested"]["values"][0])
+        self.assertEqual(
+            [item], self.dynamodb.scan_filter_elements(self.table_name, "count", 3)
+        )
+        self.dynamodb.delete_table(self.table_name)
+
+    def test_dynamodb_types(self):
+        item = {
+            "s": "text",
+            "n": decimal.Decimal("-1.25E+3"),
+            "i": 10**20,
+            "b": b"bytes",
+            "bool": False,
+            "null": None,
+            "ss": {"a", "b"},
+            "ns": {decimal.Decimal(1), decimal.Decimal("2.5")},
+            "bs": {b"a"},
+            "m": {"l": [{"m": {"n": decimal.Decimal(1)}}, []]},
+        }
+        serializer = TypeSerializer()
+        deserializer = TypeDeserializer()
+        serialized = serialize_item(item)
+        self.assertEqual(
+            {k: deserializer.deserialize(v) for k, v in serialized.items()},
+            {k: deserializer.deserialize(serializer.serialize(v)) for k, v in item.items()},
+        )
+        self.assertEqual(item, deserialize_item(serialized))
+        self.assertEqual({"N": "1.5"}, serialize(1.5))
+        self.assertEqual(1.5, deserialize({"N": "1.5"}, use_native_numbers=True))
+        with self.assertRaises(TypeError):
+            serialize(float("nan"))
+        with self.assertRaises(TypeError):
+            serialize(set())
+        with self.assertRaises(TypeError):
+            deserialize({"X": "1"})
+
+    def test_conditional_writes(self):
+        self.dynamodb.create_table(
+            self.table_name,
+            self.key_schema,
+            self.attribute_definitions,
+            self.provisioned_throughput,
+        )
+        self.assertTrue(
+            self.dynamodb.put_item(
+                self.table_name,
+                {"id": "1", "version": 1},
+                condition_expression="attribute_not_exists(id)",
+            )
+        )
+        with self.assertRaises(ConditionalCheckFailedException):
+            self.dynamodb.put_item(
+                self.table_name,
+                {"id": "1", "version": 1},
+                condition_expression="attribute_not_exists(id)",
+            )
+        self.assertEqual(
+            {"version": 2},
+            self.dynamodb.update_item(
+                self.table_name,
+                {"id": "1"},
+                "SET #v = :new",
+                {":new": 2, ":old": 1},
+                condition_expression="#v = :old",
+                expression_attribute_names={"#v": "version"},
+                return_values="UPDATED_NEW",
+            ),
+        )
+        with self.assertRaises(ConditionalCheckFailedException):
+            self.dynamodb.delete_item(
+                self.table_name,
+                {"id": "1"},
+                condition_expression="version = :v",
+                expression_attribute_values={":v": 1},
+            )
+        self.assertEqual(
+            1, self.dynamodb.increment_counter(self.table_name, {"id": "2"}, "hits")
+        )
+        self.assertEqual(
+            6,
+            self.dynamodb.increment_counter(self.table_name, {"id": "2"}, "hits", 5),
+        )
+        with self.assertRaises(ConditionalCheckFailedException):
+            self.dynamodb.increment_counter(
+                self.table_name,
+                {"id": "2"},
+                "hits",
+                condition_expression="#counter < :max",
+                expression_attribute_values={":max": 5},
+            )
+        self.dynamodb.delete_table(self.table_name)
+
+    def test_transactions(self):
+        self.dynamodb.create_table(
+            self.table_name,
+            self.key_schema,
+            self.attribute_definitions,
+            self.provisioned_throughput,
+        )
+        self.assertTrue(
+            self.dynamodb.transact_write(
+                [
+                    {"Put": {"TableName": self.table_name, "Item": {"id": "1", "n": 1}}},
+                    {"Put": {"TableName": self.table_name, "Item": {"id": "2", "n": 2}}},
+                ]
+            )
+        )
+        with self.assertRaises(ConditionalCheckFailedException):
+            self.dynamodb.transact_write(
+                [
+                    {
+                        "Update": {
+                            "TableName": self.table_name,
+                            "Key": {"id": "1"},
+                            "UpdateExpression": "SET n = :n",
+                            "ExpressionAttributeValues": {":n": 10},
+                        }
+                    },
+                    {
+                        "ConditionCheck": {
+                            "TableName": self.table_name,
+                            "Key": {"id": "2"},
+                            "ConditionExpression": "n = :n",
+                            "ExpressionAttributeValues": {":n": 3},
+                        }
+                    },
+                ]
+            )
+        self.assertEqual(
+            [{"id": "1", "n": 1}, None, {"id": "2", "n": 2}],
+            self.dynamodb.transact_get(
+                [
+                    (self.table_name, {"id": "1"}),
+                    (self.table_name, {"id": "3"}),
+                    {"TableName": self.table_name, "Key": {"id": "2"}},
+                ],
+                use_native_numbers=True,
+            ),
+        )
+        with self.assertRaises(ValueError):
+            self.dynamodb.transact_get([(self.table_name, {"id": "1"})] * 101)
+        self.dynamodb.delete_table(self.table_name)
+
+    def test_table_cache(self):
+        get_table = self.dynamodb._DynamoDB__get_table_resource
+        table = get_table(self.table_name)
+        self.assertIs(table, DynamoDB()._DynamoDB__get_table_resource(self.table_name))
+        # svuotando il pool dei client vengono ricreati anche gli oggetti Table
+        ResourceManager.clear_service_clients()
+        dynamodb = DynamoDB()
+        other = dynamodb._DynamoDB__get_table_resource(self.table_name)
+        self.assertIsNot(table, other)
+        self.assertIs(dynamodb.client.meta.client, other.meta.client)
+        # la cache ha una dimensione massima
+        for i in range(DynamoDB.MAX_CACHED_TABLES + 10):
+            dynamodb._DynamoDB__get_table_resource(f"{self.table_name}-{i}")
+        self.assertEqual(DynamoDB.MAX_CACHED_TABLES, len(DynamoDB._DynamoDB__tables))
+
+    def test_transaction_canceled_mapping(self):
+        def canceled(*codes):
+            return wrap_exception(
+                ClientError(
+                    {
+                        "Error": {"Code": "TransactionCanceledException"},
+                        "CancellationReasons": [{"Code": code} for code in codes],
+                    },
+                    "TransactWriteItems",
+                )
+            )
+
+        self.assertIsInstance(
+            canceled("None", "ConditionalCheckFailed"), ConditionalCheckFailedException
+        )
+        self.assertIsInstance(canceled("ThrottlingError", "None"), ThrottlingException)
+        conflict = canceled("TransactionConflict", "None")
+        self.assertIs(TransactionCanceledException, type(conflict))
+        self.assertEqual(
+            [{"Code": "TransactionConflict"}, {"Code": "None"}],
+            conflict.cancellation_reasons,
+        )
+        self.assertIs(
+            TransactionCanceledException,
+            type(canceled("ValidationError", "ThrottlingError")),
+        )
+
+    def test_projected_reads(self):
+        self.dynamodb.create_table(
+            self.table_name,
+            self.key_schema,
+            self.attribute_definitions,
+            self.provisioned_throughput,
+        )
+        self.dynamodb.put_item(
+            self.table_name, {"id": "1", "name": "value", "payload": "x" * 1000}
+        )
+        self.assertEqual(
+            "value",
+            self.dynamodb.get_item_value(
+                self.table_name, {"id": "1"}, "name", consistent_read=True
+            ),
+        )
+        self.assertIsNone(
+            self.dynamodb.get_item_value(self.table_name, {"id": "1"}, "missing")
+        )
+        self.assertEqual(
+            {"id": "1"},
+            self.dynamodb.get_record(
+                self.table_name,
+                {"id": "1"},
+                projection_expression="#id",
+                expression_attribute_names={"#id": "id"},
+            )["Item"],
+        )
+        self.assertTrue(
+            self.dynamodb.key_exists(self.table_name, {"id": "1"}, consistent_read=True)
+        )
+        for i in range(2, 150, 2):
+            self.dynamodb.put_item(self.table_name, {"id": str(i)})
+        keys = [{"id": str(i)} for i in range(150)] + [{"id": "1"}]
+        self.assertEqual(
+            [i == 1 or (i % 2 == 0 and i > 0) for i in range(150)] + [True],
+            self.dynamodb.keys_exist(self.table_name, keys),
+        )
+        self.dynamodb.delete_table(self.table_name)
+
+    def test_throttled_scan(self):
+        self.dynamodb.create_table(
+            self.table_name,
+            self.key_schema,
+            self.attribute_definitions,
+            {"ReadCapacityUnits": 20, "WriteCapacityUnits": 5},
+        )
+        self.assertEqual(20, self.dynamodb.get_read_capacity(self.table_name))
+        for i in range(30):
+            self.dynamodb.put_item(self.table_name, {"id": str(i)})
+        start = time.monotonic()
+        # ogni pagina consuma almeno 1 RCU: 15 pagine a 10 RCU/s (burst di 10) richiedono almeno 0.5 secondi
+        items = list(
+            self.dynamodb.scan_items(self.table_name, capacity_percentage=50, Limit=2)
+        )
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+        self.assertEqual(30, len(items))
+        self.assertEqual(
+            [{"id": "7"}],
+            self.dynamodb.scan_filter_elements(
+                self.table_name, "id", "7", target_rcu=100
+            ),
+        )
+        with self.assertRaises(GenericException):
+            list(self.dynamodb.scan_items(self.table_name, target_rcu=0))
+        self.dynamodb.delete_table(self.table_name)
+
+    def test_copy_table(self):
+        destination_table = f"{self.table_name}-copy"
+        for table_name in (self.table_name, destination_table):
+            self.dynamodb.create_table(
+                table_name,
+                self.key_schema,
+                self.attribute_definitions,
+                self.provisioned_throughput,
+            )
+        self.assertEqual(
+            60,
+            self.dynamodb.batch_put_items(
+                self.table_name, [{"id": str(i), "value": i} for i in range(60)]
+            ),
+        )
+        checkpoint_file = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+        transformed: list = []
+
+        def failing_transform(item: dict) -> dict | None:
+            if item["id"] == "13":
+                raise RuntimeError("interrupted")
+            return transform(item)
+
+        def transform(item: dict) -> dict | None:
+            transformed.append(item["id"])
+            if item["value"] % 10 == 0:
+                return None
+            return {**item, "value": item["value"] * 2}
+
+        with self.assertRaises(GenericException):
+            self.dynamodb.copy_table(
+                self.table_name,
+                destination_table,
+                failing_transform,
+                segments=3,
+                checkpoint_file=checkpoint_file,
+            )
+        with open(checkpoint_file, encoding="utf-8") as f:
+            self.assertFalse(all(state["done"] for state in json.load(f)["segments"]))
+        first_run = len(transformed)
+        totals = self.dynamodb.copy_table(
+            self.table_name,
+            destination_table,
+            transform,
+            segments=3,
+            checkpoint_file=checkpoint_file,
+        )
+        # i segmenti completati nella prima esecuzione non vengono riletti
+        self.assertLess(len(transformed) - first_run, 60)
+        self.assertEqual({"read": 60, "written": 54, "skipped": 6}, totals)
+        copied = list(
+            self.dynamodb.scan_items(destination_table, use_native_numbers=True)
+        )
+        self.assertEqual(54, len(copied))
+        self.assertTrue(all(item["value"] == int(item["id"]) * 2 for item in copied))
+        with self.assertRaises(ValueError):
+            self.dynamodb.copy_table(
+                self.table_name, destination_table, checkpoint_file=checkpoint_file
+            )
+        for table_name in (self.table_name, destination_table):
+            self.dynamodb.delete_table(table_name)
+
+    def test_partiql_statements(self):
+        self.dynamodb.create_table(
+            self.table_name,
+            self.key_schema,
+            self.attribute_definitions,
+            self.provisioned_throughput,
+        )
+        self.dynamodb.batch_put_items(
+            self.table_name, [{"id": str(i), "value": i} for i in range(40)]
+        )
+        self.assertEqual(
+            [{"id": "3", "value": 3}],
+            self.dynamodb.execute_statement(
+                f"SELECT * FROM {self.table_name} WHERE id = ?",
+                ["3"],
+                use_native_numbers=True,
+            ),
+        )
+        self.assertEqual(
+            40,
+            len(
+                self.dynamodb.execute_statement(
+                    f"SELECT * FROM {self.table_name}", limit=10
+                )
+            ),
+        )
+        # letture e scritture mescolate (su elementi diversi), oltre MAX_BATCH_STATEMENTS istruzioni
+        statements = [
+            (f"SELECT * FROM {self.table_name} WHERE id = ?", [str(i)]) for i in range(30)
+        ] + [
+            (f"UPDATE {self.table_name} SET value = ? WHERE id = ?", [i * 10, str(i)])
+            for i in range(30, 40)
+        ]
+        statements.insert(5, ("SELECT * FROM missing_table WHERE id = ?", ["1"]))
+        results = self.dynamodb.batch_execute_statement(
+            statements, use_native_numbers=True, max_workers=2
+        )
+        self.assertEqual(41, len(results))
+        self.assertEqual({"id": "0", "value": 0}, results[0]["Item"])
+        self.assertIsNone(results[0]["Error"])
+        self.assertEqual({"id": "29", "value": 29}, results[30]["Item"])
+        self.assertIsNone(results[5]["Item"])
+        self.assertEqual("ResourceNotFound", results[5]["Error"]["Code"])
+        self.assertTrue(all(result["Error"] is None for result in results[31:]))
+        self.assertEqual(
+            390, self.dynamodb.get_item(self.table_name, {"id": "39"})["value"]
+        )
+        # un parametro non convertibile fa fallire solo la sua istruzione
+        results = self.dynamodb.batch_execute_statement(
+            [
+                (f"UPDATE {self.table_name} SET value = ? WHERE id = ?", [float("nan"), "1"]),
+                (f"UPDATE {self.table_name} SET value = ? WHERE id = ?", [7, "2"]),
+                (f"SELECT * FROM {self.table_name} WHERE id = ?", ["2"]),
+            ],
+            use_native_numbers=True,
+        )
+        self.assertEqual("ValidationError", results[0]["Error"]["Code"])
+        self.assertIsNone(results[0]["Item"])
+        self.assertIsNone(results[1]["Error"])
+        self.assertEqual("2", results[2]["Item"]["id"])
+        self.assertEqual(1, self.dynamodb.get_item(self.table_name, {"id": "1"})["value"])
+        self.assertEqual(7, self.dynamodb.get_item(self.table_name, {"id": "2"})["value"])
+        self.assertEqual(
+            [{"Item": None, "Error": results[0]["Error"]}],
+            self.dynamodb.batch_execute_statement(
+                [(f"SELECT * FROM {self.table_name} WHERE id = ?", [float("inf")])]
+            ),
+        )
+        self.dynamodb.delete_table(self.table_name)
+
+    def test_attribute_offload(self):
+        self.dynamodb.create_table(
+            self.table_name,
+            self.key_schema,
+            self.attribute_definitions,
+            self.provisioned_throughput,
+        )
+        s3 = S3()
+        bucket_name = f"test-bucket-{random.randint(0, 1000)}"
+        s3.create_bucket(bucket_name)
+
+        def object_keys():
+            response = s3.client.list_objects_v2(Bucket=bucket_name)
+            return [obj["Key"] for obj in response.get("Contents", [])]
+
+        dynamodb = DynamoDB(
+            offload=AttributeOffload(
+                s3, bucket_name, threshold=4096, delete_replaced=True
+            )
+        )
+        blob = os.urandom(500 * 1024)
+        text = "x" * 10000
+        nested = {"values": list(range(2000)), "data": b"binary"}
+        # oltre il limite di 400 KB di DynamoDB
+        self.assertTrue(
+            dynamodb.put_item(
+                self.table_name,
+                {"id": "1", "blob": blob, "text": text, "nested": nested, "small": "s"},
+            )
+        )
+        self.assertEqual(3, len(object_keys()))
+        # senza offload viene letto solo il puntatore
+        raw = self.dynamodb.get_item(self.table_name, {"id": "1"})
+        self.assertEqual({"__offloaded__"}, set(raw["blob"]))
+        item = dynamodb.get_item(self.table_name, {"id": "1"})
+        self.assertEqual("s", item["small"])
+        self.assertIsInstance(item["blob"], OffloadedAttribute)
+        self.assertFalse(item["blob"].loaded)
+        self.assertEqual(blob, item["blob"].value)
+        self.assertTrue(item["blob"].loaded)
+        self.assertEqual(text, item["text"].value)
+        self.assertEqual(nested["data"], item["nested"].value["data"])
+        self.assertEqual(list(range(2000)), item["nested"].value["values"])
+
+        # riscrittura: l'attributo non modificato riusa l'oggetto, quello sostituito viene cancellato
+        item["text"] = "short"
+        dynamodb.put_item(self.table_name, item)
+        self.assertEqual(2, len(object_keys()))
+        dynamodb.batch_put_items(
+            self.table_name,
+            [{"id": str(i), "blob": blob[:5000]} for i in range(2, 6)],
+        )
+        items = dynamodb.resolve_offloaded(list(dynamodb.scan_items(self.table_name)))
+        self.assertEqual(5, len(items))
+        for item in items:
+            self.assertEqual(blob[: 5000 if item["id"] != "1" else None], item["blob"])
+
+        dynamodb.delete_item(self.table_name, {"id": "1"})
+        self.assertEqual(4, len(object_keys()))
+
+        # batch non riuscita: restano solo gli oggetti degli elementi scritti (primo blocco da 25)
+        client = dynamodb._DynamoDB__dynamodb
+        batch_write_item = client.batch_write_item
+        calls = []
+
+        def failing_batch_write_item(**kwargs):
+            calls.append(kwargs)
+            if len(calls) > 1:
+                raise ClientError(
+                    {"Error": {"Code": "InternalServerError"}}, "BatchWriteItem"
+                )
+            return batch_write_item(**kwargs)
+
+        with mock.patch.object(
+            client, "batch_write_item", side_effect=failing_batch_write_item
+        ):
+            with self.assertRaises(GenericException):
+                dynamodb.batch_put_items(
+                    self.table_name,
+                    [{"id": f"batch-{i}", "blob": blob[:5000]} for i in range(30)],
+                )
+        self.assertEqual(4 + 25, len(object_keys()))
+
+        # update_item e transact_write spostano i valori assegnati come put_item
+        attributes = dynamodb.update_item(
+            self.table_name,
+            {"id": "2"},
+            "SET #b = :b, #s = :s, tags = list_append(if_not_exists(tags, :e), :t)",
+            {":b": blob, ":s": text, ":e": [], ":t": [text]},
+            expression_attribute_names={"#b": "blob", "#s": "small"},
+            return_values="ALL_NEW",
+        )
+        self.assertEqual(4 + 25 + 2, len(object_keys()))
+        self.assertIsInstance(attributes["blob"], OffloadedAttribute)
+        item = dynamodb.get_item(self.table_name, {"id": "2"})
+        self.assertEqual(blob, item["blob"].value)
+        self.assertEqual(text, item["small"].value)
+        self.assertEqual([text], item["tags"])
+        dynamodb.transact_write(
+            [
+                {"Put": {"TableName": self.table_name, "Item": {"id": "tx", "blob": blob}}},
+                {
+                    "Update": {
+                        "TableName": self.table_name,
+                        "Key": {"id": "3"},
+                        "UpdateExpression": "SET #b = :b",
+                        "ExpressionAttributeNames": {"#b": "blob"},
+                        "ExpressionAttributeValues": {":b": blob},
+                    }
+                },
+            ]
+        )
+        self.assertEqual(4 + 25 + 4, len(object_keys()))
+        self.assertEqual(blob, dynamodb.get_item(self.table_name, {"id": "tx"})["blob"].value)
+        self.assertEqual(blob, dynamodb.get_item(self.table_name, {"id": "3"})["blob"].value)
+        # transazione annullata: gli oggetti caricati vengono cancellati
+        with self.assertRaises(ConditionalCheckFailedException):
+            dynamodb.transact_write(
+                [
+                    {
+                        "Put": {
+                            "TableName": self.table_name,
+                            "Item": {"id": "tx", "blob": blob},
+                            "ConditionExpression": "attribute_not_exists(id)",
+                        }
+                    }
+                ]
+            )
+        self.assertEqual(4 + 25 + 4, len(object_keys()))
+        with self.assertRaises(ValueError):
+            AttributeOffload(s3, bucket_name, threshold=1024)
+        for object_key in object_keys():
+            s3.delete_object(bucket_name, object_key)
+        s3.delete_bucket(bucket_name)
+        self.dynamodb.delete_table(self.table_name)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_export_and_import(self):
+        destination_table = f"{self.table_name}-import"
+        for table_name in (self.table_name, destination_table):
+            self.dynamodb.create_table(
+                table_name,
+                self.key_schema,
+                self.attribute_definitions,
+                self.provisioned_throughput,
+            )
+        items = [
+            {
+                "id": str(i),
+                "count": i,
+                "ratio": decimal.Decimal("0.5"),
+                "tags": {"a", "b"},
+                "nested": {"flag": i % 2 == 0, "values": [1, 2]},
+            }
+            for i in range(25)
+        ] + [{"id": "sparse", "count": 100}]
+        self.dynamodb.batch_put_items(self.table_name, items)
+        file_path = os.path.join(tempfile.mkdtemp(), "export.parquet")
+        self.assertEqual(
+            26,
+            self.dynamodb.export_parquet(self.table_name, file_path, batch_size=10),
+        )
+        s3 = S3()
+        bucket_name = f"test-bucket-{random.randint(0, 1000)}"
+        s3.create_bucket(bucket_name)
+        self.assertEqual(
+            26,
+            self.dynamodb.export_parquet(
+                self.table_name,
+                s3=s3,
+                bucket_name=bucket_name,
+                object_key="export.parquet",
+                schema=pyarrow.parquet.read_schema(file_path),
+            ),
+        )
+        self.assertEqual(
+            26,
+            self.dynamodb.import_parquet(
+                destination_table,
+                s3=s3,
+                bucket_name=bucket_name,
+                object_key="export.parquet",
+                batch_size=7,
+            ),
+        )
+        # i set vengono esportati come liste
+        self.assertEqual(
+            {
+                "id": "3",
+                "count": 3,
+                "ratio": 0.5,
+                "tags": ["a", "b"],
+                "nested": {"flag": False, "values": [1, 2]},
+            },
+            self.dynamodb.get_item(destination_table, {"id": "3"}),
+        )
+        self.assertEqual(
+            {"id": "sparse", "count": 100},
+            self.dynamodb.get_item(destination_table, {"id": "sparse"}),
+        )
+        s3.delete_object(bucket_name, "export.parquet")
+        s3.delete_bucket(bucket_name)
+        for table_name in (self.table_name, destination_table):
+            self.dynamodb.delete_table(table_name)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_schema_across_batches(self):
+        destination_table = f"{self.table_name}-import"
+        for table_name in (self.table_name, destination_table):
+            self.dynamodb.create_table(
+                table_name,
+                self.key_schema,
+                self.attribute_definitions,
+                self.provisioned_throughput,
+            )
+        items = [{"id": str(i), "map": {"a": i}, "value": i} for i in range(20)] + [
+            # attributo annidato che compare solo in un batch successivo
+            {"id": "late", "map": {"a": 2, "b": "late"}, "value": 1},
+            # lista con tipi misti, mappa vuota e attributo di tipo diverso dagli altri elementi
+            {"id": "mixed", "map": {"a": 3}, "value": "text", "list": [1, "x", b"\x00"]},
+            {"id": "empty", "map": {}, "value": {"nested": {"c"}}},
+        ]
+        self.dynamodb.batch_put_items(self.table_name, items)
+        file_path = os.path.join(tempfile.mkdtemp(), "export.parquet")
+        self.assertEqual(
+            23, self.dynamodb.export_parquet(self.table_name, file_path, batch_size=5)
+        )
+        self.assertEqual(
+            23, self.dynamodb.import_parquet(destination_table, file_path, batch_size=4)
+        )
+        for item in items:
+            self.assertEqual(
+                self.dynamodb.get_item(self.table_name, {"id": item["id"]}),
+                self.dynamodb.get_item(destination_table, {"id": item["id"]}),
+            )
+        # con uno schema esplicito gli attributi annidati non previsti non vengono persi in silenzio
+        schema = pyarrow.schema(
+            [("id", pyarrow.string()), ("map", pyarrow.struct([("a", pyarrow.int64())]))]
+        )
+        with self.assertRaises(ValueError):
+            parquet.write_parquet(
+                [{"id": "1", "map": {"a": 1}}, {"id": "2", "map": {"a": 2, "b": "x"}}],
+                file_path,
+                schema,
+                batch_size=1,
+            )
+        self.assertFalse(os.path.exists(file_path))
+        for table_name in (self.table_name, destination_table):
+            self.dynamodb.delete_table(table_name)
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from simple_aws_wrapper.config import AWSConfigSnapshot
+from simple_aws_wrapper.const import regions
+from simple_aws_wrapper.exceptions.exceptions import (
+    EventQueueFullException,
+    GenericException,
+)
+from simple_aws_wrapper.services import aws_lambda
+from simple_aws_wrapper.services.aws_lambda import Lambda, LambdaEventDispatcher
+
+
+class TestLambdaEventDispatcher(unittest.TestCase):
+    def test_batching(self):
+        client = mock.Mock()
+        dispatcher = LambdaEventDispatcher(client, workers=1, batch_size=3)
+        # il worker resta bloccato sul primo invio finché tutti gli eventi non sono in coda
+        release = threading.Event()
+        client.invoke.side_effect = lambda **kwargs: release.wait(5)
+        dispatcher.submit("first", {"id": 0})
+        for i in range(1, 7):
+            dispatcher.submit("function-a" if i % 2 else "function-b", {"id": i})
+        release.set()
+        dispatcher.flush()
+        dispatcher.close()
+
+        self.assertEqual(7, dispatcher.sent_count)
+        payloads = {}
+        for call in client.invoke.call_args_list:
+            self.assertEqual("Event", call.kwargs["InvocationType"])
+            payload = json.loads(call.kwargs["Payload"])
+            self.assertIsInstance(payload, list)
+            self.assertLessEqual(len(payload), 3)
+            payloads.setdefault(call.kwargs["FunctionName"], []).extend(payload)
+        self.assertEqual([{"id": 0}], payloads["first"])
+        self.assertEqual([{"id": 1}, {"id": 3}, {"id": 5}], payloads["function-a"])
+        self.assertEqual([{"id": 2}, {"id": 4}, {"id": 6}], payloads["function-b"])
+
+    def test_dead_letter(self):
+        client = mock.Mock()
+        client.invoke.side_effect = RuntimeError("invoke failed")
+        failed = []
+        with tempfile.TemporaryDirectory() as directory:
+            dead_letter_file = os.path.join(directory, "dead-letter.jsonl")
+            dispatcher = LambdaEventDispatcher(
+                client,
+                max_retries=2,
+                retry_backoff=0.0,
+                dead_letter_file=dead_letter_file,
+                dead_letter_callback=lambda event, e: failed.append(event["payload"]),
+            )
+            dispatcher.submit("function", {"id": 1})
+            dispatcher.submit("function", {"id": 2})
+            dispatcher.close()
+            with open(dead_letter_file, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual(6, client.invoke.call_count)
+        self.assertEqual(0, dispatcher.sent_count)
+        self.assertEqual(2, dispatcher.failed_count)
+        self.assertCountEqual([{"id": 1}, {"id": 2}], failed)
+        self.assertCountEqual([1, 2], [line["payload"]["id"] for line in lines])
+        self.assertTrue(all(line["error"] == "invoke failed" for line in lines))
+
+    def test_flush_and_close_with_failing_payload(self):
+        client = mock.Mock()
+        with tempfile.TemporaryDirectory() as directory:
+            # payload non serializzabile e dead-letter non scrivibile: il worker deve restare attivo
+            dispatcher = LambdaEventDispatcher(
+                client,
+                workers=1,
+                dead_letter_file=os.path.join(directory, "missing", "dead-letter.jsonl"),
+            )
+            dispatcher.submit("function", {"value": object()})
+            dispatcher.submit("function", {"id": 1})
+            flushed = threading.Thread(target=dispatcher.flush, daemon=True)
+            flushed.start()
+            flushed.join(5)
+            self.assertFalse(flushed.is_alive())
+            dispatcher.close()
+
+        self.assertEqual(1, dispatcher.sent_count)
+        self.assertEqual(1, dispatcher.failed_count)
+        self.assertEqual(0, dispatcher.pending())
+        with self.assertRaises(GenericException):
+            dispatcher.submit("function", {"id": 2})
+
+    def test_non_blocking_submit_with_full_queue(self):
+        client = mock.Mock()
+        release = threading.Event()
+        client.invoke.side_effect = lambda **kwargs: release.wait(5)
+        dispatcher = LambdaEventDispatcher(client, max_queue_size=1, workers=1)
+        dispatcher.submit("function", {"id": 0})
+        # il worker è bloccato sul primo evento: il secondo riempie la coda, il terzo attende
+        dispatcher.submit("function", {"id": 1})
+        blocked = threading.Thread(
+            target=dispatcher.submit, args=("function", {"id": 2}), daemon=True
+        )
+        blocked.start()
+        blocked.join(0.2)
+        self.assertTrue(blocked.is_alive())
+        finished = threading.Event()
+
+        def submit_non_blocking():
+            with self.assertRaises(EventQueueFullException):
+                dispatcher.submit("function", {"id": 3}, block=False)
+            finished.set()
+
+        threading.Thread(target=submit_non_blocking, daemon=True).start()
+        self.assertTrue(finished.wait(1))
+        release.set()
+        blocked.join(5)
+        dispatcher.close()
+        self.assertEqual(3, dispatcher.sent_count)
+
+    def test_start_event_dispatcher_once(self):
+        lambda_service = Lambda(
+            config=AWSConfigSnapshot(
+                region_name=regions.EU_WEST_1, endpoint_url="http://localhost:4566"
+            )
+        )
+        barrier = threading.Barrier(8)
+
+        def start():
+            barrier.wait()
+            return lambda_service.start_event_dispatcher()
+
+        created = []
+
+        def create(*args, **kwargs):
+            time.sleep(0.05)
+            created.append(mock.Mock())
+            return created[-1]
+
+        with mock.patch.object(aws_lambda, "LambdaEventDispatcher", side_effect=create):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                dispatchers = list(executor.map(lambda _: start(), range(8)))
+        self.assertEqual(1, len(created))
+        self.assertTrue(all(dispatcher is created[0] for dispatcher in dispatchers))
+        lambda_service.stop_event_dispatcher()
+        created[0].close.assert_called_once_with(wait=True)
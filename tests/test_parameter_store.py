@@ -1,8 +1,12 @@
+import dataclasses
+import os
+import tempfile
 from unittest import TestCase
 
 from simple_aws_wrapper.config import AWSConfig
 from simple_aws_wrapper.const import regions
 from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.exceptions.exceptions import InvalidParametersException
 from simple_aws_wrapper.services.parameter_store import ParameterStore
 
 
@@ -40,3 +44,113 @@ class TestParameterStore(TestCase):
             )
         )
         self.assertTrue(self.parameter_store.delete_parameter("test"))
+
+    def test_get_cached_parameters_values(self):
+        self.parameter_store.create_parameter(
+            "/cache/a", "1", ParameterStore.Type.STRING
+        )
+        self.assertEqual(
+            {"/cache/a": "1"},
+            self.parameter_store.get_cached_parameters_values(["/cache/a"]),
+        )
+        self.parameter_store.client.put_parameter(
+            Name="/cache/a", Value="2", Type=ParameterStore.Type.STRING, Overwrite=True
+        )
+        self.assertEqual(
+            "1", self.parameter_store.get_cached_parameter_value("/cache/a")
+        )
+        self.assertEqual(
+            "1", ParameterStore().get_cached_parameter_value("/cache/a")
+        )
+        # configurazioni con credenziali diverse non condividono la cache
+        other = ParameterStore(
+            config=dataclasses.replace(
+                self.parameter_store.config, aws_access_key_id="other"
+            )
+        )
+        self.assertEqual("2", other.get_cached_parameter_value("/cache/a"))
+        ParameterStore.invalidate_cache(["/cache/a"])
+        self.assertEqual(
+            "2", self.parameter_store.get_cached_parameter_value("/cache/a")
+        )
+        self.assertTrue(self.parameter_store.delete_parameter("/cache/a"))
+
+    def test_preload_path(self):
+        for i in range(15):
+            self.parameter_store.create_parameter(
+                f"/preload/{i}/value", str(i), ParameterStore.Type.STRING
+            )
+        preloaded = self.parameter_store.preload_path("/preload")
+        self.assertEqual(15, len(preloaded))
+        self.assertEqual(
+            "3", self.parameter_store.get_cached_parameter_value("/preload/3/value")
+        )
+        for i in range(15):
+            self.parameter_store.delete_parameter(f"/preload/{i}/value")
+
+    def test_get_parameters_values_from_list_invalid(self):
+        self.parameter_store.create_parameter(
+            "/invalid/a", "a", ParameterStore.Type.STRING
+        )
+        self.assertEqual(
+            {"/invalid/a": "a"},
+            self.parameter_store.get_parameters_values_from_list(
+                ["/invalid/a", "/invalid/missing"]
+            ),
+        )
+        with self.assertRaises(InvalidParametersException) as context:
+            self.parameter_store.get_parameters_values_from_list(
+                ["/invalid/a", "/invalid/missing"], raise_on_invalid=True
+            )
+        self.assertEqual(["/invalid/missing"], context.exception.invalid_parameters)
+        self.assertEqual({"/invalid/a": "a"}, context.exception.parameters)
+        self.parameter_store.delete_parameter("/invalid/a")
+
+    def test_put_and_delete_parameters(self):
+        parameters = {f"/bulk/{i}": str(i) for i in range(25)}
+        self.assertEqual({}, self.parameter_store.put_parameters(parameters))
+        self.assertEqual(
+            parameters,
+            self.parameter_store.get_parameters_values_from_list(list(parameters)),
+        )
+        self.assertEqual(
+            {}, self.parameter_store.delete_parameters(list(parameters))
+        )
+        self.assertEqual(
+            {}, self.parameter_store.get_parameters_values_from_list(list(parameters))
+        )
+
+    def test_export_and_import_path(self):
+        parameters = {f"/export/{i}": str(i) for i in range(12)}
+        self.parameter_store.put_parameters(parameters)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "export_test.jsonl")
+            try:
+                self.assertEqual(
+                    12, self.parameter_store.export_path("/export", file_path)
+                )
+                self.parameter_store.delete_parameters(list(parameters)[:5])
+                # stesso valore ma tipo diverso: il parametro va riscritto
+                self.parameter_store.create_parameter(
+                    "/export/11",
+                    "11",
+                    ParameterStore.Type.SECURE_STRING,
+                    Overwrite=True,
+                )
+                result = self.parameter_store.import_path(file_path)
+                self.assertEqual(6, result["written"])
+                self.assertEqual(6, result["skipped"])
+                self.assertEqual(
+                    parameters,
+                    self.parameter_store.get_parameters_values_from_list(
+                        list(parameters)
+                    ),
+                )
+                self.assertEqual(
+                    ParameterStore.Type.STRING,
+                    self.parameter_store.client.get_parameter(Name="/export/11")[
+                        "Parameter"
+                    ]["Type"],
+                )
+            finally:
+                self.parameter_store.delete_parameters(list(parameters))
@@ -1,9 +1,26 @@
+import dataclasses
+import datetime
+import os
 import random
+import tempfile
 import unittest
+import urllib.request
+from unittest import mock
 
+import boto3
+import botocore
+from botocore.config import Config
+
+from simple_aws_wrapper import checksums, metrics
 from simple_aws_wrapper.config import AWSConfig
 from simple_aws_wrapper.const import regions
 from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.exceptions.exceptions import (
+    ChecksumMismatchException,
+    GenericException,
+    ValidationException,
+)
+from simple_aws_wrapper.presigner import S3Presigner
 from simple_aws_wrapper.services.s3 import S3
 
 
@@ -104,3 +121,262 @@ class TestS3(unittest.TestCase):
         self.s3.put_object(self.test_string, bucket_name=self.bucket_name, object_key=self.object_key_for_listing)
         object_key_list: list[str] = self.s3.list_object_keys(self.bucket_name)
         self.assertTrue(self.object_key in object_key_list and self.object_key_for_listing in object_key_list)
+
+    def test_metrics(self):
+        registry = metrics.enable()
+        try:
+            self.s3.create_bucket(self.bucket_name)
+            self.s3.put_object(self.test_string, self.bucket_name, self.object_key)
+            self.s3.get_file_content(self.bucket_name, self.object_key)
+            self.assertFalse(self.s3.bucket_exists(self.destination_bucket_name))
+            self.s3.delete_object(self.bucket_name, self.object_key)
+            self.s3.delete_bucket(self.bucket_name)
+        finally:
+            metrics.disable()
+        self.assertEqual(1, registry.histograms()[("s3", "put_object")].count)
+        counters = registry.counters()
+        self.assertEqual(
+            len(self.test_string),
+            counters[(metrics.BYTES_SENT, "s3", "put_object", ())],
+        )
+        self.assertEqual(
+            len(self.test_string),
+            counters[(metrics.BYTES_RECEIVED, "s3", "get_object", ())],
+        )
+        self.assertIn(
+            'operation="head_bucket",error_code="404"',
+            metrics.render_prometheus(registry),
+        )
+
+    def test_presigned_urls(self):
+        self.s3.create_bucket(self.bucket_name)
+        put_url = self.s3.presign_put(
+            self.bucket_name, "dir/a b+c.txt", content_type="text/plain"
+        )
+        request = urllib.request.Request(
+            put_url,
+            data=b"presigned",
+            method="PUT",
+            headers={"Content-Type": "text/plain"},
+        )
+        urllib.request.urlopen(request).close()
+        self.assertEqual(
+            b"presigned",
+            self.s3.get_file_content(self.bucket_name, "dir/a b+c.txt"),
+        )
+        with urllib.request.urlopen(
+            self.s3.presign_get(self.bucket_name, "dir/a b+c.txt", 60)
+        ) as response:
+            self.assertEqual(b"presigned", response.read())
+
+        keys = [f"key-{i}" for i in range(50)]
+        urls = self.s3.presign_urls(self.bucket_name, keys, processes=2, chunk_size=20)
+        self.assertEqual(50, len(urls))
+        self.assertTrue(urls[42].startswith(f"http://localhost:4566/{self.bucket_name}/key-42?"))
+        with self.assertRaises(ValueError):
+            self.s3.presign_get(self.bucket_name, "key", expires_in=8 * 24 * 3600)
+        self.s3.delete_object(self.bucket_name, "dir/a b+c.txt")
+        self.s3.delete_bucket(self.bucket_name)
+
+    def test_presigner_matches_botocore(self):
+        now = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        client = boto3.client(
+            "s3",
+            region_name=regions.EU_WEST_1,
+            endpoint_url="http://localhost:4566",
+            aws_access_key_id="access",
+            aws_secret_access_key="secret",
+            aws_session_token="token",
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+        presigner = S3Presigner(
+            "access", "secret", "token", regions.EU_WEST_1, "http://localhost:4566", True
+        )
+        with mock.patch(
+            "botocore.auth.get_current_datetime",
+            return_value=now.replace(tzinfo=None),
+        ):
+            for key in ("plain.txt", "dir/ùnicode ~+=&.bin"):
+                self.assertEqual(
+                    client.generate_presigned_url(
+                        "get_object",
+                        Params={"Bucket": "bucket", "Key": key},
+                        ExpiresIn=900,
+                    ),
+                    presigner.presign("GET", "bucket", key, 900, now=now),
+                )
+            self.assertEqual(
+                client.generate_presigned_url(
+                    "put_object",
+                    Params={"Bucket": "bucket", "Key": "k", "ContentType": "text/csv"},
+                    ExpiresIn=60,
+                ),
+                presigner.presign("PUT", "bucket", "k", 60, "text/csv", now=now),
+            )
+
+    def test_presigner_client_settings(self):
+        config = self.s3.client.meta.config
+        with mock.patch.object(config, "s3", {"addressing_style": "virtual"}):
+            url = self.s3.presign_get("bucket", "key", 60)
+        self.assertTrue(url.startswith("http://bucket.localhost:4566/key?"))
+        self.assertTrue(
+            self.s3.presign_get("bucket", "key", 60).startswith(
+                "http://localhost:4566/bucket/key?"
+            )
+        )
+        # senza credenziali statiche né provider vengono usate quelle della catena di default
+        s3 = S3(
+            config=dataclasses.replace(
+                AWSConfig().snapshot(),
+                aws_access_key_id=None,
+                aws_secret_access_key=None,
+                aws_session_token=None,
+            )
+        )
+        with mock.patch.dict(
+            os.environ, {"AWS_ACCESS_KEY_ID": "env-key", "AWS_SECRET_ACCESS_KEY": "env"}
+        ):
+            self.assertIn("Credential=env-key%2F", s3.presign_get("bucket", "key", 60))
+        with mock.patch.object(
+            config, "signature_version", botocore.UNSIGNED
+        ), self.assertRaises(ValidationException):
+            self.s3.presign_get("bucket", "key", 60)
+
+    def test_metadata_cache(self):
+        self.s3.create_bucket(self.bucket_name)
+        self.s3.put_object(self.test_string, self.bucket_name, self.object_key)
+        registry = metrics.enable()
+        try:
+            self.assertTrue(self.s3.bucket_exists(self.bucket_name))
+            self.assertTrue(self.s3.bucket_exists(self.bucket_name))
+            metadata = self.s3.head_object(self.bucket_name, self.object_key)
+            self.assertEqual(len(self.test_string), metadata["ContentLength"])
+            self.assertEqual(metadata, self.s3.head_object(self.bucket_name, self.object_key))
+            # negative caching
+            self.assertFalse(self.s3.object_exists(self.bucket_name, "missing.txt"))
+            self.assertFalse(self.s3.object_exists(self.bucket_name, "missing.txt"))
+            self.assertEqual(1, registry.histograms()[("s3", "head_bucket")].count)
+            self.assertEqual(2, registry.histograms()[("s3", "head_object")].count)
+
+            # le scritture invalidano la cache
+            self.s3.put_object("longer content", self.bucket_name, "missing.txt")
+            self.assertTrue(self.s3.object_exists(self.bucket_name, "missing.txt"))
+            self.s3.copy_object(self.bucket_name, "missing.txt", self.object_key)
+            self.assertEqual(
+                len("longer content"),
+                self.s3.head_object(self.bucket_name, self.object_key)["ContentLength"],
+            )
+            self.s3.move_object(self.bucket_name, "missing.txt", "moved.txt")
+            self.assertFalse(self.s3.object_exists(self.bucket_name, "missing.txt"))
+            self.assertEqual(5, registry.histograms()[("s3", "head_object")].count)
+
+            keys = [self.object_key, "moved.txt", "missing.txt"] + [f"none-{i}" for i in range(10)]
+            results = self.s3.head_objects(self.bucket_name, keys)
+            self.assertEqual(16, registry.histograms()[("s3", "head_object")].count)
+            self.assertEqual(len("longer content"), results[1]["ContentLength"])
+            self.assertEqual([None] * 11, results[2:])
+            self.assertEqual(results, self.s3.head_objects(self.bucket_name, keys))
+            self.assertEqual(16, registry.histograms()[("s3", "head_object")].count)
+        finally:
+            metrics.disable()
+        for object_key in (self.object_key, "moved.txt"):
+            self.s3.delete_object(self.bucket_name, object_key)
+        self.s3.delete_bucket(self.bucket_name)
+        self.assertFalse(self.s3.bucket_exists(self.bucket_name))
+
+    def test_metadata_cache_across_regions(self):
+        other = S3(region=regions.US_EAST_1)
+        self.s3.create_bucket(self.bucket_name)
+        self.s3.put_object(self.test_string, self.bucket_name, self.object_key)
+        self.assertEqual(
+            len(self.test_string),
+            self.s3.head_object(self.bucket_name, self.object_key)["ContentLength"],
+        )
+        self.assertTrue(self.s3.bucket_exists(self.bucket_name))
+        # le scritture di un'istanza di un'altra regione invalidano la cache condivisa
+        other.put_object("longer content", self.bucket_name, self.object_key)
+        self.assertEqual(
+            len("longer content"),
+            self.s3.head_object(self.bucket_name, self.object_key)["ContentLength"],
+        )
+        other.delete_object(self.bucket_name, self.object_key)
+        self.assertFalse(self.s3.object_exists(self.bucket_name, self.object_key))
+        other.delete_bucket(self.bucket_name)
+        self.assertFalse(self.s3.bucket_exists(self.bucket_name))
+
+    def test_checksums(self):
+        data = b"123456789"
+        self.assertEqual(b"\xcb\xf4\x39\x26", checksums.Checksum("CRC32").update(data).digest())
+        self.assertEqual(b"\xe3\x06\x92\x83", checksums.Checksum("CRC32C").update(data).digest())
+        stream = checksums.StreamChecksum("SHA256", part_sizes=[4, 5])
+        stream.update(data[:3])
+        stream.update(data[3:])
+        parts = [checksums.Checksum("SHA256").update(part).digest() for part in (b"1234", b"56789")]
+        self.assertEqual(checksums.composite_checksum("SHA256", parts), stream.finish())
+
+        self.s3.create_bucket(self.bucket_name)
+        body = b"checksum content" * 1000
+        for algorithm in ("SHA256", "CRC32C"):
+            self.assertTrue(
+                self.s3.put_object(body, self.bucket_name, self.object_key, algorithm)
+            )
+            self.assertEqual(
+                body,
+                self.s3.get_file_content(
+                    self.bucket_name, self.object_key, verify_checksum=True
+                ),
+            )
+        # oggetto salvato con un checksum errato
+        self.s3.client.put_object(
+            Body=body,
+            Bucket=self.bucket_name,
+            Key=self.object_key,
+            ChecksumAlgorithm="CRC32C",
+            ChecksumCRC32C="AAAAAA==",
+        )
+        with self.assertRaises(ChecksumMismatchException):
+            self.s3.get_file_content(self.bucket_name, self.object_key, verify_checksum=True)
+        self.s3.delete_object(self.bucket_name, self.object_key)
+        self.s3.delete_bucket(self.bucket_name)
+
+    def test_upload_file_checksum(self):
+        self.s3.create_bucket(self.bucket_name)
+        data = os.urandom(11 * 1024 * 1024 + 123)
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "source.bin")
+            destination = os.path.join(directory, "destination.bin")
+            with open(source, "wb") as file:
+                file.write(data)
+            self.assertTrue(
+                self.s3.upload_file(
+                    source,
+                    self.bucket_name,
+                    self.object_key,
+                    checksum_algorithm="SHA256",
+                    part_size=5 * 1024 * 1024,
+                )
+            )
+            response = self.s3.client.get_object(
+                Bucket=self.bucket_name, Key=self.object_key, ChecksumMode="ENABLED"
+            )
+            response["Body"].close()
+            self.assertTrue(response["ChecksumSHA256"].endswith("-3"))
+            self.assertTrue(
+                self.s3.download_file(
+                    self.bucket_name, self.object_key, destination, verify_checksum=True
+                )
+            )
+            with open(destination, "rb") as file:
+                self.assertEqual(data, file.read())
+        # un errore durante la lettura viene propagato senza attendere il calcolo del checksum
+        with mock.patch.object(
+            checksums.StreamChecksum, "update", side_effect=OSError("read failed")
+        ), mock.patch.object(checksums.StreamChecksum, "finish") as finish:
+            with self.assertRaises(GenericException) as context:
+                self.s3.get_file_content(
+                    self.bucket_name, self.object_key, verify_checksum=True
+                )
+        self.assertIsInstance(context.exception.cause, OSError)
+        finish.assert_not_called()
+        self.s3.delete_object(self.bucket_name, self.object_key)
+        self.s3.delete_bucket(self.bucket_name)
@@ -1,10 +1,14 @@
+import dataclasses
 import random
 import string
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 from simple_aws_wrapper.config import AWSConfig
 from simple_aws_wrapper.const import regions
 from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.exceptions.exceptions import SecretRetrievalException
 from simple_aws_wrapper.services.secrets_manager import SecretsManager
 
 
@@ -58,3 +62,151 @@ class TestSecretsManager(unittest.TestCase):
             in [x["Name"] for x in self.secrets_manager.list_secrets()]
         )
         self.assertTrue(self.secrets_manager.delete_secret(secret_id=secret_id))
+
+    def test_secret_cache(self):
+        self.secrets_manager.create_secret(name=self.secret_name, secret_string="v1")
+        secret_id = self.secrets_manager.get_secret_id_by_name(self.secret_name)
+        self.assertEqual("v1", self.secrets_manager.get_secret_value(secret_id, use_cache=True))
+        self.secrets_manager.client.put_secret_value(
+            SecretId=secret_id, SecretString="v2"
+        )
+        self.assertEqual("v1", self.secrets_manager.get_secret_value(secret_id, use_cache=True))
+        self.assertEqual(
+            "v2", self.secrets_manager.get_secret_value(secret_id, use_cache=False)
+        )
+        # senza use_cache il valore viene sempre letto da Secrets Manager
+        self.assertEqual("v2", self.secrets_manager.get_secret_value(secret_id))
+        self.secrets_manager.invalidate_cache(secret_id)
+        SecretsManager.configure_cache(ttl=0)
+        self.assertEqual("v2", self.secrets_manager.get_secret_value(secret_id, use_cache=True))
+        calls = []
+        get_secret_value = self.secrets_manager.client.get_secret_value
+        self.secrets_manager.client.get_secret_value = lambda **kwargs: calls.append(
+            kwargs
+        ) or get_secret_value(**kwargs)
+        self.assertEqual("v2", self.secrets_manager.get_secret_value(secret_id, use_cache=True))
+        self.assertEqual(0, len(calls))
+        self.secrets_manager.client.get_secret_value = get_secret_value
+        SecretsManager.configure_cache()
+        self.assertTrue(self.secrets_manager.delete_secret(secret_id=secret_id))
+
+    def test_secret_cache_single_flight(self):
+        self.secrets_manager.create_secret(name=self.secret_name, secret_string="v1")
+        secret_id = self.secrets_manager.get_secret_id_by_name(self.secret_name)
+        self.secrets_manager.invalidate_cache()
+        calls = []
+        get_secret_value = self.secrets_manager.client.get_secret_value
+
+        def counting_get_secret_value(**kwargs):
+            calls.append(kwargs)
+            return get_secret_value(**kwargs)
+
+        self.secrets_manager.client.get_secret_value = counting_get_secret_value
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(
+                executor.map(
+                    lambda _: self.secrets_manager.get_secret_value(
+                        secret_id, use_cache=True
+                    ),
+                    range(16),
+                )
+            )
+        self.assertEqual(["v1"] * 16, values)
+        self.assertEqual(1, len(calls))
+        self.secrets_manager.client.get_secret_value = get_secret_value
+        self.assertTrue(self.secrets_manager.delete_secret(secret_id=secret_id))
+
+    def test_iter_secrets_and_get_secret_values(self):
+        names = [f"{self.secret_name}-batch-{i}" for i in range(3)]
+        for i, name in enumerate(names):
+            self.secrets_manager.create_secret(name=name, secret_string=str(i))
+        listed = [
+            secret["Name"]
+            for secret in self.secrets_manager.iter_secrets(
+                filters=[{"Key": "name", "Values": [f"{self.secret_name}-batch"]}]
+            )
+        ]
+        self.assertEqual(sorted(names), sorted(listed))
+        self.assertEqual(
+            {name: str(i) for i, name in enumerate(names)},
+            self.secrets_manager.get_secret_values(names + ["missing-secret"]),
+        )
+        # un secret esistente ma non leggibile non viene confuso con uno inesistente
+        denied = {
+            "SecretValues": [],
+            "Errors": [
+                {
+                    "SecretId": names[0],
+                    "ErrorCode": "AccessDeniedException",
+                    "Message": "denied",
+                }
+            ],
+        }
+        with mock.patch.object(
+            self.secrets_manager.client, "batch_get_secret_value", return_value=denied
+        ):
+            with self.assertRaises(SecretRetrievalException) as context:
+                self.secrets_manager.get_secret_values([names[0]])
+        self.assertEqual(
+            {names[0]: {"ErrorCode": "AccessDeniedException", "Message": "denied"}},
+            context.exception.errors,
+        )
+        self.assertEqual({}, context.exception.secrets)
+        # i secret binari vengono restituiti come da get_binary_secret_value
+        self.secrets_manager.create_binary_secret(
+            name=self.binary_secret_name, secret_binary=b"binary value"
+        )
+        self.assertEqual(
+            {
+                self.binary_secret_name: self.secrets_manager.get_binary_secret_value(
+                    self.binary_secret_name
+                )
+            },
+            self.secrets_manager.get_secret_values([self.binary_secret_name]),
+        )
+        for name in names + [self.binary_secret_name]:
+            self.secrets_manager.delete_secret(secret_id=name)
+
+    def test_secret_cache_per_account(self):
+        managers = []
+        for account in ("account-a", "account-b"):
+            manager = SecretsManager(
+                config=dataclasses.replace(
+                    self.secrets_manager.config, aws_access_key_id=account
+                )
+            )
+            manager.client = mock.Mock()
+            manager.client.get_secret_value.return_value = {
+                "SecretString": f"{account} value",
+                "VersionId": "v1",
+            }
+            manager.client.describe_secret.return_value = {"ARN": f"arn:{account}:db"}
+            manager.client.batch_get_secret_value.return_value = {
+                "SecretValues": [
+                    {
+                        "ARN": f"arn:{account}:db",
+                        "Name": "db",
+                        "SecretString": f"{account} value",
+                    }
+                ]
+            }
+            managers.append(manager)
+        manager_a, manager_b = managers
+        manager_a.invalidate_cache()
+        # stessa regione ma account diversi: ognuno legge i propri valori anche dalla cache
+        for manager, account in ((manager_a, "account-a"), (manager_b, "account-b")):
+            self.assertEqual(
+                f"{account} value", manager.get_secret_value("db", use_cache=True)
+            )
+            self.assertEqual(
+                f"arn:{account}:db", manager.get_secret_id_by_name("db", use_cache=True)
+            )
+            self.assertEqual(
+                {"db": f"{account} value"},
+                manager.get_secret_values(["db"], use_cache=True),
+            )
+        self.assertEqual(1, manager_b.client.describe_secret.call_count)
+        # senza use_cache l'ARN viene sempre letto da Secrets Manager
+        manager_b.get_secret_id_by_name("db")
+        self.assertEqual(2, manager_b.client.describe_secret.call_count)
+        manager_a.invalidate_cache()
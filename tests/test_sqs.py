@@ -0,0 +1,22 @@
+import unittest
+
+from simple_aws_wrapper.config import AWSConfig
+from simple_aws_wrapper.const import regions
+from simple_aws_wrapper.const.regions import Region
+from simple_aws_wrapper.services.sqs import SQS
+
+
+class TestSQS(unittest.TestCase):
+    def setUp(self) -> None:
+        AWSConfig().set_region(Region(regions.EU_WEST_1)).set_endpoint_url(
+            "http://localhost:4566"
+        ).set_aws_secret_access_key("test").set_aws_access_key_id(
+            "test"
+        ).set_aws_session_token(
+            "test"
+        )
+        self.sqs = SQS()
+
+    def test_create_message(self):
+        self.assertEqual({"a": 1, "b": "2"}, self.sqs.create_message(a=1, b="2"))
+        self.assertEqual({"a": 1}, SQS.create_message(a=1))